@@ -0,0 +1,196 @@
+import hashlib
+import json
+import lzma
+import struct
+import zlib
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+from storage import StorageError
+
+# Komprimiertes Checkpoint-Archiv zum Sichern und Übertragen zwischen Hosts
+#
+# Aufbau: Header (Magic, Version, Kompression), danach Frames mit je einem Stapel
+# kodierter Blöcke (serialization.encode_block), ein Frame mit Zustand und
+# Metadaten und ein Abschluss-Frame. Jeder Stapel wird einzeln komprimiert, beim
+# Schreiben und Lesen liegt also höchstens ein Stapel im Speicher. Jeder Frame
+# trägt die CRC32 seiner unkomprimierten Daten, der Abschluss-Frame die Anzahl der
+# Blöcke und einen über alle Frames fortgeschriebenen SHA-256.
+
+ARCHIVE_MAGIC = b"CARC"
+ARCHIVE_VERSION = 1
+
+ARCHIVE_HEADER = struct.Struct(">4sBB")
+# Frame: Art, Länge der komprimierten Daten, Anzahl Blöcke, CRC32 der unkomprimierten Daten
+FRAME_HEADER = struct.Struct(">BIII")
+_LENGTH = struct.Struct(">I")
+_TRAILER = struct.Struct(">Q32s")
+
+_FRAME_BLOCKS = 1
+_FRAME_STATE = 2
+_FRAME_END = 3
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZMA = 2
+
+COMPRESSIONS = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "lzma": COMPRESSION_LZMA
+}
+
+DEFAULT_BATCH_SIZE = 256
+
+
+class ArchiveError(StorageError):
+    """Beschädigtes, unvollständiges oder unbekanntes Archiv"""
+
+
+def _compress(data: bytes, compression: int) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress(data, 6)
+    if compression == COMPRESSION_LZMA:
+        return lzma.compress(data, preset=6)
+    return data
+
+
+def _decompress(data: bytes, compression: int) -> bytes:
+    try:
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(data)
+        if compression == COMPRESSION_LZMA:
+            return lzma.decompress(data)
+    except (zlib.error, lzma.LZMAError) as e:
+        raise ArchiveError(f"Cannot decompress frame: {e}")
+    return data
+
+
+class ArchiveWriter:
+    """
+    Schreibt ein Archiv stapelweise in eine Datei
+
+    Beispiel:
+        with open(path, 'wb') as f:
+            writer = ArchiveWriter(f, "lzma")
+            writer.write_blocks(store.iter_payloads())
+            writer.finish(state, metadata)
+    """
+
+    def __init__(self, output: BinaryIO, compression: str = "zlib", batch_size: int = DEFAULT_BATCH_SIZE):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {sorted(COMPRESSIONS)}")
+        self.output = output
+        self.compression = COMPRESSIONS[compression]
+        self.batch_size = batch_size
+        self.block_count = 0
+        self._checksum = hashlib.sha256()
+        output.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, self.compression))
+
+    def _write_frame(self, kind: int, data: bytes, count: int = 0) -> None:
+        self._checksum.update(data)
+        compressed = _compress(data, self.compression)
+        self.output.write(FRAME_HEADER.pack(kind, len(compressed), count, zlib.crc32(data)))
+        self.output.write(compressed)
+
+    def write_blocks(self, payloads: Iterable[bytes]) -> int:
+        """
+        Schreibt kodierte Blöcke in Stapeln
+
+        Returns:
+            Anzahl der bisher geschriebenen Blöcke
+        """
+        batch = bytearray()
+        count = 0
+        for payload in payloads:
+            batch += _LENGTH.pack(len(payload))
+            batch += payload
+            count += 1
+            if count == self.batch_size:
+                self._write_frame(_FRAME_BLOCKS, bytes(batch), count)
+                self.block_count += count
+                batch = bytearray()
+                count = 0
+        if count:
+            self._write_frame(_FRAME_BLOCKS, bytes(batch), count)
+            self.block_count += count
+        return self.block_count
+
+    def finish(self, state: Optional[Dict[str, Any]], metadata: Dict[str, Any]) -> None:
+        """Schreibt Zustand, Metadaten und den Abschluss-Frame"""
+        self._write_frame(_FRAME_STATE, json.dumps({'state': state, 'metadata': metadata}).encode())
+        trailer = _TRAILER.pack(self.block_count, self._checksum.digest())
+        self.output.write(FRAME_HEADER.pack(_FRAME_END, len(trailer), 0, zlib.crc32(trailer)))
+        self.output.write(trailer)
+        self.output.flush()
+
+
+class ArchiveReader:
+    """
+    Liest ein Archiv stapelweise
+
+    blocks() liefert die kodierten Blöcke; jeder Stapel wird vor der Ausgabe
+    über seine CRC32 geprüft. Zustand und Metadaten stehen erst nach dem
+    vollständigen Durchlauf in state und metadata, der Abschluss-Frame wird
+    dabei gegen Blockanzahl und fortgeschriebenen SHA-256 geprüft.
+    """
+
+    def __init__(self, source: BinaryIO):
+        self.source = source
+        header = source.read(ARCHIVE_HEADER.size)
+        if len(header) != ARCHIVE_HEADER.size:
+            raise ArchiveError("Archive header truncated")
+        magic, version, compression = ARCHIVE_HEADER.unpack(header)
+        if magic != ARCHIVE_MAGIC:
+            raise ArchiveError("Not a checkpoint archive")
+        if version != ARCHIVE_VERSION:
+            raise ArchiveError(f"Unsupported archive version {version}")
+        if compression not in COMPRESSIONS.values():
+            raise ArchiveError(f"Unknown compression {compression}")
+        self.compression = compression
+        self.state: Optional[Dict[str, Any]] = None
+        self.metadata: Optional[Dict[str, Any]] = None
+        self.complete = False
+
+    def _read_frame(self) -> Tuple[int, int, bytes]:
+        header = self.source.read(FRAME_HEADER.size)
+        if len(header) != FRAME_HEADER.size:
+            raise ArchiveError("Archive truncated")
+        kind, length, count, checksum = FRAME_HEADER.unpack(header)
+        data = self.source.read(length)
+        if len(data) != length:
+            raise ArchiveError("Archive truncated")
+        if kind != _FRAME_END:
+            data = _decompress(data, self.compression)
+        if zlib.crc32(data) != checksum:
+            raise ArchiveError("Frame checksum mismatch")
+        return kind, count, data
+
+    def blocks(self) -> Iterator[bytes]:
+        """Liefert alle kodierten Blöcke und prüft am Ende die Vollständigkeit"""
+        rolling = hashlib.sha256()
+        block_count = 0
+        while True:
+            kind, count, data = self._read_frame()
+            if kind == _FRAME_END:
+                expected_count, digest = _TRAILER.unpack(data)
+                if expected_count != block_count or digest != rolling.digest():
+                    raise ArchiveError("Archive checksum mismatch")
+                self.complete = True
+                return
+            rolling.update(data)
+            if kind == _FRAME_STATE:
+                content = json.loads(data)
+                self.state = content['state']
+                self.metadata = content['metadata']
+            elif kind == _FRAME_BLOCKS:
+                pos = 0
+                for _ in range(count):
+                    length, = _LENGTH.unpack_from(data, pos)
+                    pos += _LENGTH.size
+                    yield data[pos:pos + length]
+                    pos += length
+                if pos != len(data):
+                    raise ArchiveError("Block frame length mismatch")
+                block_count += count
+            else:
+                raise ArchiveError(f"Unknown frame type {kind}")
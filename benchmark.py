@@ -0,0 +1,246 @@
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from blockchain import Block, MerkleTree, MerkleAccumulator
+import serialization
+
+# Fester Zeitstempel, damit die Mining-Benchmarks immer dieselbe Nonce suchen
+BENCH_TIMESTAMP = 1684792800.0
+BENCH_PREV_HASH = "0" * 64
+
+# Standardgrößen für die Merkle-Benchmarks
+MERKLE_SIZES = [1, 100, 10000, 100000]
+MINING_DIFFICULTIES = [2, 3, 4]
+
+# Ab welchem relativen Durchsatzverlust ein Ergebnis als Regression gilt
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def make_transactions(count: int) -> List[Dict[str, Any]]:
+    """Erzeugt deterministische Test-Transaktionen"""
+    return [{
+        "from": f"sender{i % 97}",
+        "to": f"recipient{i % 89}",
+        "amount": (i % 1000) + 0.5,
+        "timestamp": BENCH_TIMESTAMP + i,
+        "id": f"{i:064x}"
+    } for i in range(count)]
+
+
+def make_block(tx_count: int = 10) -> Block:
+    """Erzeugt einen deterministischen Block für die Benchmarks"""
+    return Block(1, BENCH_TIMESTAMP, make_transactions(tx_count), BENCH_PREV_HASH)
+
+
+def _measure(func: Callable[[], Any], operations: int, repeat: int) -> Dict[str, Any]:
+    """
+    Führt func repeat-mal aus und berechnet den Durchsatz
+
+    Args:
+        func: Die zu messende Funktion
+        operations: Anzahl der Operationen pro Aufruf (für ops_per_sec)
+        repeat: Anzahl der Wiederholungen
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+
+    best = min(durations)
+    return {
+        "best_seconds": best,
+        "median_seconds": statistics.median(durations),
+        "operations": operations,
+        "ops_per_sec": operations / best if best > 0 else 0.0,
+        "repeat": repeat
+    }
+
+
+def bench_calculate_hash(iterations: int = 20000, repeat: int = 5) -> Dict[str, Any]:
+    """Misst Block.calculate_hash"""
+    block = make_block()
+
+    def run():
+        for nonce in range(iterations):
+            block.nonce = nonce
+            block.calculate_hash()
+
+    return _measure(run, iterations, repeat)
+
+
+def bench_mine_block(difficulty: int, start_nonce: int = 0, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Misst Block.mine_block bei fester Schwierigkeit und deterministischer Start-Nonce
+
+    Der Durchsatz wird in probierten Nonces pro Sekunde angegeben.
+    """
+    nonces = []
+
+    def run():
+        block = make_block()
+        block.nonce = start_nonce
+        with contextlib.redirect_stdout(io.StringIO()):
+            block.mine_block(difficulty, progress=nonces.append)
+
+    result = _measure(run, 0, repeat)
+    # Jede Wiederholung probiert dieselben Nonces
+    tried = sum(nonces) // repeat
+    result["operations"] = tried
+    result["ops_per_sec"] = tried / result["best_seconds"] if result["best_seconds"] > 0 else 0.0
+    return result
+
+
+def bench_merkle_root(tx_count: int, repeat: int = 3, version: int = MerkleTree.LEGACY) -> Dict[str, Any]:
+    """
+    Misst MerkleTree.create_merkle_root für einen Block mit tx_count Transaktionen
+
+    Bei version=BINARY werden wie beim Mining die vorhandenen Transaktions-IDs übernommen.
+    """
+    transactions = make_transactions(tx_count)
+    trust_ids = version == MerkleTree.BINARY
+    return _measure(lambda: MerkleTree.create_merkle_root(transactions, version, trust_ids), tx_count, repeat)
+
+
+def bench_template_refresh(tx_count: int, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Misst eine Template-Aktualisierung über tx_count ausstehende Transaktionen
+
+    Wie beim Mining wird der Akkumulator nur abgeglichen und um die Belohnung ergänzt.
+    """
+    transactions = make_transactions(tx_count)
+    accumulator = MerkleAccumulator(MerkleTree.BINARY)
+    accumulator.sync(transactions)
+    reward = {"from": "network", "to": "bench", "amount": 100, "timestamp": BENCH_TIMESTAMP}
+
+    def run():
+        accumulator.sync(transactions)
+        accumulator.root_with([reward])
+
+    return _measure(run, 1, repeat)
+
+
+def bench_block_codec(tx_count: int = 100, iterations: int = 200, repeat: int = 5) -> Dict[str, Dict[str, Any]]:
+    """
+    Vergleicht Binär-Codec und JSON für einen Block mit tx_count Transaktionen
+
+    Dekodiert wird jeweils bis zum fertigen Block-Objekt.
+    """
+    block = make_block(tx_count)
+    encoded = serialization.encode_block(block)
+    encoded_json = json.dumps(block.to_dict())
+
+    def run(func):
+        def loop():
+            for _ in range(iterations):
+                func()
+        return _measure(loop, iterations, repeat)
+
+    return {
+        "codec_encode_block": run(lambda: serialization.encode_block(block)),
+        "codec_decode_block": run(lambda: Block.from_records(*serialization.decode_block_records(encoded))),
+        "json_encode_block": run(lambda: json.dumps(block.to_dict())),
+        "json_decode_block": run(lambda: Block.from_dict(json.loads(encoded_json)))
+    }
+
+
+def measure_block_memory(tx_count: int, block_count: int = 2000) -> float:
+    """
+    Misst den durchschnittlichen Speicherbedarf pro Block (inklusive Transaktionen) in Bytes
+
+    Gemessen wird mit tracemalloc, nur die Blöcke selbst bleiben referenziert.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        blocks = [Block(i, BENCH_TIMESTAMP + i, make_transactions(tx_count), f"{i:064x}")
+                  for i in range(block_count)]
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del blocks
+    return used / block_count
+
+
+def run_mining_benchmarks(merkle_sizes: Optional[List[int]] = None,
+                          difficulties: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    Führt alle Mining-Benchmarks aus
+
+    Returns:
+        Ergebnis-Dict mit Metadaten und einem Eintrag pro Benchmark
+    """
+    if merkle_sizes is None:
+        merkle_sizes = MERKLE_SIZES
+    if difficulties is None:
+        difficulties = MINING_DIFFICULTIES
+
+    benchmarks = {"calculate_hash": bench_calculate_hash()}
+    benchmarks.update(bench_block_codec())
+    for difficulty in difficulties:
+        benchmarks[f"mine_block_d{difficulty}"] = bench_mine_block(difficulty)
+    for size in merkle_sizes:
+        repeat = 1 if size >= 100000 else 3
+        benchmarks[f"merkle_root_{size}"] = bench_merkle_root(size, repeat=repeat)
+        benchmarks[f"merkle_root_binary_{size}"] = bench_merkle_root(size, repeat=repeat,
+                                                                     version=MerkleTree.BINARY)
+        benchmarks[f"template_refresh_{size}"] = bench_template_refresh(size, repeat=repeat)
+
+    return {
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": benchmarks,
+        "memory": {f"block_bytes_{tx_count}tx": measure_block_memory(tx_count) for tx_count in (0, 10)}
+    }
+
+
+def save_results(results: Dict[str, Any], filename: str) -> None:
+    """Speichert Benchmark-Ergebnisse als JSON"""
+    with open(filename, 'w') as result_file:
+        json.dump(results, result_file, indent=2)
+
+
+def load_results(filename: str) -> Dict[str, Any]:
+    """Lädt gespeicherte Benchmark-Ergebnisse"""
+    with open(filename, 'r') as result_file:
+        return json.load(result_file)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Vergleicht zwei Benchmark-Läufe anhand des Durchsatzes
+
+    Args:
+        baseline: Früherer Lauf (Referenz)
+        current: Aktueller Lauf
+        threshold: Relativer Durchsatzverlust, ab dem eine Regression gemeldet wird
+
+    Returns:
+        Liste der Vergleiche pro gemeinsamem Benchmark mit Flag "regression"
+    """
+    comparisons = []
+    for name, current_result in current["benchmarks"].items():
+        baseline_result = baseline.get("benchmarks", {}).get(name)
+        if not baseline_result or not baseline_result.get("ops_per_sec"):
+            continue
+
+        change = current_result["ops_per_sec"] / baseline_result["ops_per_sec"] - 1
+        comparisons.append({
+            "name": name,
+            "baseline_ops_per_sec": baseline_result["ops_per_sec"],
+            "current_ops_per_sec": current_result["ops_per_sec"],
+            "change": change,
+            "regression": change < -threshold
+        })
+    return comparisons
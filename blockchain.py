@@ -5,8 +5,18 @@ import threading
 import logging
 import pickle
 import os
+import sys
+import functools
+import shutil
 import requests
-from typing import List, Dict, Any, Callable, Optional, Set, Union, Tuple
+from typing import List, Dict, Any, Callable, Iterator, NamedTuple, Optional, Set, Union, Tuple
+
+from mining import MiningEngine, MiningTelemetry, HeaderTemplate
+from mmr import MerkleMountainRange
+from archive import ArchiveReader, ArchiveWriter
+from indexes import AddressIndex, BalanceIndex, LocationIndex, PendingLedger
+from storage import BlockLogStore, SqliteBlockStore, StorageError, DEFAULT_DATA_DIR, DEFAULT_STORE_TYPE, STORE_TYPES, open_block_store
+from validation import ChainValidator, ParallelVerifier
 
 # Konfiguration des Loggings
 logging.basicConfig(
@@ -21,88 +31,702 @@ logger = logging.getLogger('blockchain')
 class MerkleTree:
     """
     Implementierung eines Merkle Trees für effiziente und sichere Verifikation von Transaktionen
+    
+    Version 1 (LEGACY) verkettet Hex-Strings und hasht jede Transaktion per json.dumps,
+    so wie alle bestehenden Blöcke aufgebaut sind. Version 2 (BINARY) arbeitet auf
+    32-Byte-Digests und verwendet die bereits berechnete Transaktions-ID als Blatt.
     """
+    LEGACY = 1
+    BINARY = 2
+    
     @staticmethod
-    def create_merkle_root(transactions: List[Dict[str, Any]]) -> str:
+    def transaction_digest(tx: Dict[str, Any]) -> bytes:
         """
-        Erstellt einen Merkle Root Hash aus einer Liste von Transaktionen
+        SHA-256 über die kanonische Transaktion ohne das Feld 'id'
+        
+        Entspricht binär der Transaktions-ID aus Blockchain.generate_transaction_id.
+        """
+        if "id" in tx:
+            tx = {key: value for key, value in tx.items() if key != "id"}
+        return hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).digest()
+    
+    @staticmethod
+    def leaf_hashes(transactions: List[Dict[str, Any]], version: int = LEGACY,
+                    trust_ids: bool = False) -> List[Any]:
+        """
+        Berechnet die Blätter des Merkle Trees
+        
+        Args:
+            transactions: Die Transaktionen des Blocks
+            version: LEGACY (Hex-Strings) oder BINARY (32-Byte-Digests)
+            trust_ids: Bei BINARY vorhandene Transaktions-IDs übernehmen statt neu zu serialisieren
+                       (nur für selbst erzeugte Transaktionen, nicht bei der Validierung)
         """
-        if not transactions:
+        if version == MerkleTree.LEGACY:
+            sha256 = hashlib.sha256
+            dumps = json.dumps
+            return [sha256(dumps(tx, sort_keys=True).encode()).hexdigest() for tx in transactions]
+            
+        digest = MerkleTree.transaction_digest
+        if trust_ids:
+            return [bytes.fromhex(tx["id"]) if "id" in tx else digest(tx) for tx in transactions]
+        return [digest(tx) for tx in transactions]
+    
+    @staticmethod
+    def combine(left: Any, right: Any, version: int = LEGACY) -> Any:
+        """Hasht zwei benachbarte Knoten zum Elternknoten"""
+        if version == MerkleTree.LEGACY:
+            return hashlib.sha256((left + right).encode()).hexdigest()
+        return hashlib.sha256(left + right).digest()
+    
+    @staticmethod
+    def root_from_leaves(level: List[Any], version: int = LEGACY) -> str:
+        """
+        Reduziert eine Liste von Blättern zum Merkle Root (als Hex-String)
+        
+        Die Ebenen werden in der übergebenen Liste selbst berechnet, es wird
+        kein neues Array pro Ebene angelegt. Bei ungerader Anzahl wird der
+        letzte Knoten mit sich selbst kombiniert.
+        """
+        if not level:
             return hashlib.sha256(b"").hexdigest()
             
-        # Konvertiere Transaktionen in Hashes
-        tx_hashes = [hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest() for tx in transactions]
+        sha256 = hashlib.sha256
+        legacy = version == MerkleTree.LEGACY
+        count = len(level)
+        while count > 1:
+            last = count - 1
+            for i in range(0, count, 2):
+                left = level[i]
+                right = level[i + 1] if i < last else left
+                if legacy:
+                    level[i >> 1] = sha256((left + right).encode()).hexdigest()
+                else:
+                    level[i >> 1] = sha256(left + right).digest()
+            count = (count + 1) >> 1
+            
+        # Der letzte übrige Hash ist der Merkle Root
+        return level[0] if legacy else level[0].hex()
+    
+    @staticmethod
+    def create_merkle_root(transactions: List[Dict[str, Any]], version: int = LEGACY,
+                           trust_ids: bool = False) -> str:
+        """
+        Erstellt einen Merkle Root Hash aus einer Liste von Transaktionen
         
-        # Baue den Merkle Tree auf
-        while len(tx_hashes) > 1:
-            # Stelle sicher, dass die Anzahl der Hashes gerade ist
-            if len(tx_hashes) % 2 != 0:
-                tx_hashes.append(tx_hashes[-1])
-                
-            # Kombiniere je zwei benachbarte Hashes
-            next_level = []
-            for i in range(0, len(tx_hashes), 2):
-                combined = tx_hashes[i] + tx_hashes[i+1]
-                next_level.append(hashlib.sha256(combined.encode()).hexdigest())
+        Args:
+            transactions: Die Transaktionen des Blocks
+            version: LEGACY reproduziert die Roots bestehender Blöcke, BINARY ist die schnelle Variante
+            trust_ids: Bei BINARY vorhandene Transaktions-IDs als Blätter übernehmen
+        """
+        return MerkleTree.root_from_leaves(MerkleTree.leaf_hashes(transactions, version, trust_ids), version)
+    
+    @staticmethod
+    def leaf_hash(tx: Dict[str, Any], version: int = LEGACY) -> str:
+        """Blatt-Hash einer einzelnen Transaktion als Hex-String"""
+        if version == MerkleTree.LEGACY:
+            return hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest()
+        return MerkleTree.transaction_digest(tx).hex()
+    
+    @staticmethod
+    def create_proof(transactions: List[Dict[str, Any]], tx_index: int, version: int = LEGACY,
+                     trust_ids: bool = False) -> List[Dict[str, str]]:
+        """
+        Erstellt den Audit-Pfad (Merkle Proof) für die Transaktion an Position tx_index
+        
+        Args:
+            transactions: Alle Transaktionen des Blocks
+            tx_index: Position der Transaktion im Block
+            version: Merkle-Version des Blocks
+            trust_ids: Bei BINARY vorhandene Transaktions-IDs als Blätter übernehmen
+            
+        Returns:
+            Liste der Geschwister-Hashes vom Blatt bis unter den Root, jeweils mit
+            der Seite ('left'/'right'), auf der das Geschwister steht
+        """
+        if not 0 <= tx_index < len(transactions):
+            raise IndexError(f"Transaction index {tx_index} out of range")
+            
+        level = MerkleTree.leaf_hashes(transactions, version, trust_ids)
+        legacy = version == MerkleTree.LEGACY
+        proof = []
+        index = tx_index
+        while len(level) > 1:
+            sibling_index = index ^ 1
+            # Bei ungerader Anzahl wird der letzte Knoten mit sich selbst kombiniert
+            sibling = level[sibling_index] if sibling_index < len(level) else level[index]
+            proof.append({
+                'hash': sibling if legacy else sibling.hex(),
+                'position': 'left' if index & 1 else 'right'
+            })
+            
+            last = len(level) - 1
+            level = [MerkleTree.combine(level[i], level[i + 1] if i < last else level[i], version)
+                     for i in range(0, len(level), 2)]
+            index >>= 1
+            
+        return proof
+    
+    @staticmethod
+    def verify_proof(tx: Dict[str, Any], proof: List[Dict[str, str]], merkle_root: str,
+                     version: int = LEGACY) -> bool:
+        """
+        Verifiziert einen Merkle Proof in O(log n), ohne den ganzen Block zu kennen
+        
+        Args:
+            tx: Die Transaktion, deren Aufnahme geprüft wird
+            proof: Audit-Pfad aus create_proof
+            merkle_root: Der Merkle Root aus dem Block-Header
+            version: Merkle-Version des Blocks
+        """
+        try:
+            node = MerkleTree.leaf_hash(tx, version)
+            if version != MerkleTree.LEGACY:
+                # Die ID ist nicht Teil des Blatts und muss daher zum Inhalt passen
+                if "id" in tx and tx["id"] != node:
+                    return False
+                node = bytes.fromhex(node)
                 
-            tx_hashes = next_level
+            for step in proof:
+                sibling = step['hash'] if version == MerkleTree.LEGACY else bytes.fromhex(step['hash'])
+                if step['position'] == 'left':
+                    node = MerkleTree.combine(sibling, node, version)
+                elif step['position'] == 'right':
+                    node = MerkleTree.combine(node, sibling, version)
+                else:
+                    return False
+        except (KeyError, TypeError, ValueError):
+            return False
             
-        # Der letzte übrige Hash ist der Merkle Root
-        return tx_hashes[0]
+        return (node if version == MerkleTree.LEGACY else node.hex()) == merkle_root
     
     @staticmethod
-    def verify_transaction(tx: Dict[str, Any], merkle_root: str, transactions: List[Dict[str, Any]]) -> bool:
+    def verify_transaction(tx: Dict[str, Any], merkle_root: str, transactions: List[Dict[str, Any]],
+                           version: int = LEGACY) -> bool:
         """
         Verifiziert, ob eine Transaktion im Merkle Tree enthalten ist
         """
-        # In einer vollständigen Implementierung würde hier ein Merkle Proof erstellt und validiert
-        # Für diese Demo vereinfacht:
-        return merkle_root == MerkleTree.create_merkle_root(transactions)
+        if tx not in transactions:
+            return False
+        proof = MerkleTree.create_proof(transactions, transactions.index(tx), version)
+        return MerkleTree.verify_proof(tx, proof, merkle_root, version)
+
+
+class MerkleAccumulator:
+    """
+    Inkrementeller Merkle Tree für eine wachsende Liste von Transaktionen
+    
+    Speichert pro Ebene nur den Root des jeweils vollständigen linken Teilbaums
+    (Frontier). Ein Append kostet O(log n), der aktuelle Root ist jederzeit in
+    O(log n) verfügbar und identisch zu MerkleTree.create_merkle_root.
+    """
+    
+    def __init__(self, version: int = MerkleTree.LEGACY):
+        self.version = version
+        self.size = 0
+        self._frontier: List[Any] = []
+        # Erstes und letztes eingefügtes Objekt, um Änderungen an der Quellliste zu erkennen
+        self._first = None
+        self._last = None
+        
+    def append(self, tx: Dict[str, Any]) -> None:
+        """Fügt eine Transaktion als neues Blatt hinzu"""
+        self._append_leaf(MerkleTree.leaf_hashes([tx], self.version, trust_ids=True)[0])
+        if self.size == 1:
+            self._first = tx
+        self._last = tx
+        
+    def _append_leaf(self, node: Any) -> None:
+        frontier = self._frontier
+        height = 0
+        while height < len(frontier) and frontier[height] is not None:
+            node = MerkleTree.combine(frontier[height], node, self.version)
+            frontier[height] = None
+            height += 1
+        if height == len(frontier):
+            frontier.append(node)
+        else:
+            frontier[height] = node
+        self.size += 1
+        
+    def root(self) -> str:
+        """
+        Aktueller Merkle Root als Hex-String
+        
+        Bei ungerader Knotenzahl einer Ebene wird wie in MerkleTree der letzte
+        Knoten mit sich selbst kombiniert.
+        """
+        if self.size == 0:
+            return hashlib.sha256(b"").hexdigest()
+            
+        frontier = self._frontier
+        top = len(frontier) - 1
+        carry = None
+        for height, node in enumerate(frontier):
+            if node is not None and carry is not None:
+                carry = MerkleTree.combine(node, carry, self.version)
+            elif node is not None or carry is not None:
+                single = node if node is not None else carry
+                if height == top:
+                    carry = single
+                    break
+                carry = MerkleTree.combine(single, single, self.version)
+                
+        return carry if self.version == MerkleTree.LEGACY else carry.hex()
+        
+    def root_with(self, transactions: List[Dict[str, Any]]) -> str:
+        """Root nach dem Anhängen weiterer Transaktionen, ohne den Akkumulator zu verändern"""
+        preview = self.copy()
+        for tx in transactions:
+            preview.append(tx)
+        return preview.root()
+        
+    def copy(self) -> 'MerkleAccumulator':
+        clone = MerkleAccumulator(self.version)
+        clone.size = self.size
+        clone._frontier = list(self._frontier)
+        clone._first = self._first
+        clone._last = self._last
+        return clone
+        
+    def sync(self, transactions: List[Dict[str, Any]]) -> None:
+        """
+        Gleicht den Akkumulator mit einer Liste ab, an die nur angehängt wurde
+        
+        Wurden Transaktionen entfernt oder ersetzt, wird der Akkumulator neu aufgebaut.
+        """
+        if self.size and (self.size > len(transactions)
+                          or transactions[0] is not self._first
+                          or transactions[self.size - 1] is not self._last):
+            self.size = 0
+            self._frontier = []
+            self._first = self._last = None
+            
+        for tx in transactions[self.size:]:
+            self.append(tx)
+
+
+def _pack_hash(value: Any) -> Any:
+    """64-stellige Hex-Hashes werden als 32 Bytes gespeichert, alle anderen Werte unverändert"""
+    if isinstance(value, str) and len(value) == 64:
+        try:
+            packed = bytes.fromhex(value)
+        except ValueError:
+            return value
+        # Nur verlustfrei umkehrbare (kleingeschriebene) Hashes packen
+        if packed.hex() == value:
+            return packed
+    return value
+
+
+def _unpack_hash(value: Any) -> Any:
+    return value.hex() if isinstance(value, bytes) else value
+
+
+class BlockHeader(NamedTuple):
+    """
+    Unveränderlicher Block-Header
+    
+    previous_hash, merkle_root und hash liegen binär (32 Bytes) vor, sofern sie
+    gültige Hex-Hashes sind; Sonderwerte wie der Genesis-Vorgänger "0" bleiben Strings.
+    """
+    index: int
+    timestamp: float
+    previous_hash: Union[bytes, str]
+    merkle_root: Union[bytes, str]
+    nonce: int
+    difficulty: int
+    hash: Union[bytes, str]
+    
+    @classmethod
+    def create(cls, index: int, timestamp: float, previous_hash: str, merkle_root: str,
+               nonce: int = 0, difficulty: int = 0, block_hash: str = "") -> 'BlockHeader':
+        """Erstellt einen Header aus Hex-Strings"""
+        return cls(index, timestamp, _pack_hash(previous_hash), _pack_hash(merkle_root),
+                   nonce, difficulty, _pack_hash(block_hash))
+
+
+# Gemeinsame Schlüssel-Tupel aller Transaktionen mit gleicher Feldfolge
+_TX_SHAPES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+# Häufig wiederholte String-Werte (Adressen, Typen) werden nur einmal gespeichert
+_INTERNED_TX_FIELDS = frozenset(("from", "to", "type"))
+
+
+def pack_transaction(tx: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Wandelt eine Transaktion in einen kompakten Datensatz um
+    
+    Der Datensatz ist ein Tupel aus dem geteilten Schlüssel-Tupel und den Werten;
+    die Transaktions-ID wird binär gespeichert.
+    """
+    keys = tuple(tx)
+    shape = _TX_SHAPES.setdefault(keys, keys)
+    record = [shape]
+    for key, value in tx.items():
+        if key == "id":
+            value = _pack_hash(value)
+        elif key in _INTERNED_TX_FIELDS and type(value) is str:
+            value = sys.intern(value)
+        record.append(value)
+    return tuple(record)
+
+
+def unpack_transaction(record: Tuple[Any, ...]) -> Dict[str, Any]:
+    """Stellt aus einem kompakten Datensatz wieder das Transaktions-Dict her"""
+    tx = dict(zip(record[0], record[1:]))
+    if "id" in tx:
+        tx["id"] = _unpack_hash(tx["id"])
+    return tx
 
 
 class Block:
+    """
+    Block mit unveränderlichem Header und kompakt gespeicherten Transaktionen
+    
+    Die Attribute (index, hash, transactions, ...) bleiben wie gewohnt les- und
+    schreibbar; Schreibzugriffe auf Header-Felder ersetzen den Header.
+    """
+    __slots__ = ('header', 'merkle_version', '_tx_records', '_transactions', '_body_loader')
+    
     def __init__(self, index: int, timestamp: float, transactions: List[Dict[str, Any]], 
-                 previous_hash: str, nonce: int = 0):
-        self.index = index
-        self.timestamp = timestamp
+                 previous_hash: str, nonce: int = 0, merkle_version: int = MerkleTree.LEGACY,
+                 merkle_root: Optional[str] = None):
+        self.merkle_version = merkle_version
         self.transactions = transactions
-        self.previous_hash = previous_hash
-        self.nonce = nonce
-        self.merkle_root = MerkleTree.create_merkle_root(transactions)
+        # Ein bereits bekannter Root (z.B. aus dem MerkleAccumulator) spart den Neuaufbau
+        if merkle_root is None:
+            merkle_root = MerkleTree.create_merkle_root(transactions, merkle_version, trust_ids=True)
+        # difficulty wird vom Blockchain-Objekt gesetzt
+        self.header = BlockHeader.create(index, timestamp, previous_hash, merkle_root, nonce)
         self.hash = self.calculate_hash()
-        self.difficulty = 0  # Wird vom Blockchain-Objekt gesetzt
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Block':
+        """
+        Erstellt einen Block aus seiner Dict-Darstellung (API, JSON oder serialization.decode_block)
+        
+        Merkle Root und Hash werden übernommen, nicht neu berechnet.
+        """
+        block = cls.__new__(cls)
+        block.merkle_version = data.get('merkle_version', MerkleTree.LEGACY)
+        block.transactions = data['transactions']
+        block.header = BlockHeader.create(data['index'], data['timestamp'], data['previous_hash'],
+                                          data.get('merkle_root', ''), data['nonce'],
+                                          data.get('difficulty', 0), data['hash'])
+        return block
+        
+    @classmethod
+    def from_records(cls, fields: Dict[str, Any], records: List[Tuple[Any, ...]]) -> 'Block':
+        """
+        Erstellt einen Block direkt aus kompakten Transaktions-Datensätzen
+        
+        Gegenstück zu serialization.decode_block_records, ohne Umweg über Dicts.
+        """
+        block = cls.__new__(cls)
+        block.merkle_version = fields['merkle_version']
+        block._transactions = None
+        block._body_loader = None
+        block._tx_records = tuple((_TX_SHAPES.setdefault(record[0], record[0]),) + record[1:]
+                                  for record in records)
+        block.header = BlockHeader.create(fields['index'], fields['timestamp'], fields['previous_hash'],
+                                          fields['merkle_root'], fields['nonce'], fields['difficulty'],
+                                          fields['hash'])
+        return block
+        
+    @classmethod
+    def lazy(cls, fields: Dict[str, Any], loader: Callable[[], Tuple[Tuple[Any, ...], ...]]) -> 'Block':
+        """
+        Erstellt einen Block, von dem nur der Header im Speicher liegt
+        
+        Die Transaktionen werden bei Bedarf über loader (z.B. aus dem
+        MmapBlockStore) dekodiert und nur über .transactions zwischengespeichert.
+        """
+        block = cls.__new__(cls)
+        block.merkle_version = fields['merkle_version']
+        block._transactions = None
+        block._tx_records = None
+        block._body_loader = loader
+        block.header = BlockHeader.create(fields['index'], fields['timestamp'], fields['previous_hash'],
+                                          fields['merkle_root'], fields['nonce'], fields['difficulty'],
+                                          fields['hash'])
+        return block
+        
+    @property
+    def is_body_loaded(self) -> bool:
+        """True, wenn die Transaktionen im Speicher liegen (nicht nur im Block-Store)"""
+        return self._tx_records is not None or self._transactions is not None
+        
+    def _records(self) -> Tuple[Tuple[Any, ...], ...]:
+        records = self._tx_records
+        if records is None:
+            # Lazy geladener Block: Datensätze bei jedem Zugriff aus dem Store dekodieren
+            records = self._body_loader()
+        return records
+        
+    @property
+    def index(self) -> int:
+        return self.header.index
+    
+    @index.setter
+    def index(self, value: int) -> None:
+        self.header = self.header._replace(index=value)
+        
+    @property
+    def timestamp(self) -> float:
+        return self.header.timestamp
+    
+    @timestamp.setter
+    def timestamp(self, value: float) -> None:
+        self.header = self.header._replace(timestamp=value)
+        
+    @property
+    def previous_hash(self) -> str:
+        return _unpack_hash(self.header.previous_hash)
+    
+    @previous_hash.setter
+    def previous_hash(self, value: str) -> None:
+        self.header = self.header._replace(previous_hash=_pack_hash(value))
+        
+    @property
+    def merkle_root(self) -> str:
+        return _unpack_hash(self.header.merkle_root)
+    
+    @merkle_root.setter
+    def merkle_root(self, value: str) -> None:
+        self.header = self.header._replace(merkle_root=_pack_hash(value))
+        
+    @property
+    def nonce(self) -> int:
+        return self.header.nonce
+    
+    @nonce.setter
+    def nonce(self, value: int) -> None:
+        # tuple.__new__ statt _replace, die Nonce wird beim Mining und im Benchmark häufig gesetzt
+        index, timestamp, previous_hash, merkle_root, _, difficulty, block_hash = self.header
+        self.header = tuple.__new__(BlockHeader, (index, timestamp, previous_hash, merkle_root,
+                                                  value, difficulty, block_hash))
+        
+    @property
+    def difficulty(self) -> int:
+        return self.header.difficulty
+    
+    @difficulty.setter
+    def difficulty(self, value: int) -> None:
+        self.header = self.header._replace(difficulty=value)
+        
+    @property
+    def hash(self) -> str:
+        return _unpack_hash(self.header.hash)
+    
+    @hash.setter
+    def hash(self, value: str) -> None:
+        self.header = self.header._replace(hash=_pack_hash(value))
+        
+    @property
+    def transactions(self) -> List[Dict[str, Any]]:
+        """
+        Transaktionen als Dicts
+        
+        Werden beim ersten Zugriff aus den kompakten Datensätzen erzeugt und bis
+        zum nächsten compact() zwischengespeichert, damit Änderungen erhalten bleiben.
+        """
+        if self._transactions is None:
+            self._transactions = [unpack_transaction(record) for record in self._records()]
+        return self._transactions
+    
+    @transactions.setter
+    def transactions(self, transactions: List[Dict[str, Any]]) -> None:
+        self._tx_records = tuple(pack_transaction(tx) for tx in transactions)
+        self._transactions = None
+        self._body_loader = None
+        
+    @property
+    def transaction_count(self) -> int:
+        if self._transactions is not None:
+            return len(self._transactions)
+        return len(self._records())
+        
+    def iter_transactions(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iteriert über die Transaktionen, ohne sie im Block zwischenzuspeichern
+        
+        Für reine Lesezugriffe (Guthaben, Validierung, API) gedacht.
+        """
+        if self._transactions is not None:
+            return iter(self._transactions)
+        return (unpack_transaction(record) for record in self._records())
+        
+    def transaction_at(self, position: int) -> Dict[str, Any]:
+        """Eine einzelne Transaktion, ohne die übrigen zwischenzuspeichern"""
+        if self._transactions is not None:
+            return self._transactions[position]
+        return unpack_transaction(self._records()[position])
+        
+    def transaction_records(self) -> Tuple[Tuple[Any, ...], ...]:
+        """Transaktionen in kompakter Form (siehe pack_transaction), z.B. für serialization.py"""
+        if self._transactions is not None:
+            return tuple(pack_transaction(tx) for tx in self._transactions)
+        return self._records()
+        
+    def compact(self) -> None:
+        """Überführt zwischengespeicherte Transaktions-Dicts zurück in die kompakte Form"""
+        if self._transactions is not None:
+            self.transactions = self._transactions
+            
+    def __getstate__(self) -> Dict[str, Any]:
+        if self._transactions is not None:
+            records = tuple(pack_transaction(tx) for tx in self._transactions)
+        else:
+            records = self._records()
+        return {'header': tuple(self.header), 'merkle_version': self.merkle_version, 'tx_records': records}
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._transactions = None
+        self._body_loader = None
+        if 'header' in state:
+            self.header = BlockHeader(*state['header'])
+            self.merkle_version = state['merkle_version']
+            self._tx_records = tuple((_TX_SHAPES.setdefault(record[0], record[0]),) + record[1:]
+                                     for record in state['tx_records'])
+            return
+            
+        # Checkpoints vor der kompakten Darstellung enthalten das __dict__ des Blocks
+        self.merkle_version = state.get('merkle_version', MerkleTree.LEGACY)
+        self.transactions = state['transactions']
+        self.header = BlockHeader.create(state['index'], state['timestamp'], state['previous_hash'],
+                                         state['merkle_root'], state['nonce'], state.get('difficulty', 0),
+                                         state['hash'])
 
     def calculate_hash(self) -> str:
         """
         Calculate SHA-256 hash of the block
         """
+        header = self.header
         block_string = json.dumps({
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "merkle_root": self.merkle_root,
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce
+            "index": header.index,
+            "timestamp": header.timestamp,
+            "merkle_root": _unpack_hash(header.merkle_root),
+            "previous_hash": _unpack_hash(header.previous_hash),
+            "nonce": header.nonce
         }, sort_keys=True).encode()
         
         return hashlib.sha256(block_string).hexdigest()
     
-    def mine_block(self, difficulty: int) -> None:
+    def verify_merkle_root(self) -> bool:
+        """
+        Prüft den Merkle Root gegen den tatsächlichen Inhalt der Transaktionen
+        
+        Bei BINARY-Blöcken werden die Blätter neu berechnet (nicht aus den IDs
+        übernommen) und vorhandene Transaktions-IDs auf Konsistenz geprüft.
+        """
+        transactions = list(self.iter_transactions())
+        if self.merkle_version == MerkleTree.LEGACY:
+            return self.merkle_root == MerkleTree.create_merkle_root(transactions)
+            
+        leaves = MerkleTree.leaf_hashes(transactions, self.merkle_version)
+        for tx, leaf in zip(transactions, leaves):
+            if "id" in tx and tx["id"] != leaf.hex():
+                return False
+        return self.merkle_root == MerkleTree.root_from_leaves(leaves, self.merkle_version)
+    
+    def merkle_proof(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Erstellt einen Merkle Proof für die Transaktion mit der gegebenen ID
+        
+        Returns:
+            Dict mit Transaktion, Position und Audit-Pfad oder None, wenn die
+            Transaktion nicht in diesem Block liegt
+        """
+        transactions = list(self.iter_transactions())
+        for tx_index, tx in enumerate(transactions):
+            if tx.get("id") == tx_id:
+                return {
+                    'block_hash': self.hash,
+                    'block_index': self.index,
+                    'merkle_root': self.merkle_root,
+                    'merkle_version': self.merkle_version,
+                    'tx_index': tx_index,
+                    'transaction': tx,
+                    'proof': MerkleTree.create_proof(transactions, tx_index, self.merkle_version)
+                }
+        return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-Darstellung des Blocks, wie sie die API ausliefert
+        """
+        return {
+            'index': self.index,
+            'timestamp': self.timestamp,
+            'transactions': list(self.iter_transactions()),
+            'previous_hash': self.previous_hash,
+            'merkle_root': self.merkle_root,
+            'merkle_version': self.merkle_version,
+            'nonce': self.nonce,
+            'hash': self.hash,
+            'difficulty': self.difficulty
+        }
+    
+    def header_fields(self) -> Dict[str, Any]:
+        """
+        Header-Felder, die in den Block-Hash eingehen (ohne Nonce)
+        """
+        header = self.header
+        return {
+            "index": header.index,
+            "timestamp": header.timestamp,
+            "merkle_root": _unpack_hash(header.merkle_root),
+            "previous_hash": _unpack_hash(header.previous_hash)
+        }
+    
+    def mine_block(self, difficulty: int, engine: Optional[MiningEngine] = None,
+                   cancel_event: Optional[threading.Event] = None,
+                   progress: Optional[Callable[[int], None]] = None) -> bool:
         """
         Mine a new block (Proof of Work)
+        
+        Args:
+            difficulty: Anzahl führender Nullen im Hash
+            engine: Optionale MiningEngine, die den Nonce-Raum auf mehrere Prozesse verteilt
+            cancel_event: Optionales Abbruch-Token, wird z.B. bei einem neuen Chain-Tip gesetzt
+            progress: Optionaler Callback für Telemetrie, erhält die Anzahl probierter Nonces
+            
+        Returns:
+            True wenn der Block gemined wurde, False bei Abbruch
         """
         self.difficulty = difficulty
         target = '0' * difficulty
         
-        # Performance-Optimierung durch effizienteres Hashing
-        while self.hash[:difficulty] != target:
-            self.nonce += 1
-            if self.nonce % 100000 == 0:
-                # Periodisches Logging für längere Mining-Prozesse
-                logger.info(f"Mining Block #{self.index}: Nonce at {self.nonce}, target difficulty {difficulty}")
-            self.hash = self.calculate_hash()
+        if self.hash[:difficulty] != target:
+            if engine is not None:
+                result = engine.search(self.header_fields(), difficulty, start_nonce=self.nonce + 1,
+                                       cancel_event=cancel_event, progress=progress)
+                if result is None:
+                    logger.info(f"Mining Block #{self.index} abgebrochen")
+                    return False
+                self.nonce, self.hash = result
+            else:
+                # Header-Template: JSON-Serialisierung nur einmal pro Block statt pro Nonce
+                template = HeaderTemplate.from_header(self.header_fields())
+                should_stop = cancel_event.is_set if cancel_event is not None else None
+                nonce = self.nonce + 1
+                while True:
+                    found_nonce, found_hash, tried = template.search(difficulty, nonce, nonce + 100000, should_stop)
+                    if progress is not None:
+                        progress(tried)
+                    if found_nonce is not None:
+                        self.nonce, self.hash = found_nonce, found_hash
+                        break
+                    if should_stop is not None and should_stop():
+                        logger.info(f"Mining Block #{self.index} abgebrochen bei Nonce {nonce + tried}")
+                        return False
+                    nonce += 100000
+                    # Periodisches Logging für längere Mining-Prozesse
+                    logger.info(f"Mining Block #{self.index}: Nonce at {nonce}, target difficulty {difficulty}")
             
         logger.info(f"Block #{self.index} mined with nonce {self.nonce}: {self.hash}")
         print(f"Block #{self.index} mined: {self.hash}")
+        return True
 
 
 class Blockchain:
@@ -114,14 +738,54 @@ class Blockchain:
     
     # Erhöhe die Standardschwierigkeit auf 6, damit Blöcke nicht so schnell gefunden werden
     DEFAULT_DIFFICULTY = 6
+    
+    # Neue Blöcke verwenden den binären Merkle Tree, der Genesis-Block bleibt im Kompatibilitätsmodus
+    MERKLE_VERSION = MerkleTree.BINARY
+    
+    # Nach so vielen Zustands-Deltas wird der Checkpoint im Hintergrund zu einer neuen Basis kompaktiert
+    CHECKPOINT_COMPACT_AFTER = 32
+    
+    # Standard: alle so vielen Blöcke einen Snapshot aller Kontostände für get_balance_at halten
+    BALANCE_SNAPSHOT_INTERVAL = 1000
 
-    def __init__(self, difficulty: int = DEFAULT_DIFFICULTY):
+    def __init__(self, difficulty: int = DEFAULT_DIFFICULTY, data_dir: str = DEFAULT_DATA_DIR,
+                 store_type: str = DEFAULT_STORE_TYPE, balance_snapshot_interval: Optional[int] = None):
         self.chain: List[Block] = []
+        # Merkle Mountain Range über alle Block-Hashes, wächst mit der Kette
+        self.header_mmr = MerkleMountainRange()
+        # Indizes über die Kette, beim Anhängen fortgeschrieben und beim Kettenwechsel zurückgerollt.
+        # Jeder Balance-Snapshot kopiert alle Kontostände, der Speicher wächst also mit
+        # Adressen * Höhe / Intervall; 0 schaltet die Snapshots ab
+        if balance_snapshot_interval is None:
+            balance_snapshot_interval = self.BALANCE_SNAPSHOT_INTERVAL
+        if balance_snapshot_interval < 0:
+            raise ValueError("balance_snapshot_interval must not be negative")
+        self.balance_snapshot_interval = balance_snapshot_interval
+        self.balance_index = BalanceIndex(balance_snapshot_interval)
+        self.address_index = AddressIndex()
+        self.location_index = LocationIndex()
+        self._chain_indexes = [self.balance_index, self.address_index, self.location_index]
+        # Merkt sich das bereits validierte Präfix, spätere Validierungen prüfen nur neue Blöcke
+        self.validator = ChainValidator()
         self.difficulty = difficulty
         self.pending_transactions: List[Dict[str, Any]] = []
+        # Ausstehende Belastungen pro Adresse, folgt pending_transactions
+        self.pending_ledger = PendingLedger()
         self.mining_reward = 100
         self._mining_thread: Optional[threading.Thread] = None
         self._stop_mining = threading.Event()
+        self._mining_engine: Optional[MiningEngine] = None
+        
+        # Abbruch-Tokens laufender Mining-Versuche, werden bei einem neuen Chain-Tip gesetzt
+        self._chain_lock = threading.RLock()
+        self._mining_cancel_events: Set[threading.Event] = set()
+        self._continuous_cancel_event: Optional[threading.Event] = None
+        
+        # Live-Telemetrie (Hashrate, Nonces pro Block, veraltete Blöcke)
+        self.mining_telemetry = MiningTelemetry()
+        
+        # Inkrementeller Merkle Tree über pending_transactions für das Block-Template
+        self._pending_merkle = MerkleAccumulator(self.MERKLE_VERSION)
         self.mining_callback: Optional[Callable] = None
         self._sync_callback: Optional[Callable] = None
         
@@ -136,74 +800,206 @@ class Blockchain:
         # Smart Contract Engine hinzufügen (wird später initialisiert)
         self.contract_engine = None
         
-        # Checkpoint-bezogene Attribute
+        # Checkpoint-bezogene Attribute: Blöcke liegen im Append-only-Log unter data_dir
+        self.data_dir = data_dir
+        # "mmap": nur Header im Speicher, Transaktionen bei Bedarf; "log": alles laden;
+        # "sqlite": Datenbank mit Indizes für Transaktionen und Adressen
+        self.store_type = store_type
+        self.checkpoint_metadata_file = os.path.join(self.data_dir, "checkpoint_meta.json")
+        self.block_store: Optional[BlockLogStore] = None
+        # Pickle-Checkpoints älterer Versionen werden nur noch gelesen
         self.checkpoint_file = "blockchain_checkpoint.pkl"
-        self.checkpoint_metadata_file = "blockchain_checkpoint_meta.json"
+        self.legacy_checkpoint_metadata_file = "blockchain_checkpoint_meta.json"
         self.is_paused = False
         self.pause_timestamp = None
         self.checkpoint_logger = logging.getLogger('blockchain.checkpoint')
+        # Hintergrund-Checkpoints: nur ein Schreiber gleichzeitig, Status über checkpoint_status()
+        self._checkpoint_lock = threading.Lock()
+        self._checkpoint_status_lock = threading.Lock()
+        self._checkpoint_thread: Optional[threading.Thread] = None
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._checkpoint_status: Dict[str, Any] = {'state': 'idle'}
         
         # Create the genesis block
         self.create_genesis_block()
         
         logger.info(f"Blockchain initialized with difficulty {difficulty}")
 
-    def create_checkpoint(self, reason: str = "Manual checkpoint") -> bool:
+    def _open_block_store(self) -> BlockLogStore:
+        """Öffnet den Block-Store (siehe store_type) beim ersten Zugriff"""
+        if self.block_store is None:
+            self.block_store = open_block_store(self.data_dir, self.store_type)
+        return self.block_store
+        
+    def _checkpoint_snapshot(self) -> Dict[str, Any]:
+        """
+        Konsistenter Schnappschuss für einen Checkpoint
+        
+        Blöcke sind nach dem Anhängen unveränderlich, daher genügt eine Kopie der
+        Kettenliste; nur der kleine veränderliche Zustand wird kopiert.
+        """
+        with self._chain_lock:
+            return {
+                'chain': list(self.chain),
+                'mmr_root': self.header_mmr.root(),
+                'state': {
+                    'pending_transactions': [dict(tx) for tx in self.pending_transactions],
+                    'processed_tx_ids': list(self._processed_tx_ids),
+                    'difficulty': self.difficulty,
+                    'mining_reward': self.mining_reward,
+                    'target_block_time': self.target_block_time,
+                    'last_difficulty_adjustment_time': self.last_difficulty_adjustment_time
+                }
+            }
+            
+    def _set_checkpoint_status(self, **changes: Any) -> None:
+        with self._checkpoint_status_lock:
+            self._checkpoint_status.update(changes)
+            
+    def checkpoint_status(self) -> Dict[str, Any]:
+        """Status des letzten bzw. laufenden Checkpoints (state: idle, running, done, failed)"""
+        with self._checkpoint_status_lock:
+            return dict(self._checkpoint_status)
+            
+    def create_checkpoint(self, reason: str = "Manual checkpoint", background: bool = False) -> bool:
         """
         Erstellt einen Checkpoint des aktuellen Blockchain-Zustands
         
+        Nur Blöcke, die noch nicht im Block-Log stehen, werden geschrieben; nach
+        einem Kettenwechsel wird das Log bis zum gemeinsamen Vorgänger abgeschnitten.
+        Mempool und Parameter landen in einer kleinen Zustandsdatei.
+        
         Args:
             reason: Grund für den Checkpoint (z.B. "Update", "Backup")
+            background: Bei True wird nur der Schnappschuss im aufrufenden Thread
+                        erstellt und im Hintergrund geschrieben (siehe checkpoint_status)
             
         Returns:
-            True bei Erfolg, False bei Fehler
+            True bei Erfolg bzw. gestartetem Hintergrund-Checkpoint, False bei Fehler
+        """
+        if not background:
+            with self._checkpoint_lock:
+                return self._write_checkpoint(self._checkpoint_snapshot(), reason)
+                
+        with self._checkpoint_status_lock:
+            if self._checkpoint_thread and self._checkpoint_thread.is_alive():
+                self.checkpoint_logger.warning(f"Checkpoint läuft bereits, '{reason}' wird übersprungen")
+                return False
+            snapshot = self._checkpoint_snapshot()
+            self._checkpoint_thread = threading.Thread(target=self._run_background_checkpoint,
+                                                       args=(snapshot, reason), daemon=True)
+            self._checkpoint_status = {'state': 'running', 'reason': reason, 'started': time.time(),
+                                       'chain_length': len(snapshot['chain']),
+                                       'blocks_written': 0, 'blocks_total': None}
+            self._checkpoint_thread.start()
+        return True
+        
+    def _run_background_checkpoint(self, snapshot: Dict[str, Any], reason: str) -> None:
+        with self._checkpoint_lock:
+            self._write_checkpoint(snapshot, reason)
+            
+    def wait_for_checkpoint(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wartet auf einen laufenden Hintergrund-Checkpoint
+        
+        Returns:
+            False, wenn der Checkpoint fehlgeschlagen ist oder noch läuft
+        """
+        thread = self._checkpoint_thread
+        if thread:
+            thread.join(timeout)
+        return self.checkpoint_status()['state'] not in ('running', 'failed')
+        
+    def compact_checkpoint(self, background: bool = False) -> bool:
         """
+        Fasst die Zustands-Deltas des Checkpoints zu einer neuen Basis zusammen
+        
+        Args:
+            background: Bei True in einem eigenen Thread (läuft bereits einer, wird nichts gestartet)
+            
+        Returns:
+            True bei Erfolg bzw. gestarteter Kompaktierung, False bei Fehler
+        """
+        if background:
+            with self._checkpoint_status_lock:
+                if self._compaction_thread and self._compaction_thread.is_alive():
+                    return False
+                self._compaction_thread = threading.Thread(target=self.compact_checkpoint, daemon=True)
+                self._compaction_thread.start()
+            return True
+            
+        try:
+            with self._checkpoint_lock:
+                store = self._open_block_store()
+                deltas = store.state_journal.delta_count
+                store.compact_state()
+            self.checkpoint_logger.info(f"Checkpoint kompaktiert: {deltas} Zustands-Deltas zusammengefasst")
+            return True
+        except Exception as e:
+            self.checkpoint_logger.error(f"Fehler beim Kompaktieren des Checkpoints: {str(e)}")
+            return False
+            
+    def _write_checkpoint(self, snapshot: Dict[str, Any], reason: str) -> bool:
+        """Schreibt einen Schnappschuss in den Block-Store; Aufrufer hält _checkpoint_lock"""
+        chain = snapshot['chain']
+        state = snapshot['state']
+        self._set_checkpoint_status(state='running', reason=reason, started=time.time(),
+                                    chain_length=len(chain), blocks_written=0, blocks_total=None,
+                                    error=None)
         try:
             self.checkpoint_logger.info(f"Erstelle Checkpoint: {reason}")
             
+            def progress(done: int, total: int) -> None:
+                self._set_checkpoint_status(blocks_written=done, blocks_total=total)
+                
+            store = self._open_block_store()
+            written = store.sync_chain(chain, progress)
+            # Zustand nur als Delta zum letzten Checkpoint; die Basis wird im Hintergrund kompaktiert
+            state_deltas = store.save_state(state)
+            store.flush()
+            
             # Metadaten zum Checkpoint
             metadata = {
                 "timestamp": time.time(),
                 "reason": reason,
-                "chain_length": len(self.chain),
-                "difficulty": self.difficulty,
-                "pending_transactions": len(self.pending_transactions),
-                "blockchain_hash": self._calculate_blockchain_hash(),
-                "version": "1.0"  # Versionsinfo für zukünftige Kompatibilität
+                "chain_length": len(chain),
+                "difficulty": state['difficulty'],
+                "pending_transactions": len(state['pending_transactions']),
+                "mmr_root": snapshot['mmr_root'],
+                "blocks_written": written,
+                "state_sequence": store.state_journal.sequence,
+                "state_deltas": state_deltas,
+                "version": "2.1"  # 2.0: Append-only Block-Log statt Pickle, 2.1: Zustands-Deltas
             }
             
-            # Speichern der Metadaten
-            with open(self.checkpoint_metadata_file, 'w') as meta_file:
+            # Speichern der Metadaten: Temp-Datei und atomares Umbenennen
+            temp_path = self.checkpoint_metadata_file + ".tmp"
+            with open(temp_path, 'w') as meta_file:
                 json.dump(metadata, meta_file, indent=2)
+                meta_file.flush()
+                os.fsync(meta_file.fileno())
+            os.replace(temp_path, self.checkpoint_metadata_file)
             
-            # Blockchain-Zustand speichern mit pickle
-            # Das enthält: chain, pending_transactions, _processed_tx_ids, etc.
-            with open(self.checkpoint_file, 'wb') as checkpoint_file:
-                pickle.dump({
-                    'chain': self.chain,
-                    'pending_transactions': self.pending_transactions,
-                    'processed_tx_ids': self._processed_tx_ids,
-                    'difficulty': self.difficulty,
-                    'mining_reward': self.mining_reward,
-                    'target_block_time': self.target_block_time,
-                    'last_difficulty_adjustment_time': self.last_difficulty_adjustment_time
-                }, checkpoint_file)
-                
-            self.checkpoint_logger.info(f"Checkpoint erfolgreich erstellt: {len(self.chain)} Blöcke")
-            print(f"Checkpoint erfolgreich erstellt: {len(self.chain)} Blöcke")
+            self._set_checkpoint_status(state='done', finished=time.time(),
+                                        blocks_written=written, blocks_total=written)
+            self.checkpoint_logger.info(f"Checkpoint erfolgreich erstellt: {len(chain)} Blöcke ({written} neu geschrieben)")
+            print(f"Checkpoint erfolgreich erstellt: {len(chain)} Blöcke")
+            
+            if state_deltas >= self.CHECKPOINT_COMPACT_AFTER:
+                self.compact_checkpoint(background=True)
             return True
             
         except Exception as e:
+            self._set_checkpoint_status(state='failed', finished=time.time(), error=str(e))
             self.checkpoint_logger.error(f"Fehler beim Erstellen des Checkpoints: {str(e)}")
             print(f"Fehler beim Erstellen des Checkpoints: {str(e)}")
             return False
 
-    def _calculate_blockchain_hash(self) -> str:
-        """
-        Berechnet einen Hash über die gesamte Blockchain für Integritätsprüfungen
-        """
-        combined_hashes = "".join([block.hash for block in self.chain])
-        return hashlib.sha256(combined_hashes.encode()).hexdigest()
+    def has_checkpoint(self) -> bool:
+        """Prüft, ob ein Checkpoint (Block-Log oder älteres Pickle-Format) vorhanden ist"""
+        if os.path.exists(self.checkpoint_metadata_file) and STORE_TYPES[self.store_type].exists(self.data_dir):
+            return True
+        return os.path.exists(self.checkpoint_file) and os.path.exists(self.legacy_checkpoint_metadata_file)
     
     def load_checkpoint(self, validate: bool = True) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """
@@ -215,32 +1011,23 @@ class Blockchain:
         Returns:
             (Erfolg, Metadaten) - Tupel mit bool und Checkpoint-Metadaten oder None bei Fehler
         """
-        if not os.path.exists(self.checkpoint_file) or not os.path.exists(self.checkpoint_metadata_file):
+        if not self.has_checkpoint():
             self.checkpoint_logger.warning("Keine Checkpoint-Dateien gefunden")
             return False, None
             
         try:
-            # Metadaten laden
-            with open(self.checkpoint_metadata_file, 'r') as meta_file:
-                metadata = json.load(meta_file)
-                
-            # Blockchain-Zustand laden
-            with open(self.checkpoint_file, 'rb') as checkpoint_file:
-                state = pickle.load(checkpoint_file)
+            if os.path.exists(self.checkpoint_metadata_file) and STORE_TYPES[self.store_type].exists(self.data_dir):
+                metadata = self._load_block_log()
+            else:
+                metadata = self._load_legacy_checkpoint()
                 
-            # Blockchain-Zustand wiederherstellen
-            self.chain = state['chain']
-            self.pending_transactions = state['pending_transactions']
-            self._processed_tx_ids = state['processed_tx_ids']
-            self.difficulty = state['difficulty']
-            self.mining_reward = state['mining_reward']
-            self.target_block_time = state['target_block_time']
-            self.last_difficulty_adjustment_time = state['last_difficulty_adjustment_time']
-            
             self.checkpoint_logger.info(f"Checkpoint geladen: {len(self.chain)} Blöcke, " 
                                         f"erstellt am {time.ctime(metadata['timestamp'])}")
             print(f"Checkpoint geladen: {len(self.chain)} Blöcke")
             
+            # Die Blöcke stammen von der Platte, das bisher validierte Präfix gilt nicht mehr
+            self.validator.reset()
+            
             # Optional: Validierung durchführen
             if validate:
                 is_valid, issues = self.comprehensive_validation()
@@ -257,6 +1044,166 @@ class Blockchain:
             self.checkpoint_logger.error(f"Fehler beim Laden des Checkpoints: {str(e)}")
             print(f"Fehler beim Laden des Checkpoints: {str(e)}")
             return False, None
+            
+    def _load_block_log(self) -> Dict[str, Any]:
+        """Stellt Kette und Zustand aus dem Block-Log wieder her"""
+        with open(self.checkpoint_metadata_file, 'r') as meta_file:
+            metadata = json.load(meta_file)
+            
+        store = self._open_block_store()
+        if store.lazy_bodies:
+            # Nur die Header laden; die Transaktionen liest der Store aus den gemappten Segmenten
+            chain = [Block.lazy(fields, functools.partial(store.read_records, height, fields['hash']))
+                     for height, fields in enumerate(store.iter_headers())]
+        else:
+            chain = [Block.from_records(fields, records) for fields, records in store.iter_blocks()]
+        if not chain:
+            raise StorageError("Block-Log enthält keine Blöcke")
+        state = store.load_state() or {}
+        
+        with self._chain_lock:
+            self.chain = chain
+            self.header_mmr = MerkleMountainRange.from_hashes(block.hash for block in chain)
+            # Indizes erst bei der ersten Abfrage aufbauen, sonst würden beim Start alle
+            # Transaktionen aus dem Store dekodiert
+            self._invalidate_indexes()
+            self.pending_transactions = state.get('pending_transactions', [])
+            self.pending_ledger.rebuild(self.pending_transactions)
+            self._processed_tx_ids = set(state.get('processed_tx_ids', []))
+            self.difficulty = state.get('difficulty', self.difficulty)
+            self.mining_reward = state.get('mining_reward', self.mining_reward)
+            self.target_block_time = state.get('target_block_time', self.target_block_time)
+            self.last_difficulty_adjustment_time = state.get('last_difficulty_adjustment_time',
+                                                             self.last_difficulty_adjustment_time)
+            # Laufende Mining-Versuche bauen ihr Template auf dem geladenen Tip neu auf
+            self.notify_tip_changed()
+        return metadata
+        
+    def _load_legacy_checkpoint(self) -> Dict[str, Any]:
+        """Lädt einen Pickle-Checkpoint älterer Versionen; der nächste Checkpoint schreibt das Block-Log"""
+        with open(self.legacy_checkpoint_metadata_file, 'r') as meta_file:
+            metadata = json.load(meta_file)
+            
+        # Blockchain-Zustand laden
+        with open(self.checkpoint_file, 'rb') as checkpoint_file:
+            state = pickle.load(checkpoint_file)
+            
+        # Ältere Checkpoints enthalten keine MMR, dann wird sie aus der Kette aufgebaut
+        chain = state['chain']
+        header_mmr = state.get('header_mmr')
+        if header_mmr is None or header_mmr.leaf_count != len(chain):
+            header_mmr = MerkleMountainRange.from_hashes(block.hash for block in chain)
+            
+        # Blockchain-Zustand wie in _load_block_log unter dem Lock austauschen, damit Mining
+        # und Hintergrund-Checkpoints keine halb wiederhergestellte Kette sehen
+        with self._chain_lock:
+            self.chain = chain
+            self.header_mmr = header_mmr
+            self._rebuild_indexes()
+            self.pending_transactions = state['pending_transactions']
+            self.pending_ledger.rebuild(self.pending_transactions)
+            self._processed_tx_ids = state['processed_tx_ids']
+            self.difficulty = state['difficulty']
+            self.mining_reward = state['mining_reward']
+            self.target_block_time = state['target_block_time']
+            self.last_difficulty_adjustment_time = state['last_difficulty_adjustment_time']
+            self.notify_tip_changed()
+        return metadata
+    
+    def export_checkpoint(self, path: str, compression: str = "zlib") -> bool:
+        """
+        Schreibt den aktuellen Checkpoint als komprimiertes Archiv (z.B. für Backups)
+        
+        Die Blöcke werden stapelweise aus dem Block-Store gelesen und komprimiert,
+        der Speicherbedarf hängt also nicht von der Kettenlänge ab.
+        
+        Args:
+            path: Zieldatei; wird über eine Temp-Datei atomar ersetzt
+            compression: "zlib", "lzma" oder "none"
+            
+        Returns:
+            True bei Erfolg, False bei Fehler
+        """
+        if not self.create_checkpoint(f"Export nach {path}"):
+            return False
+        temp_path = path + ".tmp"
+        try:
+            with self._checkpoint_lock:
+                store = self._open_block_store()
+                with open(self.checkpoint_metadata_file, 'r') as meta_file:
+                    metadata = json.load(meta_file)
+                with open(temp_path, 'wb') as archive_file:
+                    writer = ArchiveWriter(archive_file, compression)
+                    writer.write_blocks(store.iter_payloads())
+                    writer.finish(store.load_state(), metadata)
+                    os.fsync(archive_file.fileno())
+            os.replace(temp_path, path)
+            self.checkpoint_logger.info(f"Checkpoint exportiert: {writer.block_count} Blöcke nach {path} ({compression})")
+            print(f"Checkpoint exportiert: {writer.block_count} Blöcke nach {path}")
+            return True
+        except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            self.checkpoint_logger.error(f"Fehler beim Exportieren des Checkpoints: {str(e)}")
+            print(f"Fehler beim Exportieren des Checkpoints: {str(e)}")
+            return False
+            
+    def import_checkpoint(self, path: str, validate: bool = True) -> bool:
+        """
+        Stellt die Blockchain aus einem Archiv von export_checkpoint wieder her
+        
+        Die Blöcke werden beim Lesen geprüft und direkt in einen neuen Block-Store
+        geschrieben; erst wenn das Archiv vollständig und unbeschädigt ist, ersetzt
+        dieser den bisherigen Checkpoint.
+        
+        Args:
+            path: Archivdatei
+            validate: Bei True wird nach dem Laden eine vollständige Validierung durchgeführt
+            
+        Returns:
+            True bei Erfolg, False bei Fehler
+        """
+        import_dir = self.data_dir + ".import"
+        try:
+            with self._checkpoint_lock:
+                shutil.rmtree(import_dir, ignore_errors=True)
+                store = open_block_store(import_dir, self.store_type)
+                try:
+                    with open(path, 'rb') as archive_file:
+                        reader = ArchiveReader(archive_file)
+                        for payload in reader.blocks():
+                            store.append_payload(payload)
+                    if reader.state is not None:
+                        store.save_state(reader.state)
+                    store.flush()
+                finally:
+                    store.close()
+                    
+                metadata = dict(reader.metadata, reason=f"Import aus {path}", timestamp=time.time())
+                with open(os.path.join(import_dir, os.path.basename(self.checkpoint_metadata_file)), 'w') as meta_file:
+                    json.dump(metadata, meta_file, indent=2)
+                    
+                # Bisherigen Checkpoint erst nach vollständigem Import ersetzen
+                with self._chain_lock:
+                    if self.block_store is not None:
+                        self.block_store.close()
+                        self.block_store = None
+                    old_dir = self.data_dir + ".old"
+                    shutil.rmtree(old_dir, ignore_errors=True)
+                    if os.path.exists(self.data_dir):
+                        os.replace(self.data_dir, old_dir)
+                    os.replace(import_dir, self.data_dir)
+                    shutil.rmtree(old_dir, ignore_errors=True)
+                    
+            self.checkpoint_logger.info(f"Checkpoint importiert: {metadata['chain_length']} Blöcke aus {path}")
+            success, _ = self.load_checkpoint(validate)
+            return success
+            
+        except Exception as e:
+            shutil.rmtree(import_dir, ignore_errors=True)
+            self.checkpoint_logger.error(f"Fehler beim Importieren des Checkpoints: {str(e)}")
+            print(f"Fehler beim Importieren des Checkpoints: {str(e)}")
+            return False
     
     def pause_blockchain(self, reason: str = "Pausiert für Wartung") -> bool:
         """
@@ -277,8 +1224,9 @@ class Blockchain:
             if self._mining_thread and self._mining_thread.is_alive():
                 self.stop_continuous_mining()
                 
-            # Checkpoint erstellen
-            checkpoint_success = self.create_checkpoint(reason)
+            # Checkpoint im Hintergrund schreiben; ein laufender wird vorher abgewartet
+            self.wait_for_checkpoint()
+            checkpoint_success = self.create_checkpoint(reason, background=True)
             if not checkpoint_success:
                 return False
                 
@@ -315,6 +1263,11 @@ class Blockchain:
                 return False
                 
         try:
+            # Checkpoint der Pause muss vollständig geschrieben sein
+            if not self.wait_for_checkpoint():
+                print("Checkpoint der Pause ist fehlgeschlagen")
+                return False
+                
             # Checkpoint laden
             success, metadata = self.load_checkpoint(validate)
             if not success:
@@ -334,77 +1287,34 @@ class Blockchain:
             print(f"Fehler beim Fortsetzen der Blockchain: {str(e)}")
             return False
 
-    def comprehensive_validation(self) -> Tuple[bool, List[str]]:
+    def comprehensive_validation(self, full: bool = False,
+                                 verifier: Optional[ParallelVerifier] = None) -> Tuple[bool, List[str]]:
         """
         Führt eine umfassende Validierung der Blockchain durch
         
+        Hash, Verkettung, Merkle Root, Proof of Work, Index, Zeitstempel und
+        Guthaben werden in einem Durchlauf geprüft. Ohne full werden nur Blöcke
+        nach dem zuletzt validierten Tip geprüft (siehe validation.ChainValidator).
+        
+        Args:
+            full: Bei True die gesamte Kette erneut validieren
+            verifier: Optionaler ParallelVerifier für Hash, Merkle Root und Proof of Work;
+                      ohne wird im aufrufenden Prozess geprüft
+        
         Returns:
             (Gültig, Probleme) - Tupel mit Validitätsstatus und Liste von gefundenen Problemen
         """
-        issues = []
-        
-        # 1. Ketten-Integrität (bereits implementierte Methode nutzen)
-        if not self.is_chain_valid():
-            issues.append("Blockchain-Integritätsprüfung fehlgeschlagen")
-            return False, issues
-            
-        # 2. Zusätzliche Prüfungen für jeden Block
-        for i, block in enumerate(self.chain):
-            # 2.1 Block-Index-Kontinuität prüfen
-            if block.index != i:
-                issues.append(f"Block {i} hat falschen Index: {block.index}")
-                
-            # 2.2 Block-Zeitstempel plausibel?
-            if i > 0:
-                prev_block = self.chain[i-1]
-                if block.timestamp < prev_block.timestamp:
-                    issues.append(f"Block {i} hat Zeitstempel vor vorherigem Block")
-                    
-            # 2.3 Merkle-Root-Konsistenz mit Transaktionen
-            expected_merkle_root = MerkleTree.create_merkle_root(block.transactions)
-            if block.merkle_root != expected_merkle_root:
-                issues.append(f"Block {i} hat inkonsistenten Merkle-Root")
-                
-            # 2.4 Hash entspricht dem Block-Inhalt
-            expected_hash = block.calculate_hash()
-            if block.hash != expected_hash:
-                issues.append(f"Block {i} hat inkonsistenten Hash")
-                
-        # 3. Guthaben-Konsistenz prüfen
-        balance_map = {}
-        for block in self.chain:
-            for tx in block.transactions:
-                sender = tx["from"]
-                recipient = tx["to"]
-                amount = tx["amount"]
-                
-                # Initialisiere Konten falls nicht vorhanden
-                if sender not in balance_map:
-                    balance_map[sender] = 0
-                if recipient not in balance_map:
-                    balance_map[recipient] = 0
-                    
-                # Transaktion anwenden
-                if sender != "network" and sender != "genesis":  # Diese dürfen ins Negative gehen
-                    balance_map[sender] -= amount
-                balance_map[recipient] += amount
-                
-                # Prüfen auf negative Bilanzen (außer bei Systemadressen)
-                if sender != "network" and sender != "genesis" and balance_map[sender] < 0:
-                    issues.append(f"Negativer Kontostand für {sender} nach Transaktion in Block {block.index}")
-        
-        # Wenn Probleme gefunden wurden, ist die Validierung fehlgeschlagen
-        if issues:
-            return False, issues
-            
-        return True, []
+        is_valid, issues = self.validator.validate(self.chain, full, verifier)
+        for issue in issues:
+            logger.error(issue)
+        return is_valid, issues
      
     def create_genesis_block(self) -> None:
         """
         Create the first block in the chain with deterministic values
         """
         # Prüfe, ob bereits ein Chain-Checkpoint existiert
-        if os.path.exists(self.checkpoint_file) and os.path.exists(self.checkpoint_metadata_file):
+        if self.has_checkpoint():
             success, _ = self.load_checkpoint(validate=False)
             if success:
                 logger.info("Genesis block loaded from checkpoint")
@@ -427,12 +1337,71 @@ class Blockchain:
         genesis_block.difficulty = self.difficulty
         
         # In die Kette einfügen
-        self.chain.append(genesis_block)
+        self._append_block(genesis_block)
         logger.info(f"Genesis block created: {genesis_block.hash}")
         
-        # Optional: Checkpoint erstellen, damit neue Nodes dieselbe Chain haben
-        self.create_checkpoint("Initial genesis block")
+        # Kein Checkpoint nötig: der Genesis-Block ist deterministisch und wird
+        # mit dem ersten Checkpoint ins Block-Log geschrieben
+        
+    def _append_block(self, block: Block) -> None:
+        """Hängt einen Block an die Kette an und nimmt ihn in die MMR auf"""
+        block.compact()
+        current = [index for index in self._chain_indexes if index.is_current(self.chain)]
+        self.chain.append(block)
+        self.header_mmr.append(block.hash)
+        for index in current:
+            index.apply_block(block)
+            
+    def _rebuild_indexes(self) -> None:
+        for index in self._chain_indexes:
+            index.rebuild(self.chain)
+            
+    def _invalidate_indexes(self) -> None:
+        """Leert die Indizes; _ensure_indexes baut sie bei der nächsten Abfrage neu auf"""
+        for index in self._chain_indexes:
+            index.rebuild(())
+        
+    def _ensure_indexes(self) -> None:
+        """Baut die Indizes neu auf, falls die Kette an ihnen vorbei verändert wurde"""
+        with self._chain_lock:
+            for index in self._chain_indexes:
+                if not index.is_current(self.chain):
+                    logger.info(f"Rebuilding {type(index).__name__} at height {len(self.chain)}")
+                    index.rebuild(self.chain)
+            if self.pending_ledger.count != len(self.pending_transactions):
+                self.pending_ledger.rebuild(self.pending_transactions)
+                
+    def _set_pending(self, transactions: List[Dict[str, Any]]) -> None:
+        """Ersetzt den Mempool und schreibt das Pending-Ledger für entfernte Transaktionen fort"""
+        kept = {id(tx) for tx in transactions}
+        if self.pending_ledger.count == len(self.pending_transactions):
+            for tx in self.pending_transactions:
+                if id(tx) not in kept:
+                    self.pending_ledger.remove(tx)
+        else:
+            self.pending_ledger.rebuild(transactions)
+        self.pending_transactions = transactions
+        
+    def get_block_proof(self, block_index: int, mmr_size: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Erstellt einen MMR-Beweis, dass ein Block Teil der Kette ist
         
+        Args:
+            block_index: Index des Blocks
+            mmr_size: Optionale Kettenlänge, gegen deren Root bewiesen wird
+            
+        Returns:
+            Beweis inklusive Block-Hash und MMR-Root oder None bei ungültigem Index
+        """
+        with self._chain_lock:
+            try:
+                proof = self.header_mmr.prove(block_index, mmr_size)
+            except (IndexError, ValueError):
+                return None
+            proof['block_hash'] = self.chain[block_index].hash
+            proof['root'] = self.header_mmr.root(proof['mmr_size'])
+            return proof
+    
     def get_latest_block(self) -> Block:
         """
         Return the most recent block in the chain
@@ -446,60 +1415,197 @@ class Blockchain:
         tx_data = json.dumps(transaction, sort_keys=True).encode()
         return hashlib.sha256(tx_data).hexdigest()
     
-    def mine_pending_transactions(self, miner_address: str) -> Block:
+    def pending_merkle_root(self) -> str:
+        """
+        Merkle Root über die aktuell ausstehenden Transaktionen
+        
+        Nur neu hinzugekommene Transaktionen werden in den Akkumulator übernommen.
+        """
+        with self._chain_lock:
+            self._pending_merkle.sync(self.pending_transactions)
+            return self._pending_merkle.root()
+            
+    def mine_pending_transactions(self, miner_address: str,
+                                  cancel_event: Optional[threading.Event] = None) -> Optional[Block]:
         """
         Create a new block with all pending transactions and mine it
+        
+        Args:
+            miner_address: Address to receive the mining reward
+            cancel_event: Optionales Abbruch-Token; wird zusätzlich bei jedem neuen Chain-Tip gesetzt
+            
+        Returns:
+            Der gemined Block oder None, wenn das Mining abgebrochen wurde oder der Block veraltet ist
         """
-        if not self.pending_transactions:
-            logger.debug("No transactions to mine")
-            # In continuous mining, create at least the reward transaction
-            self.pending_transactions.append({
-                "from": "network",
-                "to": miner_address,
-                "amount": self.mining_reward,
-                "timestamp": time.time(),
-                "type": "reward"
-            })
-        else:
+        if cancel_event is None:
+            cancel_event = threading.Event()
+            
+        with self._chain_lock:
+            self._mining_cancel_events.add(cancel_event)
+            
             # Create reward transaction for the miner
-            self.pending_transactions.append({
+            reward_transaction = {
                 "from": "network",
                 "to": miner_address,
                 "amount": self.mining_reward,
                 "timestamp": time.time(),
                 "type": "reward"
-            })
+            }
+            
+            # Create new block on the current tip; the pending list itself stays untouched
+            # so an aborted attempt can simply be rebuilt on the new tip
+            pending = list(self.pending_transactions)
+            self._pending_merkle.sync(pending)
+            block = Block(
+                index=len(self.chain),
+                timestamp=time.time(),
+                transactions=pending + [reward_transaction],
+                previous_hash=self.get_latest_block().hash,
+                merkle_version=self.MERKLE_VERSION,
+                merkle_root=self._pending_merkle.root_with([reward_transaction])
+            )
+            
+        attempt = self.mining_telemetry.begin_attempt()
+        try:
+            mined = block.mine_block(self.difficulty, engine=self._mining_engine,
+                                     cancel_event=cancel_event, progress=attempt.record)
+        finally:
+            with self._chain_lock:
+                self._mining_cancel_events.discard(cancel_event)
+                
+        if not mined:
+            self.mining_telemetry.finish_attempt(attempt, "aborted")
+            return None
+            
+        with self._chain_lock:
+            # Während des Minings kann ein konkurrierender Block den Tip ersetzt haben
+            if block.previous_hash != self.get_latest_block().hash:
+                logger.info(f"Discarding stale block #{block.index}: chain tip changed during mining")
+                self.mining_telemetry.finish_attempt(attempt, "stale")
+                return None
+                
+            self.mining_telemetry.finish_attempt(attempt, "mined")
+                
+            # Add transaction IDs to processed set to prevent double-spending
+            for tx in block.iter_transactions():
+                tx_id = self.generate_transaction_id(tx)
+                self._processed_tx_ids.add(tx_id)
+            
+            # Begrenzen der Größe von _processed_tx_ids, um Speicherverbrauch zu kontrollieren
+            if len(self._processed_tx_ids) > 10000:
+                # Behalte nur die letzten 5000 Transaktionen
+                self._processed_tx_ids = set(list(self._processed_tx_ids)[-5000:])
+                
+            # Add the newly mined block to the chain
+            self._append_block(block)
+            
+            # Remove the mined transactions; transactions added while mining stay pending
+            mined_tx_ids = {id(tx) for tx in pending}
+            self._set_pending([tx for tx in self.pending_transactions if id(tx) not in mined_tx_ids])
+            
+            # Check if we need to adjust difficulty
+            self._adjust_difficulty()
         
-        # Create new block and mine it
-        block = Block(
-            index=len(self.chain),
-            timestamp=time.time(),
-            transactions=self.pending_transactions.copy(),  # Make a copy to avoid race conditions
-            previous_hash=self.get_latest_block().hash
-        )
+        return block
+    
+    def notify_tip_changed(self) -> None:
+        """
+        Signalisiert allen laufenden Mining-Versuchen, dass sich der Chain-Tip geändert hat
         
-        # Add transaction IDs to processed set to prevent double-spending
-        for tx in self.pending_transactions:
-            tx_id = self.generate_transaction_id(tx)
-            self._processed_tx_ids.add(tx_id)
+        Die Versuche brechen innerhalb weniger Millisekunden ab und bauen ihr
+        Block-Template auf dem neuen Tip neu auf.
+        """
+        with self._chain_lock:
+            for cancel_event in self._mining_cancel_events:
+                cancel_event.set()
+                
+    def common_prefix_length(self, block_hashes: List[str]) -> int:
+        """
+        Länge des gemeinsamen Präfixes der lokalen Kette mit einer Kette aus block_hashes
         
-        # Begrenzen der Größe von _processed_tx_ids, um Speicherverbrauch zu kontrollieren
-        if len(self._processed_tx_ids) > 10000:
-            # Behalte nur die letzten 5000 Transaktionen
-            self._processed_tx_ids = set(list(self._processed_tx_ids)[-5000:])
+        Da Blöcke über previous_hash verkettet sind, reicht die Suche vom Ende her:
+        der erste übereinstimmende Hash schließt alle Vorgänger ein. Kosten O(Fork-Tiefe).
+        """
+        with self._chain_lock:
+            height = min(len(block_hashes), len(self.chain))
+            while height > 0 and block_hashes[height - 1] != self.chain[height - 1].hash:
+                height -= 1
+            return height
             
-        block.mine_block(self.difficulty)
+    def replace_chain(self, new_chain: List[Block]) -> None:
+        """
+        Ersetzt die lokale Kette (z.B. nach Konsensus) und bricht laufendes Mining ab
         
-        # Add the newly mined block to the chain
-        self.chain.append(block)
+        Nur der abweichende Teil wird verarbeitet (siehe reorganize).
         
-        # Reset the pending transactions
-        self.pending_transactions = []
+        Args:
+            new_chain: Die neue Liste von Blöcken inklusive Genesis-Block
+        """
+        with self._chain_lock:
+            common = self.common_prefix_length([block.hash for block in new_chain])
+            self.reorganize(common, new_chain[common:])
+            
+    def reorganize(self, common: int, new_blocks: List[Block]) -> None:
+        """
+        Rollt die Kette bis zur Länge common zurück und hängt new_blocks an
         
-        # Check if we need to adjust difficulty
-        self._adjust_difficulty()
+        MMR, Indizes (über ihre Undo-Daten), verarbeitete Transaktions-IDs und
+        Mempool werden nur für die entfernten und neuen Blöcke angepasst; die
+        Kosten hängen von der Fork-Tiefe ab, nicht von der Kettenlänge.
+        Transaktionen aus entfernten Blöcken, die nicht in new_blocks enthalten
+        sind, kehren in den Mempool zurück, sofern sie noch gedeckt sind.
         
-        return block
+        Args:
+            common: Länge des gemeinsamen Präfixes (siehe common_prefix_length)
+            new_blocks: Blöcke der neuen Kette ab Höhe common
+        """
+        with self._chain_lock:
+            reverted = self.chain[common:]
+            
+            # Gemeinsamen Präfix in der MMR behalten, nur den abweichenden Teil neu anhängen
+            self.header_mmr.truncate(min(common, self.header_mmr.leaf_count))
+            for block in new_blocks:
+                block.compact()
+                self.header_mmr.append(block.hash)
+                
+            # Indizes über ihre Undo-Daten zurückrollen und nur die neuen Blöcke anwenden
+            current = [index for index in self._chain_indexes if index.is_current(self.chain)]
+            del self.chain[common:]
+            self.chain.extend(new_blocks)
+            for index in current:
+                index.reorganize(common, new_blocks, self.chain)
+                
+            # Verarbeitete Transaktions-IDs wie beim Mining fortschreiben
+            included_ids = set()
+            for block in reverted:
+                for tx in block.iter_transactions():
+                    self._processed_tx_ids.discard(self.generate_transaction_id(tx))
+            for block in new_blocks:
+                for tx in block.iter_transactions():
+                    self._processed_tx_ids.add(self.generate_transaction_id(tx))
+                    if 'id' in tx:
+                        included_ids.add(tx['id'])
+                        
+            # Mempool: neu bestätigte Transaktionen entfernen, verwaiste zurückholen
+            self._set_pending([tx for tx in self.pending_transactions
+                               if 'id' in tx and tx['id'] not in included_ids])
+            pending_ids = {tx['id'] for tx in self.pending_transactions}
+            for block in reverted:
+                for tx in block.iter_transactions():
+                    if (tx.get('type') == 'reward' or 'id' not in tx or tx['id'] in included_ids
+                            or tx['id'] in pending_ids):
+                        continue
+                    sender = tx.get('from')
+                    if sender not in ("network", "genesis") and self.get_spendable_balance(sender) < tx['amount']:
+                        continue
+                    self.pending_transactions.append(tx)
+                    self.pending_ledger.add(tx)
+                    pending_ids.add(tx['id'])
+                    
+            self.notify_tip_changed()
+            
+        logger.info(f"Chain reorganized at height {common}: {len(reverted)} blocks reverted, "
+                    f"{len(new_blocks)} applied, new length {len(self.chain)}")
     
     def _adjust_difficulty(self) -> None:
         """Adjust mining difficulty based on block time"""
@@ -523,7 +1629,8 @@ class Blockchain:
         
         self.last_difficulty_adjustment_time = current_time
         
-    def start_continuous_mining(self, miner_address: str, callback: Optional[Callable] = None, sync_callback: Optional[Callable] = None) -> None:
+    def start_continuous_mining(self, miner_address: str, callback: Optional[Callable] = None,
+                                sync_callback: Optional[Callable] = None, workers: Optional[int] = None) -> None:
         """
         Start continuous mining in a background thread
         
@@ -531,6 +1638,7 @@ class Blockchain:
             miner_address: Address to receive mining rewards
             callback: Optional callback function called when a new block is mined
             sync_callback: Optional callback to synchronize with network before mining
+            workers: Anzahl der Mining-Prozesse (1 = Mining im Thread selbst, None = unverändert)
         """
         if self._mining_thread and self._mining_thread.is_alive():
             logger.warning("Mining already in progress")
@@ -540,6 +1648,8 @@ class Blockchain:
         self._stop_mining.clear()
         self.mining_callback = callback
         self._sync_callback = sync_callback
+        if workers is not None:
+            self.set_mining_workers(workers)
         
         def mining_thread():
             logger.info(f"Starting continuous mining with difficulty {self.difficulty}")
@@ -563,8 +1673,17 @@ class Blockchain:
                     if not self.pending_transactions:
                         self.add_transaction("network", miner_address, 0, {"type": "empty"})
                         
-                    # Mine a block
-                    block = self.mine_pending_transactions(miner_address)
+                    # Mine a block; the token is set on stop or when a competing block replaces the tip
+                    cancel_event = threading.Event()
+                    self._continuous_cancel_event = cancel_event
+                    if self._stop_mining.is_set():
+                        break
+                    block = self.mine_pending_transactions(miner_address, cancel_event=cancel_event)
+                    
+                    if block is None:
+                        # Template auf dem neuen Tip sofort neu aufbauen
+                        logger.debug("Mining attempt aborted, rebuilding block template")
+                        continue
                     
                     # Call the callback if provided
                     if self.mining_callback:
@@ -592,10 +1711,29 @@ class Blockchain:
         logger.info("Stopping mining...")
         print("Stopping mining...")
         self._stop_mining.set()
+        if self._continuous_cancel_event is not None:
+            self._continuous_cancel_event.set()
         self._mining_thread.join(timeout=2.0)
         logger.info("Mining stopped")
         print("Mining stopped")
         
+    def set_mining_workers(self, workers: Optional[int]) -> None:
+        """
+        Konfiguriert die Anzahl der Mining-Prozesse
+        
+        Args:
+            workers: Anzahl der Worker-Prozesse, None oder 1 deaktiviert die MiningEngine
+        """
+        if self._mining_engine is not None:
+            if workers == self._mining_engine.workers:
+                return
+            self._mining_engine.shutdown()
+            self._mining_engine = None
+            
+        if workers is not None and workers > 1:
+            self._mining_engine = MiningEngine(workers=workers)
+            logger.info(f"Mining mit {workers} Worker-Prozessen aktiviert")
+        
     def add_transaction(self, sender: str, recipient: str, amount: float, metadata: Optional[Dict[str, Any]] = None) -> Union[str, bool]:
         """
         Add a new transaction to the list of pending transactions
@@ -605,13 +1743,6 @@ class Blockchain:
             logger.warning(f"Rejected negative amount transaction: {amount}")
             return False
             
-        if sender != "network" and sender != "genesis":  # Network and genesis can create coins
-            # Check if sender has enough balance
-            balance = self.get_balance(sender)
-            if balance < amount:
-                logger.warning(f"Rejected transaction from {sender}: insufficient funds")
-                return False
-        
         transaction = {
             "from": sender,
             "to": recipient,
@@ -627,15 +1758,23 @@ class Blockchain:
         # Generate transaction ID
         tx_id = self.generate_transaction_id(transaction)
         
-        # Check for double spending
-        if tx_id in self._processed_tx_ids:
-            logger.warning(f"Rejected duplicate transaction: {tx_id}")
-            return False
+        with self._chain_lock:
+            if sender != "network" and sender != "genesis":  # Network and genesis can create coins
+                # Check if sender has enough balance, including spends already waiting in the mempool
+                if self.get_spendable_balance(sender) < amount:
+                    logger.warning(f"Rejected transaction from {sender}: insufficient funds")
+                    return False
+                    
+            # Check for double spending
+            if tx_id in self._processed_tx_ids:
+                logger.warning(f"Rejected duplicate transaction: {tx_id}")
+                return False
+                
+            # Add transaction ID to the transaction
+            transaction["id"] = tx_id
             
-        # Add transaction ID to the transaction
-        transaction["id"] = tx_id
-        
-        self.pending_transactions.append(transaction)
+            self.pending_transactions.append(transaction)
+            self.pending_ledger.add(transaction)
         logger.info(f"Added transaction: {tx_id} - {sender} -> {recipient}: {amount}")
         
         return tx_id
@@ -644,48 +1783,71 @@ class Blockchain:
         """
         Calculate the balance of a given address
         """
-        balance = 0
-        
-        # Check all blocks in the blockchain
-        for block in self.chain:
-            for transaction in block.transactions:
-                if transaction["from"] == address:
-                    balance -= transaction["amount"]
-                if transaction["to"] == address:
-                    balance += transaction["amount"]
-                    
-        return balance
+        # O(1) über den Balance-Index statt Durchlauf aller Blöcke
+        self._ensure_indexes()
+        return self.balance_index.get(address)
     
-    def is_chain_valid(self) -> bool:
+    def get_balance_at(self, address: str, height: int) -> float:
         """
-        Check if the blockchain is valid
+        Kontostand einer Adresse nach dem Block height
+        
+        Kostet einen Snapshot-Zugriff plus die Transaktionen der Adresse in den
+        höchstens balance_snapshot_interval Blöcken danach (ohne Snapshots: in
+        der gesamten Kette bis height).
+        
+        Raises:
+            IndexError: Wenn height außerhalb der Kette liegt
         """
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
-            
-            # Check if the current block's hash is correct
-            if current_block.hash != current_block.calculate_hash():
-                logger.error(f"Invalid hash in block {i}")
-                return False
+        with self._chain_lock:
+            if not 0 <= height < len(self.chain):
+                raise IndexError(f"Block height {height} out of range")
+            self._ensure_indexes()
+            base, snapshot = self.balance_index.snapshot_before(height + 1)
+            balance = snapshot.get(address, 0)
+            # Gleiche Reihenfolge der Buchungen wie im Balance-Index, damit die Werte exakt übereinstimmen
+            for block_height, position in self.address_index.between(address, base, height + 1):
+                tx = self.chain[block_height].transaction_at(position)
+                if tx.get("from") == address:
+                    balance -= tx["amount"]
+                if tx.get("to") == address:
+                    balance += tx["amount"]
+            return balance
             
-            # Check if the current block points to the correct previous hash
-            if current_block.previous_hash != previous_block.hash:
-                logger.error(f"Invalid previous hash in block {i}")
-                return False
-                
-            # Verify the merkle root
-            if current_block.merkle_root != MerkleTree.create_merkle_root(current_block.transactions):
-                logger.error(f"Invalid merkle root in block {i}")
-                return False
+    def get_spendable_balance(self, address: str) -> float:
+        """
+        Bestätigter Stand abzüglich der Belastungen, die noch im Mempool warten
+        """
+        with self._chain_lock:
+            self._ensure_indexes()
+            return self.balance_index.get(address) - self.pending_ledger.debit(address)
             
-            # Verify the proof of work
-            if current_block.hash[:current_block.difficulty] != '0' * current_block.difficulty:
-                logger.error(f"Invalid proof of work in block {i}")
-                return False
+    def get_balance_details(self, address: str) -> Dict[str, float]:
+        """
+        Bestätigter und verfügbarer Stand sowie ausstehende Beträge einer Adresse
+        """
+        with self._chain_lock:
+            self._ensure_indexes()
+            confirmed = self.balance_index.get(address)
+            debit = self.pending_ledger.debit(address)
+            return {
+                'confirmed': confirmed,
+                'pending_debit': debit,
+                'pending_credit': self.pending_ledger.credit(address),
+                'spendable': confirmed - debit
+            }
+    
+    def is_chain_valid(self, full: bool = True, verifier: Optional[ParallelVerifier] = None) -> bool:
+        """
+        Check if the blockchain is valid
         
-        logger.info("Blockchain validation complete: valid")
-        return True
+        Standardmäßig wird die gesamte Kette neu geprüft, mit full=False nur
+        die seit der letzten Validierung angehängten Blöcke. Mit einem verifier
+        werden die blockinternen Prüfungen auf dessen Worker-Prozesse verteilt.
+        """
+        is_valid, _ = self.comprehensive_validation(full, verifier)
+        if is_valid:
+            logger.info("Blockchain validation complete: valid")
+        return is_valid
         
     def set_difficulty(self, difficulty: int) -> None:
         """Set the mining difficulty manually"""
@@ -702,18 +1864,59 @@ class Blockchain:
             "chain_length": len(self.chain),
             "pending_transactions": len(self.pending_transactions),
             "mining_active": self._mining_thread is not None and self._mining_thread.is_alive(),
+            "mining_workers": self._mining_engine.workers if self._mining_engine else 1,
             "target_block_time": self.target_block_time,
             "last_block_time": time.time() - self.chain[-1].timestamp if len(self.chain) > 0 else 0
         }
+        stats.update(self.mining_telemetry.snapshot())
         logger.debug(f"Mining stats: {stats}")
         return stats
         
     def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
-        """Get a block by its hash"""
-        for block in self.chain:
-            if block.hash == block_hash:
-                return block
-        return None
+        """Get a block by its hash (O(1) über den Location-Index)"""
+        with self._chain_lock:
+            self._ensure_indexes()
+            height = self.location_index.height_of(block_hash)
+            return None if height is None else self.chain[height]
+            
+    def _lookup_store(self, index: Any) -> Optional[SqliteBlockStore]:
+        """
+        SQLite-Store für Punktabfragen, solange index noch nicht aufgebaut ist
+        
+        Nach dem Laden eines Checkpoints beantwortet die Datenbank Abfragen,
+        ohne dass dafür alle Transaktionen dekodiert werden. Voraussetzung ist,
+        dass sie genau die Blöcke der Kette enthält.
+        """
+        store = self.block_store
+        if not isinstance(store, SqliteBlockStore) or index.is_current(self.chain):
+            return None
+        return store if store.in_sync_with(self.chain) else None
+        
+    def get_transaction(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Sucht eine bestätigte Transaktion anhand ihrer ID
+        
+        Returns:
+            Kopie der Transaktion mit Block, Block-Hash, Position und Bestätigungen oder None
+        """
+        with self._chain_lock:
+            store = self._lookup_store(self.location_index)
+            if store is not None:
+                location = store.transaction_location(tx_id)
+            else:
+                self._ensure_indexes()
+                location = self.location_index.locate(tx_id)
+            if location is None:
+                return None
+            height, position = location
+            block = self.chain[height]
+            tx_copy = dict(block.transaction_at(position))
+            tx_copy["block"] = block.index
+            tx_copy["block_hash"] = block.hash
+            tx_copy["position"] = position
+            tx_copy["confirmed_time"] = block.timestamp
+            tx_copy["confirmations"] = len(self.chain) - height
+            return tx_copy
         
     def get_block_by_index(self, index: int) -> Optional[Block]:
         """Get a block by its index"""
@@ -723,15 +1926,53 @@ class Blockchain:
         
     def get_transaction_history(self, address: str) -> List[Dict[str, Any]]:
         """Get all transactions involving the given address"""
-        transactions = []
-        for block in self.chain:
-            for tx in block.transactions:
-                if tx["from"] == address or tx["to"] == address:
-                    tx_copy = tx.copy()
-                    tx_copy["block"] = block.index
-                    tx_copy["confirmed_time"] = block.timestamp
-                    transactions.append(tx_copy)
-        return transactions
+        return self.get_transaction_history_page(address)[0]
+        
+    def get_transaction_history_page(self, address: str, limit: Optional[int] = None,
+                                     cursor: Optional[str] = None,
+                                     newest_first: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Eine Seite der Transaktionshistorie einer Adresse über den Adress-Index
+        (bzw. den SQLite-Store, solange der Index noch nicht aufgebaut ist)
+        
+        Args:
+            address: Adresse
+            limit: Maximale Anzahl an Transaktionen, None für alle
+            cursor: next_cursor der vorherigen Seite
+            newest_first: Neueste Transaktionen zuerst
+            
+        Returns:
+            (Transaktionen, next_cursor oder None auf der letzten Seite)
+        """
+        after = None
+        if cursor:
+            try:
+                height, position = cursor.split(":")
+                after = (int(height), int(position))
+            except ValueError:
+                raise ValueError(f"Invalid history cursor {cursor!r}")
+                
+        with self._chain_lock:
+            store = self._lookup_store(self.address_index)
+            if store is not None:
+                postings = store.address_postings(address, None if limit is None else limit + 1,
+                                                  after, newest_first)
+            else:
+                self._ensure_indexes()
+                postings = self.address_index.page(address, None if limit is None else limit + 1,
+                                                   after, newest_first)
+            has_more = limit is not None and len(postings) > limit
+            postings = postings[:limit] if has_more else postings
+            transactions = []
+            for height, position in postings:
+                block = self.chain[height]
+                tx_copy = dict(block.transaction_at(position))
+                tx_copy["block"] = block.index
+                tx_copy["confirmed_time"] = block.timestamp
+                transactions.append(tx_copy)
+                
+        next_cursor = f"{postings[-1][0]}:{postings[-1][1]}" if has_more else None
+        return transactions, next_cursor
         
     def initialize_contract_engine(self):
         """Initialisiert die Smart Contract Engine"""
@@ -762,7 +2003,7 @@ class Blockchain:
             
         # Prüfe, ob der Owner genug Guthaben hat (falls initial_balance > 0)
         if initial_balance > 0:
-            owner_balance = self.get_balance(owner)
+            owner_balance = self.get_spendable_balance(owner)
             if owner_balance < initial_balance:
                 raise ValueError(f"Unzureichendes Guthaben: {owner} hat nur {owner_balance}, benötigt {initial_balance}")
                 
@@ -803,7 +2044,7 @@ class Blockchain:
             
         # Prüfe, ob der Sender genug Guthaben hat (falls value > 0)
         if value > 0:
-            sender_balance = self.get_balance(sender)
+            sender_balance = self.get_spendable_balance(sender)
             if sender_balance < value:
                 raise ValueError(f"Unzureichendes Guthaben: {sender} hat nur {sender_balance}, benötigt {value}")
                 
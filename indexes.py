@@ -0,0 +1,302 @@
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+# Indizes über die Kette, die beim Anhängen eines Blocks fortgeschrieben und bei
+# einem Kettenwechsel zurückgerollt werden. height und tip_hash beschreiben den
+# zuletzt angewendeten Block; weicht die Kette davon ab, baut der Aufrufer den
+# Index neu auf (siehe Blockchain._ensure_indexes).
+
+
+class ChainIndex:
+    """
+    Basisklasse für Indizes, die der Kette Block für Block folgen
+
+    Unterklassen implementieren _reset, _apply (liefert Undo-Daten) und _revert;
+    während _revert zeigt tip_hash noch auf den zurückgenommenen Block.
+    Undo-Daten werden für die letzten UNDO_DEPTH Blöcke gehalten; ein tieferer
+    Kettenwechsel führt zu einem Neuaufbau.
+    """
+    UNDO_DEPTH = 256
+
+    def __init__(self):
+        self.height = 0
+        self.tip_hash: Optional[str] = None
+        # Pro Block: (Hash des Vorgängers, Undo-Daten der Unterklasse)
+        self._undo: Deque[Tuple[Optional[str], Any]] = deque(maxlen=self.UNDO_DEPTH)
+        self._reset()
+
+    def _reset(self) -> None:
+        raise NotImplementedError
+
+    def _apply(self, block: Any, height: int) -> Any:
+        raise NotImplementedError
+
+    def _revert(self, undo: Any, height: int) -> None:
+        raise NotImplementedError
+
+    def is_current(self, chain: Any) -> bool:
+        """Prüft, ob der Index genau bis zum Tip von chain fortgeschrieben ist"""
+        return self.height == len(chain) and (not chain or chain[-1].hash == self.tip_hash)
+
+    def apply_block(self, block: Any) -> None:
+        """Nimmt einen angehängten Block in den Index auf"""
+        self._undo.append((self.tip_hash, self._apply(block, self.height)))
+        self.height += 1
+        self.tip_hash = block.hash
+
+    def revert_block(self) -> None:
+        """Nimmt den zuletzt angewendeten Block zurück"""
+        if not self._undo:
+            raise ValueError("No undo information left for reverting")
+        previous_tip, undo = self._undo.pop()
+        self.height -= 1
+        self._revert(undo, self.height)
+        self.tip_hash = previous_tip
+
+    def can_revert_to(self, height: int) -> bool:
+        return self.height - len(self._undo) <= height <= self.height
+
+    def reorganize(self, common: int, new_blocks: Iterable[Any], chain: Any) -> None:
+        """
+        Rollt bis zur Höhe common zurück und wendet new_blocks an
+
+        Args:
+            common: Länge des gemeinsamen Präfixes von alter und neuer Kette
+            new_blocks: Blöcke der neuen Kette ab common
+            chain: Vollständige neue Kette für den Neuaufbau, falls das Zurückrollen nicht reicht
+        """
+        if not self.can_revert_to(common):
+            self.rebuild(chain)
+            return
+        while self.height > common:
+            self.revert_block()
+        for block in new_blocks:
+            self.apply_block(block)
+
+    def rebuild(self, chain: Iterable[Any]) -> None:
+        """Baut den Index aus der gesamten Kette neu auf"""
+        self.height = 0
+        self.tip_hash = None
+        self._undo.clear()
+        self._reset()
+        for block in chain:
+            self.apply_block(block)
+
+
+class BalanceIndex(ChainIndex):
+    """
+    Kontostände aller Adressen
+
+    Jeder Block wird genau einmal angewendet (O(Transaktionen)), Abfragen kosten
+    O(1). Als Undo-Daten dienen die vorherigen Werte der berührten Adressen,
+    damit ein Kettenwechsel exakt (ohne Rundungsreste) zurückgerollt wird.
+
+    Mit snapshot_interval K wird alle K Blöcke eine vollständige Kopie aller
+    Stände gehalten. Snapshots werden nur beim Zurückrollen entfernt, der Speicher
+    wächst also mit etwa Adressen * Höhe / K Einträgen; ein größeres K spart
+    Speicher auf Kosten längerer Abfragen. Historische Stände ergeben sich aus dem
+    Snapshot plus den Transaktionen der höchstens K folgenden Blöcke (siehe
+    Blockchain.get_balance_at). Ohne K (None oder 0) gibt es nur den leeren
+    Snapshot bei Höhe 0.
+    """
+
+    def __init__(self, snapshot_interval: Optional[int] = None):
+        self.snapshot_interval = snapshot_interval
+        super().__init__()
+
+    def _reset(self) -> None:
+        self.balances: Dict[str, float] = {}
+        # Kettenlänge → Stände nach allen Blöcken davor
+        self.snapshots: Dict[int, Dict[str, float]] = {0: {}}
+
+    def get(self, address: str) -> float:
+        return self.balances.get(address, 0)
+
+    def snapshot_before(self, length: int) -> Tuple[int, Dict[str, float]]:
+        """
+        Letzter Snapshot für eine Kettenlänge
+
+        Returns:
+            (Kettenlänge des Snapshots <= length, Stände)
+        """
+        base = length - length % self.snapshot_interval if self.snapshot_interval else 0
+        return base, self.snapshots[base]
+
+    def _apply(self, block: Any, height: int) -> Dict[str, Optional[float]]:
+        balances = self.balances
+        undo: Dict[str, Optional[float]] = {}
+        for tx in block.iter_transactions():
+            amount = tx["amount"]
+            for address, delta in ((tx.get("from"), -amount), (tx.get("to"), amount)):
+                if address is None:
+                    continue
+                if address not in undo:
+                    undo[address] = balances.get(address)
+                balances[address] = balances.get(address, 0) + delta
+        if self.snapshot_interval and (height + 1) % self.snapshot_interval == 0:
+            self.snapshots[height + 1] = dict(balances)
+        return undo
+
+    def _revert(self, undo: Dict[str, Optional[float]], height: int) -> None:
+        self.snapshots.pop(height + 1, None)
+        for address, previous in undo.items():
+            if previous is None:
+                self.balances.pop(address, None)
+            else:
+                self.balances[address] = previous
+
+
+class AddressIndex(ChainIndex):
+    """
+    Invertierter Index von Adressen auf (Höhe, Position) ihrer Transaktionen
+
+    Die Postings einer Adresse sind aufsteigend sortiert, da Blöcke nur am Ende
+    angehängt werden. Eine Seite der Historie kostet damit O(log n + Ergebnisse),
+    unabhängig von der Kettenlänge. Beim Zurückrollen werden die Postings der
+    berührten Adressen am Ende entfernt.
+    """
+
+    def _reset(self) -> None:
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+
+    def _apply(self, block: Any, height: int) -> Tuple[str, ...]:
+        touched = {}
+        for position, tx in enumerate(block.iter_transactions()):
+            for address in (tx.get("from"), tx.get("to")):
+                if address is None:
+                    continue
+                postings = self.postings.setdefault(address, [])
+                # Überweisungen an sich selbst nur einmal eintragen
+                if not postings or postings[-1] != (height, position):
+                    postings.append((height, position))
+                touched[address] = None
+        return tuple(touched)
+
+    def _revert(self, touched: Tuple[str, ...], height: int) -> None:
+        for address in touched:
+            postings = self.postings[address]
+            while postings and postings[-1][0] >= height:
+                postings.pop()
+            if not postings:
+                del self.postings[address]
+
+    def between(self, address: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """Postings einer Adresse in den Blöcken start <= Höhe < end"""
+        postings = self.postings.get(address, [])
+        return postings[bisect_left(postings, (start, -1)):bisect_left(postings, (end, -1))]
+
+    def page(self, address: str, limit: Optional[int] = None, after: Optional[Tuple[int, int]] = None,
+             newest_first: bool = False) -> List[Tuple[int, int]]:
+        """
+        Eine Seite von Postings einer Adresse
+
+        Args:
+            address: Adresse
+            limit: Maximale Anzahl, None für alle
+            after: Letztes Posting der vorherigen Seite (Cursor)
+            newest_first: Bei True absteigend nach Höhe und Position
+        """
+        postings = self.postings.get(address, [])
+        if newest_first:
+            end = len(postings) if after is None else bisect_left(postings, after)
+            start = 0 if limit is None else max(0, end - limit)
+            return postings[start:end][::-1]
+        start = 0 if after is None else bisect_right(postings, after)
+        end = len(postings) if limit is None else start + limit
+        return postings[start:end]
+
+
+class LocationIndex(ChainIndex):
+    """
+    Block-Hash → Höhe und Transaktions-ID → (Höhe, Position)
+
+    Für Explorer und Wallets, die Blöcke und bestätigte Transaktionen in O(1)
+    nachschlagen. Kommt eine ID mehrfach vor, gilt das erste Vorkommen.
+    """
+
+    def _reset(self) -> None:
+        self.block_heights: Dict[str, int] = {}
+        self.tx_locations: Dict[str, Tuple[int, int]] = {}
+
+    def _apply(self, block: Any, height: int) -> Tuple[Optional[int], Tuple[str, ...]]:
+        previous_height = self.block_heights.get(block.hash)
+        self.block_heights[block.hash] = height
+        added = []
+        for position, tx in enumerate(block.iter_transactions()):
+            tx_id = tx.get("id")
+            if tx_id is not None and tx_id not in self.tx_locations:
+                self.tx_locations[tx_id] = (height, position)
+                added.append(tx_id)
+        return previous_height, tuple(added)
+
+    def _revert(self, undo: Tuple[Optional[int], Tuple[str, ...]], height: int) -> None:
+        previous_height, added = undo
+        block_hash = self.tip_hash
+        if previous_height is None:
+            self.block_heights.pop(block_hash, None)
+        else:
+            self.block_heights[block_hash] = previous_height
+        for tx_id in added:
+            del self.tx_locations[tx_id]
+
+    def height_of(self, block_hash: str) -> Optional[int]:
+        return self.block_heights.get(block_hash)
+
+    def locate(self, tx_id: str) -> Optional[Tuple[int, int]]:
+        return self.tx_locations.get(tx_id)
+
+
+class PendingLedger:
+    """
+    Ausstehende Belastungen und Gutschriften pro Adresse im Mempool
+
+    Wird beim Aufnehmen und Entfernen von Transaktionen aus pending_transactions
+    fortgeschrieben. Der verfügbare Betrag einer Adresse ist damit in O(1)
+    bestimmbar: bestätigter Stand minus ausstehende Belastungen. Ausstehende
+    Gutschriften zählen nicht, da sie noch nicht bestätigt sind.
+    """
+
+    def __init__(self):
+        self.debits: Dict[str, float] = {}
+        self.credits: Dict[str, float] = {}
+        # Anzahl der Transaktionen pro Adresse; bei 0 wird der Eintrag entfernt,
+        # damit keine Rundungsreste übrig bleiben
+        self._counts: Dict[str, int] = {}
+        self.count = 0
+
+    def _book(self, address: Optional[str], totals: Dict[str, float], amount: float, direction: int) -> None:
+        if address is None:
+            return
+        remaining = self._counts.get(address, 0) + direction
+        if remaining <= 0:
+            self._counts.pop(address, None)
+            self.debits.pop(address, None)
+            self.credits.pop(address, None)
+            return
+        self._counts[address] = remaining
+        totals[address] = totals.get(address, 0) + amount * direction
+
+    def add(self, tx: Dict[str, Any]) -> None:
+        self._book(tx.get("from"), self.debits, tx["amount"], 1)
+        self._book(tx.get("to"), self.credits, tx["amount"], 1)
+        self.count += 1
+
+    def remove(self, tx: Dict[str, Any]) -> None:
+        self._book(tx.get("from"), self.debits, tx["amount"], -1)
+        self._book(tx.get("to"), self.credits, tx["amount"], -1)
+        self.count -= 1
+
+    def debit(self, address: str) -> float:
+        return self.debits.get(address, 0)
+
+    def credit(self, address: str) -> float:
+        return self.credits.get(address, 0)
+
+    def rebuild(self, transactions: Iterable[Dict[str, Any]]) -> None:
+        self.debits = {}
+        self.credits = {}
+        self._counts = {}
+        self.count = 0
+        for tx in transactions:
+            self.add(tx)
@@ -3,27 +3,31 @@ import argparse
 import sys
 import os
 import json
+import time
 from typing import Dict, Any, List, Optional
 import requests
 import socket
 
 from blockchain import Blockchain
+from storage import DEFAULT_STORE_TYPE, STORE_TYPES
+from archive import COMPRESSIONS
 from wallet import Wallet
 from node import Node
+import benchmark
 
 
 class CryptoCoin:
-    def __init__(self):
-        self.blockchain = Blockchain()
+    def __init__(self, store_type: str = DEFAULT_STORE_TYPE, balance_snapshot_interval: Optional[int] = None):
+        self.blockchain = Blockchain(store_type=store_type, balance_snapshot_interval=balance_snapshot_interval)
         self.wallet = Wallet()
         self.node = None
         self.wallet_created = False
         self.node_url = None
         
-    def start_node(self, host: str = '0.0.0.0', port: int = 5000) -> None:
+    def start_node(self, host: str = '0.0.0.0', port: int = 5000, validation_workers: Optional[int] = None) -> None:
         """Start a blockchain node"""
         # Verwenden der bestehenden Blockchain-Instanz für den Knoten
-        self.node = Node(host, port, blockchain=self.blockchain)
+        self.node = Node(host, port, blockchain=self.blockchain, validation_workers=validation_workers)
         self.node.start()
         self.node_url = f"http://{host}:{port}"
         # Removed duplicated print statement, now only printed once
@@ -146,7 +150,10 @@ class CryptoCoin:
             return
             
         print("Mining pending transactions...")
-        self.blockchain.mine_pending_transactions(address)
+        block = self.blockchain.mine_pending_transactions(address)
+        if block is None:
+            print("Mining aborted because the chain tip changed.")
+            return
         print(f"Block mined! Reward sent to {address}")
         
     def print_chain(self) -> None:
@@ -188,7 +195,7 @@ class CryptoCoin:
             print(f"Hash: {block.hash}")
             print(f"Nonce: {block.nonce}")
             print("Transactions:")
-            for tx in block.transactions:
+            for tx in block.iter_transactions():
                 print(f"  From: {tx['from']} To: {tx['to']} Amount: {tx['amount']}")
             print("------------------------------")
         print("===============================\n")
@@ -209,7 +216,7 @@ class CryptoCoin:
             
         return None
     
-    def start_mining(self, address: str) -> None:
+    def start_mining(self, address: str, workers: Optional[int] = None) -> None:
         """Start continuous mining process"""
         node_url = self._find_node_url()
         
@@ -217,15 +224,20 @@ class CryptoCoin:
             print("No node is running. Please start a node first.")
             return
             
+        payload = {"address": address}
+        if workers is not None:
+            payload["workers"] = workers
+            
         try:
             response = requests.post(f"{node_url}/mining/start", 
-                                   json={"address": address})
+                                   json=payload)
             
             if response.status_code == 200:
                 data = response.json()
                 print(data["message"])
                 print(f"Mining rewards will be sent to: {address}")
                 print(f"Current difficulty: {data['difficulty']}")
+                print(f"Mining workers: {data.get('workers', 1)}")
             else:
                 print(f"Error starting mining: {response.text}")
         except requests.RequestException as e:
@@ -267,6 +279,19 @@ class CryptoCoin:
                 print(f"Current difficulty: {stats['difficulty']}")
                 print(f"Chain length: {stats['chain_length']} blocks")
                 print(f"Pending transactions: {stats['pending_transactions']}")
+                if 'hashrate' in stats:
+                    hashrate = stats['hashrate']
+                    print(f"Mining workers: {stats.get('mining_workers', 1)}")
+                    print(f"Hashrate: {hashrate['1s']:.0f} H/s (1s), {hashrate['1m']:.0f} H/s (1m), "
+                          f"{hashrate['15m']:.0f} H/s (15m)")
+                    print(f"Total hashes: {stats['total_hashes']}")
+                    print(f"Blocks mined: {stats['blocks_mined']}")
+                    print(f"Nonces per block: {stats['last_block_nonces']} (last), "
+                          f"{stats['avg_nonces_per_block']:.0f} (avg)")
+                    print(f"Time to solution: {stats['last_time_to_solution']:.2f}s (last), "
+                          f"{stats['avg_time_to_solution']:.2f}s (avg)")
+                    print(f"Stale blocks: {stats['stale_blocks']}")
+                    print(f"Aborted attempts: {stats['aborted_attempts']}")
                 print("=============================\n")
             else:
                 print(f"Error getting mining stats: {response.text}")
@@ -306,7 +331,8 @@ class CryptoCoin:
             
             if response.status_code == 200:
                 print(response.json()["message"])
-                print("Die Blockchain wurde sicher pausiert. Du kannst jetzt Updates durchführen.")
+                if self._wait_for_checkpoint(node_url):
+                    print("Die Blockchain wurde sicher pausiert. Du kannst jetzt Updates durchführen.")
             else:
                 print(f"Fehler beim Pausieren der Blockchain: {response.text}")
         except requests.RequestException as e:
@@ -352,15 +378,37 @@ class CryptoCoin:
             response = requests.post(f"{node_url}/blockchain/checkpoint", 
                                    json={"reason": reason})
             
-            if response.status_code == 200:
+            if response.status_code in (200, 202):
                 print(response.json()["message"])
+                if response.status_code == 202 and self._wait_for_checkpoint(node_url):
+                    print("Checkpoint erfolgreich geschrieben")
             else:
                 print(f"Fehler beim Erstellen des Checkpoints: {response.text}")
         except requests.RequestException as e:
             print(f"Fehler bei der Verbindung zum Node: {e}")
             
-    def validate_blockchain(self) -> None:
-        """Führt eine vollständige Validierung der Blockchain durch"""
+    def _wait_for_checkpoint(self, node_url: str, poll_interval: float = 0.5) -> bool:
+        """Fragt den Status eines Hintergrund-Checkpoints ab, bis er abgeschlossen ist"""
+        while True:
+            status = requests.get(f"{node_url}/blockchain/checkpoint/status").json()
+            if status.get('state') == 'running':
+                total = status.get('blocks_total')
+                if total:
+                    print(f"Checkpoint: {status['blocks_written']}/{total} Blöcke geschrieben")
+                time.sleep(poll_interval)
+                continue
+            if status.get('state') == 'failed':
+                print(f"Fehler beim Schreiben des Checkpoints: {status.get('error')}")
+                return False
+            return True
+            
+    def validate_blockchain(self, full: bool = False) -> None:
+        """
+        Validiert die Blockchain des laufenden Nodes
+        
+        Args:
+            full: Gesamte Kette prüfen statt nur der Blöcke seit der letzten Validierung
+        """
         node_url = self._find_node_url()
         
         if not node_url:
@@ -368,7 +416,8 @@ class CryptoCoin:
             return
             
         try:
-            response = requests.get(f"{node_url}/blockchain/validate")
+            response = requests.get(f"{node_url}/blockchain/validate",
+                                    params={'full': 'true' if full else 'false'})
             
             if response.status_code == 200:
                 data = response.json()
@@ -383,6 +432,51 @@ class CryptoCoin:
         except requests.RequestException as e:
             print(f"Fehler bei der Verbindung zum Node: {e}")
 
+    def bench_mining(self, output: str, baseline: Optional[str] = None,
+                     threshold: float = benchmark.DEFAULT_REGRESSION_THRESHOLD) -> bool:
+        """
+        Führt die Mining-Benchmarks aus und vergleicht optional mit einem früheren Lauf
+        
+        Returns:
+            False, wenn eine Regression über dem Schwellwert gefunden wurde
+        """
+        print("Running mining benchmarks...")
+        results = benchmark.run_mining_benchmarks()
+        
+        memory = results.get("memory", {})
+        width = max(map(len, [*results["benchmarks"], *memory]), default=0)
+        
+        print("\n===== MINING BENCHMARKS =====")
+        for name, result in results["benchmarks"].items():
+            print(f"{name:<{width}} {result['ops_per_sec']:>14,.0f} ops/s  (best {result['best_seconds'] * 1000:.2f} ms)")
+        for name, size in memory.items():
+            print(f"{name:<{width}} {size:>14,.0f} bytes/block")
+        print("=============================\n")
+        
+        benchmark.save_results(results, output)
+        print(f"Results saved to {output}")
+        
+        if not baseline:
+            return True
+            
+        if not os.path.exists(baseline):
+            print(f"Baseline file not found: {baseline}")
+            return True
+            
+        comparisons = benchmark.compare_results(benchmark.load_results(baseline), results, threshold)
+        regressions = [c for c in comparisons if c["regression"]]
+        
+        print(f"\nComparison with {baseline} (threshold {threshold:.0%}):")
+        width = max((len(c["name"]) for c in comparisons), default=0)
+        for comparison in comparisons:
+            marker = "REGRESSION" if comparison["regression"] else "ok"
+            print(f"  {comparison['name']:<{width}} {comparison['change']:+.1%}  {marker}")
+            
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed beyond {threshold:.0%}")
+            return False
+        return True
+
 
 def print_help():
     """Print help information"""
@@ -405,9 +499,14 @@ Commands:
   mining-stats         Get mining statistics
   set-difficulty       Set mining difficulty
   print-chain          Print the blockchain
+  bench-mining         Benchmark hashing, mining and Merkle roots
+  export-checkpoint    Write a compressed checkpoint archive
+  import-checkpoint    Restore the blockchain from a checkpoint archive
   
 Examples:
   python main.py start-node --port 5000
+  python main.py start-node --port 5000 --store sqlite
+  python main.py start-node --port 5000 --balance-snapshot-interval 5000
   python main.py create-wallet
   python main.py save-wallet --file mywallet.json
   python main.py load-wallet --file mywallet.json
@@ -415,10 +514,14 @@ Examples:
   python main.py send --from 1D3f... --to 1Ab2... --amount 10 --key [private-key]
   python main.py mine --address 1D3f...
   python main.py start-mining --address 1D3f...
+  python main.py start-mining --address 1D3f... --workers 4
   python main.py stop-mining
   python main.py mining-stats
   python main.py set-difficulty --difficulty 5
   python main.py print-chain
+  python main.py bench-mining --output bench.json --baseline previous.json
+  python main.py export-checkpoint --file backup.carc --compression lzma
+  python main.py import-checkpoint --file backup.carc
     """)
 
 
@@ -435,8 +538,19 @@ def main():
     parser.add_argument('--amount', type=float, help='Amount to send')
     parser.add_argument('--key', type=str, help='Private key')
     parser.add_argument('--difficulty', type=int, help='Mining difficulty')
+    parser.add_argument('--workers', type=int, help='Number of mining or validation processes')
     parser.add_argument('--reason', type=str, help='Grund für Checkpoint oder Pause')
     parser.add_argument('--skip-validation', action='store_true', help='Validierung überspringen')
+    parser.add_argument('--full', action='store_true', help='Gesamte Kette validieren, nicht nur neue Blöcke')
+    parser.add_argument('--output', type=str, help='Output file for benchmark results')
+    parser.add_argument('--baseline', type=str, help='Previous benchmark results to compare against')
+    parser.add_argument('--store', choices=sorted(STORE_TYPES), default=DEFAULT_STORE_TYPE,
+                        help='Persistence engine for checkpoints')
+    parser.add_argument('--compression', choices=sorted(COMPRESSIONS), default='zlib',
+                        help='Compression for checkpoint archives')
+    parser.add_argument('--balance-snapshot-interval', type=int,
+                        help='Blocks between balance snapshots for historical queries (0 disables snapshots)')
+    parser.add_argument('--threshold', type=float, help='Relative slowdown reported as regression (e.g. 0.1)')
     
     if len(sys.argv) <= 1:
         print_help()
@@ -444,12 +558,12 @@ def main():
         
     args = parser.parse_args()
     
-    coin = CryptoCoin()
+    coin = CryptoCoin(store_type=args.store, balance_snapshot_interval=args.balance_snapshot_interval)
     
     if args.command == 'start-node':
         host = args.host or '0.0.0.0'
         port = args.port or 5000
-        coin.start_node(host, port)
+        coin.start_node(host, port, args.workers)
         print(f"Node started at http://{host}:{port}")
         try:
             print("Press Ctrl+C to stop the node")
@@ -469,8 +583,20 @@ def main():
         reason = args.reason or "Manual backup"
         coin.create_checkpoint(reason)
         
+    elif args.command == 'export-checkpoint':
+        if not args.file:
+            print("Error: --file parameter required")
+            sys.exit(1)
+        coin.blockchain.export_checkpoint(args.file, args.compression)
+        
+    elif args.command == 'import-checkpoint':
+        if not args.file:
+            print("Error: --file parameter required")
+            sys.exit(1)
+        coin.blockchain.import_checkpoint(args.file, validate=not args.skip_validation)
+        
     elif args.command == 'validate':
-        coin.validate_blockchain()
+        coin.validate_blockchain(args.full)
             
     elif args.command == 'create-wallet':
         coin.create_wallet()
@@ -509,7 +635,7 @@ def main():
         if not args.address:
             print("Error: --address parameter required")
             sys.exit(1)
-        coin.start_mining(args.address)
+        coin.start_mining(args.address, args.workers)
         
     elif args.command == 'stop-mining':
         coin.stop_mining()
@@ -526,6 +652,12 @@ def main():
     elif args.command == 'print-chain':
         coin.print_chain()
         
+    elif args.command == 'bench-mining':
+        output = args.output or "benchmark_results.json"
+        threshold = args.threshold if args.threshold is not None else benchmark.DEFAULT_REGRESSION_THRESHOLD
+        if not coin.bench_mining(output, args.baseline, threshold):
+            sys.exit(1)
+        
     else:
         print(f"Unknown command: {args.command}")
         print_help()
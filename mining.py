@@ -0,0 +1,357 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger('blockchain.mining')
+
+# Wie oft ein Worker prüft, ob seine Suche noch aktuell ist
+CANCEL_CHECK_INTERVAL = 2048
+
+# Wie lange der Koordinator maximal auf Worker wartet, bevor er das Abbruch-Token prüft
+CANCEL_POLL_INTERVAL = 0.005
+
+# Wie lange der Koordinator nach einer Suche auf die Zählerstände abgebrochener Bereiche wartet
+IN_FLIGHT_DRAIN_TIMEOUT = 1.0
+
+# Gemeinsamer Generationszähler, wird im Worker-Prozess durch _init_worker gesetzt
+_worker_generation = None
+
+
+class HeaderTemplate:
+    """
+    Vorberechnete Header-Bytes für schnelles Hashing beim Mining
+
+    Die kanonische JSON-Darstellung eines Blocks (wie in Block.calculate_hash)
+    wird einmal pro Block in die Bytes vor und nach der Nonce zerlegt. Ein mit
+    dem festen Präfix gefüttertes hashlib-Objekt wird pro Nonce nur kopiert,
+    die Hashes bleiben dabei Byte für Byte identisch zu calculate_hash.
+    """
+    __slots__ = ('_prefix_hash', '_suffix')
+
+    def __init__(self, index: int, timestamp: float, merkle_root: str, previous_hash: str):
+        canonical = json.dumps({
+            "index": index,
+            "timestamp": timestamp,
+            "merkle_root": merkle_root,
+            "previous_hash": previous_hash,
+            "nonce": None
+        }, sort_keys=True)
+        # Schlüssel werden sortiert und Strings escaped, der Platzhalter ist daher eindeutig
+        prefix, suffix = canonical.split('"nonce": null', 1)
+        self._prefix_hash = hashlib.sha256((prefix + '"nonce": ').encode())
+        self._suffix = suffix.encode()
+
+    @classmethod
+    def from_header(cls, header: Dict[str, Any]) -> 'HeaderTemplate':
+        """Erstellt ein Template aus einem Header-Dict ohne Nonce"""
+        return cls(header["index"], header["timestamp"], header["merkle_root"], header["previous_hash"])
+
+    def digest(self, nonce: int) -> bytes:
+        """Binärer SHA-256-Digest des Blocks für die gegebene Nonce"""
+        block_hash = self._prefix_hash.copy()
+        block_hash.update(b'%d%s' % (nonce, self._suffix))
+        return block_hash.digest()
+
+    def hexdigest(self, nonce: int) -> str:
+        """Block-Hash als Hex-String, identisch zu Block.calculate_hash"""
+        return self.digest(nonce).hex()
+
+    def search(self, difficulty: int, start: int, end: int,
+               should_stop: Optional[Callable[[], bool]] = None) -> Tuple[Optional[int], Optional[str], int]:
+        """
+        Durchsucht den Nonce-Bereich [start, end) nach einem gültigen Hash
+
+        Args:
+            difficulty: Anzahl führender Nullen im Hex-Hash
+            start: Erste zu prüfende Nonce
+            end: Erste nicht mehr zu prüfende Nonce
+            should_stop: Optionale Abbruchbedingung, alle CANCEL_CHECK_INTERVAL Nonces geprüft
+
+        Returns:
+            (Nonce, Hash, Anzahl probierter Nonces) - Nonce und Hash sind None ohne Treffer
+        """
+        # Führende Hex-Nullen entsprechen Null-Bytes plus ggf. einem Byte < 0x10
+        zero_bytes = difficulty // 2
+        half_byte = difficulty % 2 == 1
+        zeros = bytes(zero_bytes)
+        copy = self._prefix_hash.copy
+        suffix = self._suffix
+
+        nonce = start
+        while nonce < end:
+            if should_stop is not None and should_stop():
+                return None, None, nonce - start
+
+            batch_end = min(nonce + CANCEL_CHECK_INTERVAL, end)
+            for candidate in range(nonce, batch_end):
+                block_hash = copy()
+                block_hash.update(b'%d%s' % (candidate, suffix))
+                digest = block_hash.digest()
+                if digest[:zero_bytes] == zeros and (not half_byte or digest[zero_bytes] < 16):
+                    return candidate, digest.hex(), candidate - start + 1
+            nonce = batch_end
+
+        return None, None, end - start
+
+
+def _init_worker(generation) -> None:
+    """Initialisiert einen Worker-Prozess mit dem gemeinsamen Generationszähler"""
+    global _worker_generation
+    _worker_generation = generation
+
+
+def _search_nonce_range(header: Dict[str, Any], difficulty: int, start: int, end: int,
+                        generation: int) -> Tuple[Optional[int], Optional[str], int]:
+    """
+    Durchsucht den Nonce-Bereich [start, end) nach einem gültigen Block-Hash
+
+    Läuft im Worker-Prozess. Sobald der Generationszähler nicht mehr zur
+    eigenen Suche passt (Lösung gefunden oder Abbruch), wird sofort beendet.
+
+    Returns:
+        (Nonce, Hash, Anzahl probierter Nonces) - Nonce und Hash sind None ohne Treffer
+    """
+    def cancelled() -> bool:
+        return _worker_generation is not None and _worker_generation.value != generation
+
+    return HeaderTemplate.from_header(header).search(difficulty, start, end, should_stop=cancelled)
+
+
+class MiningEngine:
+    """
+    Paralleles Mining über einen Pool von Worker-Prozessen
+
+    Der Nonce-Raum wird in disjunkte Bereiche der Größe chunk_size aufgeteilt,
+    die nacheinander an die Worker vergeben werden. Der erste Worker mit einer
+    gültigen Lösung gewinnt, alle anderen Suchen werden sofort abgebrochen.
+    """
+    DEFAULT_CHUNK_SIZE = 50000
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        # Höchstens ein Prozess pro Kern, mehr bringt beim Hashen nichts
+        cpu_count = os.cpu_count() or 1
+        self.workers = max(1, min(workers or cpu_count, cpu_count))
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        """Startet den Prozess-Pool beim ersten Gebrauch"""
+        if self._executor is None:
+            # spawn statt fork: der Node läuft mit mehreren Threads (Flask, Discovery, Mining)
+            context = multiprocessing.get_context('spawn')
+            self._generation = context.RawValue('q', 0)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._generation,)
+            )
+            logger.info(f"Mining-Pool mit {self.workers} Worker-Prozessen gestartet")
+        return self._executor
+
+    def search(self, header: Dict[str, Any], difficulty: int, start_nonce: int = 0,
+               cancel_event: Optional[threading.Event] = None,
+               progress: Optional[Callable[[int], None]] = None) -> Optional[Tuple[int, str]]:
+        """
+        Sucht parallel eine Nonce, deren Block-Hash die Schwierigkeit erfüllt
+
+        Args:
+            header: Block-Felder ohne Nonce (index, timestamp, merkle_root, previous_hash)
+            difficulty: Anzahl führender Nullen im Hash
+            start_nonce: Erste zu prüfende Nonce
+            cancel_event: Optionales Abbruch-Token, z.B. wenn ein konkurrierender Block eintrifft
+            progress: Optionaler Callback, erhält die Anzahl probierter Nonces je Bereich
+
+        Returns:
+            (Nonce, Hash) des gefundenen Blocks oder None bei Abbruch
+        """
+        with self._lock:
+            executor = self._ensure_pool()
+            self._generation.value += 1
+            generation = self._generation.value
+
+            next_start = start_nonce
+            pending = set()
+            # Pipeline gefüllt halten, damit kein Worker auf neue Arbeit warten muss
+            for _ in range(self.workers * 2):
+                pending.add(executor.submit(_search_nonce_range, header, difficulty,
+                                            next_start, next_start + self.chunk_size, generation))
+                next_start += self.chunk_size
+
+            try:
+                while pending:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
+
+                    done, pending = wait(pending, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+
+                    solutions = []
+                    for future in done:
+                        nonce, block_hash, tried = future.result()
+                        if progress is not None:
+                            progress(tried)
+                        if nonce is not None:
+                            solutions.append((nonce, block_hash))
+                        else:
+                            pending.add(executor.submit(_search_nonce_range, header, difficulty,
+                                                        next_start, next_start + self.chunk_size,
+                                                        generation))
+                            next_start += self.chunk_size
+
+                    if solutions:
+                        return min(solutions)
+                return None
+            finally:
+                # Alle noch laufenden Bereiche dieser Suche abbrechen
+                self._generation.value += 1
+                running = [future for future in pending if not future.cancel()]
+                # Laufende Worker brechen nach höchstens CANCEL_CHECK_INTERVAL Nonces ab und
+                # melden, wie viele sie probiert haben; ohne diese Zählerstände läge die
+                # Hashrate bei mehreren Workern deutlich zu niedrig
+                if progress is not None and running:
+                    done, _ = wait(running, timeout=IN_FLIGHT_DRAIN_TIMEOUT)
+                    for future in done:
+                        if future.exception() is None:
+                            progress(future.result()[2])
+
+    def shutdown(self) -> None:
+        """Beendet den Prozess-Pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._generation.value += 1
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                logger.info("Mining-Pool beendet")
+
+
+class MiningAttempt:
+    """Zähler für einen einzelnen Mining-Versuch (ein Block-Template)"""
+    __slots__ = ('telemetry', 'started_at', 'nonces')
+
+    def __init__(self, telemetry: 'MiningTelemetry'):
+        self.telemetry = telemetry
+        self.started_at = time.time()
+        self.nonces = 0
+
+    def record(self, hashes: int) -> None:
+        """Verbucht probierte Nonces für diesen Versuch und die Hashrate"""
+        self.nonces += hashes
+        self.telemetry.record_hashes(hashes)
+
+
+class MiningTelemetry:
+    """
+    Live-Telemetrie der Mining-Schleife
+
+    Hashes werden in Sekunden-Buckets gezählt, daraus ergeben sich die Hashraten
+    über gleitende Fenster. Zusätzlich werden Nonces pro Block, Zeit bis zur
+    Lösung sowie veraltete und abgebrochene Versuche erfasst.
+    """
+    # Fenstergrößen in Sekunden
+    WINDOWS = {"1s": 1, "1m": 60, "15m": 900}
+    # Anzahl der Blöcke für Durchschnittswerte
+    HISTORY_SIZE = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Deque[list] = deque()  # [Sekunde, Hashes]
+        self._started_at: Optional[float] = None
+        self.total_hashes = 0
+        self.blocks_mined = 0
+        self.stale_blocks = 0
+        self.aborted_attempts = 0
+        self._nonces_per_block: Deque[int] = deque(maxlen=self.HISTORY_SIZE)
+        self._time_to_solution: Deque[float] = deque(maxlen=self.HISTORY_SIZE)
+
+    def record_hashes(self, hashes: int, now: Optional[float] = None) -> None:
+        """Verbucht eine Anzahl berechneter Hashes"""
+        if hashes <= 0:
+            return
+        if now is None:
+            now = time.time()
+        second = int(now)
+
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = now
+            self.total_hashes += hashes
+            if self._buckets and self._buckets[-1][0] == second:
+                self._buckets[-1][1] += hashes
+            else:
+                self._buckets.append([second, hashes])
+            # Buckets außerhalb des größten Fensters verwerfen
+            oldest = second - max(self.WINDOWS.values()) - 1
+            while self._buckets and self._buckets[0][0] < oldest:
+                self._buckets.popleft()
+
+    def hashrate(self, window: int, now: Optional[float] = None) -> float:
+        """
+        Hashes pro Sekunde über die letzten vollständigen window Sekunden
+
+        Args:
+            window: Fenstergröße in Sekunden
+        """
+        if now is None:
+            now = time.time()
+        current_second = int(now)
+
+        with self._lock:
+            if self._started_at is None:
+                return 0.0
+            # Bei kurzer Laufzeit nur über die tatsächlich beobachteten Sekunden mitteln
+            elapsed = max(1, min(window, current_second - int(self._started_at)))
+            first_second = current_second - elapsed
+            hashes = sum(count for second, count in self._buckets
+                         if first_second <= second < current_second)
+        return hashes / elapsed
+
+    def begin_attempt(self) -> MiningAttempt:
+        """Startet die Zählung für einen neuen Mining-Versuch"""
+        return MiningAttempt(self)
+
+    def finish_attempt(self, attempt: MiningAttempt, outcome: str) -> None:
+        """
+        Schließt einen Mining-Versuch ab
+
+        Args:
+            attempt: Der abgeschlossene Versuch
+            outcome: "mined", "stale" (Lösung gefunden, Tip aber veraltet) oder "aborted"
+        """
+        with self._lock:
+            if outcome == "mined":
+                self.blocks_mined += 1
+                self._nonces_per_block.append(attempt.nonces)
+                self._time_to_solution.append(time.time() - attempt.started_at)
+            elif outcome == "stale":
+                self.stale_blocks += 1
+            else:
+                self.aborted_attempts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Aktuelle Telemetrie als JSON-serialisierbares Dict"""
+        now = time.time()
+        hashrate = {name: round(self.hashrate(window, now), 2) for name, window in self.WINDOWS.items()}
+
+        with self._lock:
+            nonces = list(self._nonces_per_block)
+            solution_times = list(self._time_to_solution)
+            return {
+                "hashrate": hashrate,
+                "total_hashes": self.total_hashes,
+                "blocks_mined": self.blocks_mined,
+                "stale_blocks": self.stale_blocks,
+                "aborted_attempts": self.aborted_attempts,
+                "last_block_nonces": nonces[-1] if nonces else 0,
+                "avg_nonces_per_block": round(sum(nonces) / len(nonces), 2) if nonces else 0,
+                "last_time_to_solution": round(solution_times[-1], 3) if solution_times else 0,
+                "avg_time_to_solution": round(sum(solution_times) / len(solution_times), 3) if solution_times else 0
+            }
@@ -0,0 +1,186 @@
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional
+
+# Domain-Separation, damit Blätter, innere Knoten und der gebündelte Root nie kollidieren
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+BAG_PREFIX = b"\x02"
+
+
+def mmr_size(leaf_count: int) -> int:
+    """Anzahl der Knoten einer MMR mit leaf_count Blättern"""
+    return 2 * leaf_count - bin(leaf_count).count("1")
+
+
+def _leaf_hash(block_hash: str) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + block_hash.encode()).digest()
+
+
+def _parent_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _bag_peaks(peaks: List[bytes]) -> str:
+    """Bündelt die Gipfel von rechts nach links zu einem einzigen Root"""
+    if not peaks:
+        return hashlib.sha256(b"").hexdigest()
+    root = peaks[-1]
+    for peak in reversed(peaks[:-1]):
+        root = hashlib.sha256(BAG_PREFIX + peak + root).digest()
+    return root.hex()
+
+
+class MerkleMountainRange:
+    """
+    Merkle Mountain Range über die Block-Hashes der Kette
+
+    Die Knoten werden in Post-Order in einer Liste gehalten. Ein neuer Block
+    kostet O(log n) Hashes, Proofs und Roots für jede frühere Kettenlänge
+    sind in O(log n) verfügbar. So können zwei Nodes prüfen, ob sie dieselbe
+    Historie teilen, ohne ganze Ketten auszutauschen.
+    """
+
+    def __init__(self):
+        self.nodes: List[bytes] = []
+        self.leaf_count = 0
+
+    @classmethod
+    def from_hashes(cls, block_hashes: Iterable[str]) -> 'MerkleMountainRange':
+        """Baut eine MMR aus einer Folge von Block-Hashes auf"""
+        mmr = cls()
+        for block_hash in block_hashes:
+            mmr.append(block_hash)
+        return mmr
+
+    def append(self, block_hash: str) -> int:
+        """
+        Hängt einen Block-Hash als neues Blatt an
+
+        Returns:
+            Index des Blatts (entspricht dem Block-Index)
+        """
+        nodes = self.nodes
+        node = _leaf_hash(block_hash)
+        nodes.append(node)
+
+        # Jede abschließende 1 im Binärwert des Blatt-Index schließt einen Teilbaum ab
+        leaf_index = self.leaf_count
+        height = 0
+        while leaf_index & (1 << height):
+            left = nodes[len(nodes) - (2 << height)]
+            node = _parent_hash(left, node)
+            nodes.append(node)
+            height += 1
+
+        self.leaf_count += 1
+        return leaf_index
+
+    def truncate(self, leaf_count: int) -> None:
+        """Entfernt alle Blätter ab leaf_count (z.B. bei einem Kettenwechsel)"""
+        if leaf_count < self.leaf_count:
+            del self.nodes[mmr_size(leaf_count):]
+            self.leaf_count = leaf_count
+
+    def _peak_layout(self, leaf_count: int) -> List[Dict[str, int]]:
+        """Position, Höhe und erstes Blatt jedes Gipfels für leaf_count Blätter"""
+        layout = []
+        node_offset = 0
+        leaf_offset = 0
+        for height in range(leaf_count.bit_length() - 1, -1, -1):
+            if leaf_count & (1 << height):
+                size = (2 << height) - 1
+                layout.append({'pos': node_offset + size - 1, 'height': height,
+                               'base': node_offset, 'first_leaf': leaf_offset})
+                node_offset += size
+                leaf_offset += 1 << height
+        return layout
+
+    def _check_size(self, leaf_count: Optional[int]) -> int:
+        if leaf_count is None:
+            return self.leaf_count
+        if not 0 <= leaf_count <= self.leaf_count:
+            raise ValueError(f"MMR size {leaf_count} out of range (0..{self.leaf_count})")
+        return leaf_count
+
+    def peaks(self, leaf_count: Optional[int] = None) -> List[bytes]:
+        """Gipfel der MMR, optional für eine frühere Kettenlänge"""
+        leaf_count = self._check_size(leaf_count)
+        return [self.nodes[peak['pos']] for peak in self._peak_layout(leaf_count)]
+
+    def root(self, leaf_count: Optional[int] = None) -> str:
+        """
+        Root der MMR als Hex-String
+
+        Args:
+            leaf_count: Optionale frühere Kettenlänge; Standard ist die aktuelle Länge
+        """
+        return _bag_peaks(self.peaks(leaf_count))
+
+    def prove(self, leaf_index: int, leaf_count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Erstellt einen Inklusionsbeweis für das Blatt leaf_index
+
+        Returns:
+            Dict mit Audit-Pfad bis zum Gipfel, allen Gipfeln und der MMR-Größe
+        """
+        leaf_count = self._check_size(leaf_count)
+        if not 0 <= leaf_index < leaf_count:
+            raise IndexError(f"Leaf index {leaf_index} out of range")
+
+        layout = self._peak_layout(leaf_count)
+        for peak_index, peak in enumerate(layout):
+            if leaf_index < peak['first_leaf'] + (1 << peak['height']):
+                break
+
+        # Vom Gipfel zum Blatt absteigen und die Geschwister sammeln
+        path = []
+        base = peak['base']
+        offset = leaf_index - peak['first_leaf']
+        for height in range(peak['height'], 0, -1):
+            left_size = (1 << height) - 1
+            left_root = base + left_size - 1
+            right_root = base + 2 * left_size - 1
+            if offset < (1 << (height - 1)):
+                path.append({'hash': self.nodes[right_root].hex(), 'position': 'right'})
+            else:
+                path.append({'hash': self.nodes[left_root].hex(), 'position': 'left'})
+                base += left_size
+                offset -= 1 << (height - 1)
+        path.reverse()
+
+        return {
+            'leaf_index': leaf_index,
+            'mmr_size': leaf_count,
+            'peak_index': peak_index,
+            'path': path,
+            'peaks': [self.nodes[p['pos']].hex() for p in layout]
+        }
+
+    @staticmethod
+    def verify(block_hash: str, proof: Dict[str, Any], root: str) -> bool:
+        """
+        Verifiziert einen Inklusionsbeweis in O(log n)
+
+        Args:
+            block_hash: Hash des Blocks, dessen Zugehörigkeit geprüft wird
+            proof: Beweis aus prove()
+            root: Erwarteter MMR-Root (z.B. von einem Peer)
+        """
+        try:
+            node = _leaf_hash(block_hash)
+            for step in proof['path']:
+                sibling = bytes.fromhex(step['hash'])
+                if step['position'] == 'left':
+                    node = _parent_hash(sibling, node)
+                elif step['position'] == 'right':
+                    node = _parent_hash(node, sibling)
+                else:
+                    return False
+
+            peaks = [bytes.fromhex(peak) for peak in proof['peaks']]
+            if peaks[proof['peak_index']] != node:
+                return False
+        except (KeyError, IndexError, TypeError, ValueError):
+            return False
+
+        return _bag_peaks(peaks) == root
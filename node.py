@@ -1,17 +1,20 @@
 import json
+import os
 import threading
 import time
 import logging
 import uuid
 import socket
 import requests
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 from urllib.parse import urlparse
-from flask import Flask, jsonify, request, abort
+from flask import Flask, Response, jsonify, request, abort
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from blockchain import Blockchain, Block
+from validation import ParallelVerifier, verify_blocks
+import serialization
 
 # Konfiguration des Loggings
 logging.basicConfig(
@@ -39,7 +42,8 @@ LOCAL_NODE_PORTS = [5000, 5001, 5002, 5003, 5004, 5005]
 blocks_logger = logging.getLogger('node.blocks')
 
 class Node:
-    def __init__(self, host: str = '0.0.0.0', port: int = 5000, blockchain: Optional[Blockchain] = None):
+    def __init__(self, host: str = '0.0.0.0', port: int = 5000, blockchain: Optional[Blockchain] = None,
+                 validation_workers: Optional[int] = None):
         self.host = host
         self.port = port
         self.node_id = str(uuid.uuid4()).replace('-', '')
@@ -57,6 +61,10 @@ class Node:
         # Mining-Adresse speichern, um Mining neu starten zu können
         self.current_miner_address = None
         
+        # Ein Prozess-Pool für alle Validierungen (None: alle Kerne, höchstens so viele wie Kerne);
+        # die Worker starten erst bei der ersten langen Kette
+        self.verifier = ParallelVerifier(validation_workers)
+        
         # Setup API-Routen
         self.setup_routes()
         
@@ -81,7 +89,8 @@ class Node:
             if success:
                 return jsonify({
                     'message': f'Blockchain erfolgreich pausiert: {reason}',
-                    'paused_at': time.time()
+                    'paused_at': time.time(),
+                    'checkpoint': self.blockchain.checkpoint_status()
                 })
             else:
                 return jsonify({
@@ -101,7 +110,7 @@ class Node:
             if success:
                 # Bei erfolgreicher Wiederherstellung, falls validiert wurde
                 if validate:
-                    valid, issues = self.blockchain.comprehensive_validation()
+                    valid, issues = self.blockchain.comprehensive_validation(verifier=self.verifier)
                     
                     return jsonify({
                         'message': 'Blockchain erfolgreich fortgesetzt',
@@ -126,33 +135,60 @@ class Node:
             """
             Erstellt einen Checkpoint der Blockchain
             """
-            values = request.get_json()
+            values = request.get_json() or {}
             reason = values.get('reason', 'Manual checkpoint')
+            # Standard: Schnappschuss im Request, Schreiben im Hintergrund
+            background = values.get('background', True)
             
-            success = self.blockchain.create_checkpoint(reason)
+            success = self.blockchain.create_checkpoint(reason, background=background)
             
-            if success:
+            if success and background:
+                return jsonify({
+                    'message': f'Checkpoint gestartet: {reason}',
+                    'timestamp': time.time(),
+                    'blockchain_length': len(self.blockchain.chain),
+                    'status': self.blockchain.checkpoint_status()
+                }), 202
+            elif success:
                 return jsonify({
                     'message': f'Checkpoint erfolgreich erstellt: {reason}',
                     'timestamp': time.time(),
                     'blockchain_length': len(self.blockchain.chain)
                 })
+            elif background:
+                return jsonify({
+                    'message': 'Es läuft bereits ein Checkpoint',
+                    'status': self.blockchain.checkpoint_status()
+                }), 409
             else:
                 return jsonify({
                     'message': 'Fehler beim Erstellen des Checkpoints'
                 }), 500
                 
+        @self.app.route('/blockchain/checkpoint/status', methods=['GET'])
+        def checkpoint_status():
+            """
+            Status und Fortschritt des letzten bzw. laufenden Checkpoints
+            """
+            return jsonify(self.blockchain.checkpoint_status())
+                
         @self.app.route('/blockchain/validate', methods=['GET'])
         def validate_blockchain():
             """
-            Führt eine vollständige Validierung der Blockchain durch
+            Validiert die Blockchain
+            
+            Geprüft werden nur die Blöcke seit der letzten Validierung,
+            mit ?full=true die gesamte Kette. Lange Abschnitte verteilt der
+            Node auf seine Validierungs-Worker.
             """
-            valid, issues = self.blockchain.comprehensive_validation()
+            full = request.args.get('full', 'false').lower() == 'true'
+            valid, issues = self.blockchain.comprehensive_validation(full, self.verifier)
             
             return jsonify({
                 'valid': valid,
                 'issues': issues,
                 'blockchain_length': len(self.blockchain.chain),
+                'validation': self.blockchain.validator.status(),
                 'timestamp': time.time()
             })
         # Basic node info
@@ -180,17 +216,15 @@ class Node:
             chain_data = []
             end = min(start + limit, len(self.blockchain.chain))
             
+            # Binärformat für Peers, JSON bleibt das Standardformat
+            if request.args.get('format') == 'binary':
+                return Response(serialization.encode_chain(self.blockchain.chain[start:end]),
+                                mimetype=serialization.BINARY_MIME_TYPE,
+                                headers={'X-Chain-Length': str(len(self.blockchain.chain)),
+                                         'X-Chain-Start': str(start)})
+            
             for block in self.blockchain.chain[start:end]:
-                chain_data.append({
-                    'index': block.index,
-                    'timestamp': block.timestamp,
-                    'transactions': block.transactions,
-                    'previous_hash': block.previous_hash,
-                    'merkle_root': block.merkle_root,
-                    'nonce': block.nonce,
-                    'hash': block.hash,
-                    'difficulty': block.difficulty
-                })
+                chain_data.append(block.to_dict())
                 
             return jsonify({
                 'chain': chain_data,
@@ -207,18 +241,35 @@ class Node:
             if not block:
                 return jsonify({'message': 'Block not found'}), 404
                 
-            block_data = {
-                'index': block.index,
-                'timestamp': block.timestamp,
-                'transactions': block.transactions,
-                'previous_hash': block.previous_hash,
-                'merkle_root': block.merkle_root, 
-                'nonce': block.nonce,
-                'hash': block.hash,
-                'difficulty': block.difficulty
-            }
-            
-            return jsonify(block_data)
+            return jsonify(block.to_dict())
+            
+        @self.app.route('/block/<string:block_hash>/proof/<string:tx_id>', methods=['GET'])
+        def get_transaction_proof(block_hash, tx_id):
+            """Get a Merkle inclusion proof for a transaction in a block"""
+            block = self.blockchain.get_block_by_hash(block_hash)
+            
+            if not block:
+                return jsonify({'message': 'Block not found'}), 404
+                
+            proof = block.merkle_proof(tx_id)
+            if not proof:
+                return jsonify({'message': 'Transaction not found in block'}), 404
+                
+            return jsonify(proof)
+            
+        @self.app.route('/transaction/<string:tx_id>', methods=['GET'])
+        def get_transaction(tx_id):
+            """Get a confirmed or pending transaction by its id"""
+            transaction = self.blockchain.get_transaction(tx_id)
+            if transaction:
+                transaction['status'] = 'confirmed'
+                return jsonify(transaction)
+                
+            for tx in list(self.blockchain.pending_transactions):
+                if tx.get('id') == tx_id:
+                    return jsonify(dict(tx, status='pending'))
+                    
+            return jsonify({'message': 'Transaction not found'}), 404
             
         @self.app.route('/block/index/<int:block_index>', methods=['GET'])
         def get_block_by_index(block_index):
@@ -228,18 +279,52 @@ class Node:
             if not block:
                 return jsonify({'message': 'Block not found'}), 404
                 
-            block_data = {
-                'index': block.index,
-                'timestamp': block.timestamp,
-                'transactions': block.transactions,
-                'previous_hash': block.previous_hash,
-                'merkle_root': block.merkle_root,
-                'nonce': block.nonce,
-                'hash': block.hash,
-                'difficulty': block.difficulty
-            }
-            
-            return jsonify(block_data)
+            return jsonify(block.to_dict())
+        
+        @self.app.route('/chain/mmr', methods=['GET'])
+        def get_chain_mmr():
+            """Get the Merkle Mountain Range root over all block hashes"""
+            mmr = self.blockchain.header_mmr
+            size = request.args.get('size', mmr.leaf_count, type=int)
+            
+            try:
+                peaks = mmr.peaks(size)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+                
+            return jsonify({
+                'size': size,
+                'root': mmr.root(size),
+                'peaks': [peak.hex() for peak in peaks],
+                'length': mmr.leaf_count
+            })
+            
+        @self.app.route('/chain/mmr/compare', methods=['GET'])
+        def compare_chain_mmr():
+            """Compare our history with a registered peer by MMR root"""
+            peer = request.args.get('peer')
+            if not peer:
+                return jsonify({'message': 'Missing peer'}), 400
+            # Nur registrierte Peers, der Node soll keine beliebigen URLs abrufen
+            if peer not in self.peers:
+                return jsonify({'message': 'Unknown peer'}), 404
+                
+            result = self.compare_history(peer)
+            if result is None:
+                return jsonify({'message': f'Could not compare history with {peer}'}), 502
+                
+            return jsonify(result)
+            
+        @self.app.route('/chain/mmr/proof/<int:block_index>', methods=['GET'])
+        def get_block_mmr_proof(block_index):
+            """Get a proof that a block is part of the chain"""
+            size = request.args.get('size', None, type=int)
+            proof = self.blockchain.get_block_proof(block_index, size)
+            
+            if not proof:
+                return jsonify({'message': 'Block not found'}), 404
+                
+            return jsonify(proof)
         
         # Transaction endpoints
         @self.app.route('/transaction/new', methods=['POST'])
@@ -284,12 +369,27 @@ class Node:
             
         @self.app.route('/transactions/history/<string:address>', methods=['GET'])
         def get_transaction_history(address):
-            """Get transaction history for an address"""
-            transactions = self.blockchain.get_transaction_history(address)
+            """
+            Get transaction history for an address
+            
+            Query-Parameter: limit, cursor (next_cursor der vorherigen Seite), order=newest|oldest
+            """
+            limit = request.args.get('limit', type=int)
+            if limit is not None and limit <= 0:
+                return jsonify({'message': 'limit must be positive'}), 400
+            newest_first = request.args.get('order', 'oldest') == 'newest'
+            
+            try:
+                transactions, next_cursor = self.blockchain.get_transaction_history_page(
+                    address, limit=limit, cursor=request.args.get('cursor'), newest_first=newest_first)
+            except ValueError as e:
+                return jsonify({'message': str(e)}), 400
+                
             return jsonify({
                 'address': address,
                 'transactions': transactions,
-                'count': len(transactions)
+                'count': len(transactions),
+                'next_cursor': next_cursor
             })
         
         # Mining endpoints
@@ -304,6 +404,9 @@ class Node:
             # Mine a new block
             block = self.blockchain.mine_pending_transactions(miner_address)
             
+            if block is None:
+                return jsonify({'message': 'Mining aborted: chain tip changed, please retry'}), 409
+                
             # Announce the new block to the network
             self.broadcast_new_block()
             
@@ -311,7 +414,7 @@ class Node:
                 'message': 'New block mined',
                 'block_index': block.index,
                 'block_hash': block.hash,
-                'transactions': len(block.transactions)
+                'transactions': block.transaction_count
             })
             
         @self.app.route('/mining/start', methods=['POST'])
@@ -322,6 +425,19 @@ class Node:
             if not values or not values.get('address'):
                 return jsonify({'message': 'Mining address required'}), 400
                 
+            # Optional: Anzahl der Mining-Prozesse (Standard: Mining im Thread), höchstens ein Prozess pro Kern
+            workers = values.get('workers')
+            if workers is not None:
+                try:
+                    if isinstance(workers, (bool, float)):
+                        raise ValueError(workers)
+                    workers = int(workers)
+                except (TypeError, ValueError):
+                    return jsonify({'message': 'workers must be an integer'}), 400
+                if workers < 1:
+                    return jsonify({'message': 'workers must be at least 1'}), 400
+                workers = min(workers, os.cpu_count() or 1)
+                
             miner_address = values.get('address')
             # Speichere die Mining-Adresse für späteren Neustart
             self.current_miner_address = miner_address
@@ -351,12 +467,13 @@ class Node:
                 return False
             
             # Start continuous mining with improved callbacks
-            self.blockchain.start_continuous_mining(miner_address, mining_callback, sync_callback)
+            self.blockchain.start_continuous_mining(miner_address, mining_callback, sync_callback, workers=workers)
             
             return jsonify({
                 'message': 'Continuous mining started',
                 'miner': miner_address,
-                'difficulty': self.blockchain.difficulty
+                'difficulty': self.blockchain.difficulty,
+                'workers': self.blockchain.get_mining_stats()['mining_workers']
             })
             
         @self.app.route('/mining/stop', methods=['POST'])
@@ -463,11 +580,26 @@ class Node:
             if not address:
                 return jsonify({'message': 'Address parameter required'}), 400
                 
-            balance = self.blockchain.get_balance(address)
+            height = request.args.get('height')
+            if height is not None:
+                try:
+                    balance = self.blockchain.get_balance_at(address, int(height))
+                except (ValueError, IndexError):
+                    return jsonify({'message': f'Invalid block height {height}'}), 400
+                return jsonify({
+                    'address': address,
+                    'height': int(height),
+                    'balance': balance
+                })
+                
+            details = self.blockchain.get_balance_details(address)
             
             return jsonify({
                 'address': address,
-                'balance': balance
+                'balance': details['confirmed'],
+                'spendable': details['spendable'],
+                'pending_debit': details['pending_debit'],
+                'pending_credit': details['pending_credit']
             })
             
         # API Management
@@ -856,11 +988,14 @@ class Node:
         # Grab and verify the chains from all the nodes in our network
         for peer in list(self.peers):
             try:
-                response = requests.get(f"{peer}/blockchain", timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    length = data['length']
-                    chain = data['chain']
+                # Der MMR-Vergleich verrät die Länge des Peers, ohne die Kette zu laden
+                history = self.compare_history(peer)
+                if history and history['peer_length'] <= max_length:
+                    continue
+                
+                fetched = self._fetch_chain(peer)
+                if fetched:
+                    length, chain = fetched
                     
                     # Check if the length is longer and the chain is valid
                     if length > max_length and self._is_chain_valid(chain):
@@ -907,34 +1042,97 @@ class Node:
         logger.debug("Local chain is authoritative, no consensus action needed")
         return False
     
+    def compare_history(self, peer: str) -> Optional[Dict[str, Any]]:
+        """
+        Vergleicht die Historie mit einem Peer anhand der MMR-Roots
+        
+        Statt ganzer Ketten wird nur der Root über den gemeinsamen Längen-Präfix
+        ausgetauscht.
+        
+        Returns:
+            Dict mit gemeinsamer Länge und ob die Historie übereinstimmt, None bei Fehlern
+        """
+        mmr = self.blockchain.header_mmr
+        try:
+            response = requests.get(f"{peer}/chain/mmr", timeout=5)
+            if response.status_code != 200:
+                return None
+            peer_mmr = response.json()
+            
+            common_size = min(mmr.leaf_count, peer_mmr['length'])
+            peer_root = peer_mmr['root']
+            if common_size != peer_mmr['size']:
+                response = requests.get(f"{peer}/chain/mmr", params={'size': common_size}, timeout=5)
+                if response.status_code != 200:
+                    return None
+                peer_root = response.json()['root']
+        except (requests.RequestException, KeyError, ValueError, TypeError) as e:
+            logger.warning(f"Error comparing history with {peer}: {str(e)}")
+            return None
+            
+        return {
+            'peer': peer,
+            'common_size': common_size,
+            'shared_history': peer_root == mmr.root(common_size),
+            'local_length': mmr.leaf_count,
+            'peer_length': peer_mmr['length']
+        }
+    
+    def _fetch_chain(self, peer: str) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Lädt die Kette eines Peers, bevorzugt im Binärformat
+        
+        Ältere Peers ignorieren den format-Parameter und antworten mit JSON.
+        
+        Die Länge ergibt sich aus der gelieferten Kette, Längenangaben des Peers
+        werden nicht übernommen.
+        
+        Returns:
+            (Länge, Liste von Block-Dicts) oder None bei einer Fehl- oder ungültigen Antwort
+        """
+        response = requests.get(f"{peer}/blockchain", params={'format': 'binary'}, timeout=5)
+        if response.status_code != 200:
+            return None
+            
+        try:
+            if response.headers.get('Content-Type') == serialization.BINARY_MIME_TYPE:
+                chain = serialization.decode_chain(response.content)
+            else:
+                chain = response.json()['chain']
+            if not isinstance(chain, list):
+                raise ValueError("chain is not a list")
+        except (ValueError, KeyError, TypeError) as e:
+            # CodecError und JSON-Fehler sind ValueErrors
+            logger.warning(f"Invalid chain from {peer}: {str(e)}")
+            return None
+        return len(chain), chain
+    
     def _is_chain_valid(self, chain) -> bool:
         """
         Verify if a given blockchain is valid
+        
+        Blöcke, die bereits in unserer Kette liegen, werden übersprungen. Für den
+        Rest werden Index und Verkettung der Reihe nach geprüft, Hash, Merkle Root
+        und Proof of Work bei langen Ketten parallel auf Worker-Prozessen.
         """
-        # Prüfe jeden Block in der Kette
-        for i, block_data in enumerate(chain):
-            # Genesis-Block überspringen
-            if i == 0:
-                continue
-                
-            # Vorherigen Block erhalten
-            prev_block_data = chain[i-1]
+        try:
+            common = self.blockchain.common_prefix_length([block_data['hash'] for block_data in chain])
+            blocks = []
+            for block_data in chain[common:]:
+                block = Block.from_dict(block_data)
+                if 'difficulty' not in block_data:
+                    block.difficulty = 4
+                blocks.append(block)
+            # Der letzte gemeinsame Block gleicht per Hash unserem, für die Verkettung genügt der des Peers
+            previous = Block.from_dict(chain[common - 1]) if common else None
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Malformed block in external chain: {e}")
+            return False
             
-            # 1. Prüfen, ob der previous_hash korrekt ist
-            if block_data['previous_hash'] != prev_block_data['hash']:
-                logger.error(f"Invalid previous hash in block {i}")
-                return False
-                
-            # 2. Prüfen, ob der Hash den richtigen Schwierigkeitsgrad hat
-            difficulty = block_data.get('difficulty', 4)
-            if block_data['hash'][:difficulty] != '0' * difficulty:
-                logger.error(f"Invalid proof of work in block {i}")
-                return False
-                
-            # 3. Prüfen, ob der Index korrekt ist
-            if block_data['index'] != i:
-                logger.error(f"Invalid block index {block_data['index']} at position {i}")
-                return False
+        error = verify_blocks(blocks, common, previous, self.verifier)
+        if error is not None:
+            logger.error(f"Invalid external chain: {error}")
+            return False
                 
         logger.info(f"External chain with {len(chain)} blocks validated successfully")
         return True
@@ -942,79 +1140,28 @@ class Node:
     def _replace_chain(self, new_chain):
         """
         Replace the local chain with the given one
+        
+        Laufendes Mining wird nicht gestoppt: die Blockchain bricht den aktuellen
+        Mining-Versuch über sein Abbruch-Token ab und baut das Template auf dem
+        neuen Tip neu auf.
         """
         try:
-            # Speichere den Mining-Status, bevor wir die Chain ersetzen
-            was_mining = False
-            mining_address = self.current_miner_address
-            
-            # Stoppt das Mining, falls aktiv, da sonst Race Conditions entstehen können
-            if self.blockchain._mining_thread and self.blockchain._mining_thread.is_alive():
-                was_mining = True
-                logger.info("Temporarily stopping mining to update blockchain")
-                self.blockchain.stop_continuous_mining()
+            # Nur Blöcke ab dem gemeinsamen Vorgänger umwandeln, der Präfix bleibt unverändert
+            common = self.blockchain.common_prefix_length([block_data['hash'] for block_data in new_chain])
+            blocks = []
+            for block_data in new_chain[common:]:
+                # Konvertiere JSON- bzw. dekodierte Binärdaten in Block-Objekt
+                block = Block.from_dict(block_data)
+                if 'difficulty' not in block_data:
+                    block.difficulty = 4
+                blocks.append(block)
                 
-            # Sichere ausstehende Transaktionen vor dem Ersetzen der Blockchain
-            pending_transactions = self.blockchain.pending_transactions.copy()
+            # Bis zum gemeinsamen Vorgänger zurückrollen, Mempool bereinigen und laufendes Mining abbrechen
+            self.blockchain.reorganize(common, blocks)
             
-            # Führe ausstehende Transaktionen zusammen und entferne Duplikate
-            existing_tx_ids = set()
-            for block in new_chain:
-                for tx in block['transactions']:
-                    if 'id' in tx:
-                        existing_tx_ids.add(tx['id'])
-            
-            # Setze die Blockchain zurück und füge alle Blöcke hinzu
-            self.blockchain.chain = []
-            
-            for block_data in new_chain:
-                # Konvertiere JSON-Daten in Block-Objekt
-                block = Block(
-                    index=block_data['index'],
-                    timestamp=block_data['timestamp'],
-                    transactions=block_data['transactions'],
-                    previous_hash=block_data['previous_hash'],
-                    nonce=block_data['nonce']
-                )
-                block.hash = block_data['hash']
-                block.merkle_root = block_data.get('merkle_root', '')
-                block.difficulty = block_data.get('difficulty', 4)
-                
-                # Füge Block zur Kette hinzu
-                self.blockchain.chain.append(block)
-                
             # Aktualisiere die Schwierigkeit basierend auf der neuen Kette
             self.blockchain.difficulty = new_chain[-1].get('difficulty', 4)
             
-            # Füge die ausstehenden Transaktionen wieder hinzu, die noch nicht in der neuen Kette sind
-            for tx in pending_transactions:
-                if 'id' in tx and tx['id'] not in existing_tx_ids:
-                    self.blockchain.pending_transactions.append(tx)
-            
-            # Starte das Mining wieder, falls es vorher aktiv war
-            if was_mining and mining_address:
-                logger.info(f"Restarting mining with address {mining_address}")
-                
-                # Mining-Callbacks für Block-Notifications und Synchronisierung
-                def mining_callback(block):
-                    if not block or not hasattr(block, 'hash'):
-                        return
-                    logger.info(f"Successfully mined block #{block.index}, hash: {block.hash}")
-                    threading.Thread(target=self._immediate_block_broadcast, args=(block,)).start()
-                
-                def sync_callback():
-                    if self.peers:
-                        try:
-                            updated = self.resolve_conflicts()
-                            return updated
-                        except Exception as e:
-                            logger.error(f"Error during pre-mining sync: {str(e)}")
-                    return False
-                
-                # Starte das Mining neu mit denselben Callbacks wie zuvor
-                self.blockchain.start_continuous_mining(mining_address, mining_callback, sync_callback)
-                print(f"Mining restarted with address: {mining_address}")
-            
             logger.info(f"Successfully replaced chain with {len(self.blockchain.chain)} blocks")
             return True
             
@@ -1067,10 +1214,9 @@ class Node:
         Verwendet für gezielte Synchronisierung nach Block-Benachrichtigungen
         """
         try:
-            response = requests.get(f"{peer_url}/blockchain", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                chain = data['chain']
+            fetched = self._fetch_chain(peer_url)
+            if fetched:
+                _, chain = fetched
                 
                 if self._is_chain_valid(chain) and len(chain) > len(self.blockchain.chain):
                     current_length = len(self.blockchain.chain)
@@ -0,0 +1,476 @@
+import struct
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Binäres Format für Blöcke und Transaktionen
+#
+# Jede Nachricht beginnt mit MAGIC und der Codec-Version. Werte sind getaggt
+# und längenpräfixiert (Varints), Dict-Schlüssel werden sortiert geschrieben,
+# damit gleiche Inhalte immer dieselben Bytes ergeben. 64-stellige Hex-Hashes
+# werden als 32 Bytes übertragen und beim Dekodieren wieder zu Hex-Strings.
+
+MAGIC = b"CB"
+CODEC_VERSION = 1
+
+# Content-Type für binäre Antworten der Node-API
+BINARY_MIME_TYPE = "application/x-coin-binary"
+
+_KIND_VALUE = 0
+_KIND_TRANSACTION = 1
+_KIND_BLOCK = 2
+_KIND_CHAIN = 3
+
+TAG_NONE = 0x00
+TAG_FALSE = 0x01
+TAG_TRUE = 0x02
+TAG_INT = 0x03
+TAG_FLOAT = 0x04
+TAG_STR = 0x05
+TAG_HASH = 0x06
+TAG_BYTES = 0x07
+TAG_LIST = 0x08
+TAG_DICT = 0x09
+
+_FLOAT = struct.Struct(">d")
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+# Schlüsselreihenfolge von Block.to_dict()
+_BLOCK_FIELDS = ('index', 'timestamp', 'transactions', 'previous_hash', 'merkle_root',
+                 'merkle_version', 'nonce', 'hash', 'difficulty')
+
+
+class CodecError(ValueError):
+    """Fehler beim Dekodieren ungültiger oder unbekannter Daten"""
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        try:
+            byte = data[pos]
+        except IndexError:
+            raise CodecError("Unexpected end of data in varint")
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _is_hex_hash(value: str) -> bool:
+    return len(value) == 64 and _HEX_DIGITS.issuperset(value)
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    encoded = value.encode()
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _read_varint(data, pos)
+    end = pos + length
+    if end > len(data):
+        raise CodecError("Unexpected end of data in string")
+    try:
+        return str(data[pos:end], 'utf-8'), end
+    except UnicodeDecodeError as e:
+        raise CodecError(f"Invalid UTF-8 in string: {e.reason}")
+
+
+def _write_value(out: bytearray, value: Any) -> None:
+    """Schreibt einen getaggten Wert (None, bool, int, float, str, bytes, list, dict)"""
+    value_type = type(value)
+    if value_type is str:
+        if _is_hex_hash(value):
+            out.append(TAG_HASH)
+            out += bytes.fromhex(value)
+        else:
+            out.append(TAG_STR)
+            _write_str(out, value)
+    elif value_type is float:
+        out.append(TAG_FLOAT)
+        out += _FLOAT.pack(value)
+    elif value_type is bool:
+        out.append(TAG_TRUE if value else TAG_FALSE)
+    elif value_type is int:
+        out.append(TAG_INT)
+        # Zigzag-Kodierung für negative Zahlen
+        _write_varint(out, value << 1 if value >= 0 else ((-value) << 1) - 1)
+    elif value is None:
+        out.append(TAG_NONE)
+    elif value_type is dict:
+        out.append(TAG_DICT)
+        _write_varint(out, len(value))
+        for key in sorted(value):
+            if type(key) is not str:
+                raise TypeError(f"Dict keys must be strings, got {type(key).__name__}")
+            _write_str(out, key)
+            _write_value(out, value[key])
+    elif value_type in (list, tuple):
+        out.append(TAG_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _write_value(out, item)
+    elif value_type is bytes:
+        out.append(TAG_BYTES)
+        _write_varint(out, len(value))
+        out += value
+    else:
+        raise TypeError(f"Cannot encode value of type {value_type.__name__}")
+
+
+def _read_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    try:
+        tag = data[pos]
+    except IndexError:
+        raise CodecError("Unexpected end of data")
+    pos += 1
+
+    if tag == TAG_STR:
+        return _read_str(data, pos)
+    if tag == TAG_HASH:
+        end = pos + 32
+        if end > len(data):
+            raise CodecError("Unexpected end of data in hash")
+        return data[pos:end].hex(), end
+    if tag == TAG_FLOAT:
+        end = pos + 8
+        if end > len(data):
+            raise CodecError("Unexpected end of data in float")
+        return _FLOAT.unpack_from(data, pos)[0], end
+    if tag == TAG_INT:
+        raw, pos = _read_varint(data, pos)
+        return (raw >> 1) if not raw & 1 else -((raw + 1) >> 1), pos
+    if tag == TAG_DICT:
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _read_str(data, pos)
+            result[key], pos = _read_value(data, pos)
+        return result, pos
+    if tag == TAG_LIST:
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _read_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == TAG_NONE:
+        return None, pos
+    if tag == TAG_TRUE:
+        return True, pos
+    if tag == TAG_FALSE:
+        return False, pos
+    if tag == TAG_BYTES:
+        length, pos = _read_varint(data, pos)
+        end = pos + length
+        if end > len(data):
+            raise CodecError("Unexpected end of data in bytes")
+        return bytes(data[pos:end]), end
+    raise CodecError(f"Unknown value tag 0x{tag:02x}")
+
+
+def _write_header(out: bytearray, kind: int) -> None:
+    out += MAGIC
+    out.append(CODEC_VERSION)
+    out.append(kind)
+
+
+def _read_header(data: bytes, kind: int) -> int:
+    if len(data) < 4 or data[:2] != MAGIC:
+        raise CodecError("Missing codec magic")
+    if data[2] != CODEC_VERSION:
+        raise CodecError(f"Unsupported codec version {data[2]}")
+    if data[3] != kind:
+        raise CodecError(f"Unexpected record kind {data[3]} (expected {kind})")
+    return 4
+
+
+def _write_hash_field(out: bytearray, value: Any) -> None:
+    """Header-Hash: 32 Bytes (binär gespeichert oder gültiger Hex-Hash) oder beliebiger String"""
+    if type(value) is bytes and len(value) == 32:
+        out.append(TAG_HASH)
+        out += value
+    else:
+        _write_value(out, value)
+
+
+def _write_block(out: bytearray, block: Any) -> None:
+    """
+    Schreibt Header und längenpräfixierte Transaktionen eines Blocks
+
+    Die (sortierten) Schlüssel der Transaktionen stehen einmal pro Block in einer
+    Schlüsseltabelle; jede Transaktion verweist nur noch auf ihren Eintrag.
+    """
+    header = block.header
+    _write_value(out, header.index)
+    _write_value(out, header.timestamp)
+    _write_hash_field(out, header.previous_hash)
+    _write_hash_field(out, header.merkle_root)
+    _write_value(out, header.nonce)
+    _write_value(out, header.difficulty)
+    _write_hash_field(out, header.hash)
+    _write_varint(out, block.merkle_version)
+
+    shapes: Dict[Tuple[str, ...], int] = {}
+    # Pro Schlüssel-Tupel der Transaktions-Datensätze: Shape-ID und sortierte Feldpositionen
+    layouts: Dict[Tuple[str, ...], Tuple[int, List[Tuple[int, str]]]] = {}
+    pack_float = _FLOAT.pack
+    is_hex_hash = _is_hex_hash
+    bodies = bytearray()
+    tx_out = bytearray()
+    tx_count = 0
+    for record in block.transaction_records():
+        record_keys = record[0]
+        layout = layouts.get(record_keys)
+        if layout is None:
+            keys = tuple(sorted(record_keys))
+            shape_id = shapes.get(keys)
+            if shape_id is None:
+                shape_id = shapes[keys] = len(shapes)
+            positions = {key: position for position, key in enumerate(record_keys, 1)}
+            layout = layouts[record_keys] = (shape_id, [(positions[key], key) for key in keys])
+        shape_id, fields = layout
+
+        tx_out.clear()
+        _write_varint(tx_out, shape_id)
+        for position, key in fields:
+            value = record[position]
+            value_type = type(value)
+            # Häufige Typen direkt schreiben, alles andere über _write_value
+            if value_type is float:
+                tx_out.append(TAG_FLOAT)
+                tx_out += pack_float(value)
+            elif value_type is str and len(value) < 0x80 and not is_hex_hash(value) and value.isascii():
+                tx_out.append(TAG_STR)
+                tx_out.append(len(value))
+                tx_out += value.encode()
+            elif value_type is bytes and key == "id" and len(value) == 32:
+                # Binär gespeicherte Transaktions-ID
+                tx_out.append(TAG_HASH)
+                tx_out += value
+            else:
+                _write_value(tx_out, value)
+        _write_varint(bodies, len(tx_out))
+        bodies += tx_out
+        tx_count += 1
+
+    _write_varint(out, len(shapes))
+    for keys in shapes:
+        _write_varint(out, len(keys))
+        for key in keys:
+            _write_str(out, key)
+    _write_varint(out, tx_count)
+    out += bodies
+
+
+def _read_block_header(data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+    index, pos = _read_value(data, pos)
+    timestamp, pos = _read_value(data, pos)
+    previous_hash, pos = _read_value(data, pos)
+    merkle_root, pos = _read_value(data, pos)
+    nonce, pos = _read_value(data, pos)
+    difficulty, pos = _read_value(data, pos)
+    block_hash, pos = _read_value(data, pos)
+    merkle_version, pos = _read_varint(data, pos)
+    return {
+        'index': index,
+        'timestamp': timestamp,
+        'previous_hash': previous_hash,
+        'merkle_root': merkle_root,
+        'merkle_version': merkle_version,
+        'nonce': nonce,
+        'hash': block_hash,
+        'difficulty': difficulty
+    }, pos
+
+
+def _read_transactions(data: bytes, pos: int, records: bool = False) -> Tuple[List[Any], int]:
+    """
+    Liest die Transaktionen eines Blocks
+
+    Args:
+        records: Statt Dicts kompakte Datensätze (Schlüssel-Tupel, Werte...) liefern,
+                 wie sie Block intern speichert; die Transaktions-ID bleibt dann binär
+    """
+    shape_count, pos = _read_varint(data, pos)
+    shapes = []
+    for _ in range(shape_count):
+        key_count, pos = _read_varint(data, pos)
+        keys = []
+        for _ in range(key_count):
+            key, pos = _read_str(data, pos)
+            keys.append(key)
+        shapes.append(tuple(keys))
+
+    tx_count, pos = _read_varint(data, pos)
+    transactions = []
+    read_value = _read_value
+    unpack_float = _FLOAT.unpack_from
+    try:
+        for _ in range(tx_count):
+            length, pos = _read_varint(data, pos)
+            end = pos + length
+            if end > len(data):
+                raise CodecError("Unexpected end of data in transaction")
+            shape_id, pos = _read_varint(data, pos)
+            try:
+                keys = shapes[shape_id]
+            except IndexError:
+                raise CodecError(f"Unknown transaction shape {shape_id}")
+
+            values = [keys] if records else []
+            for key in keys:
+                # Häufige Typen direkt lesen, alles andere über _read_value
+                tag = data[pos]
+                if tag == TAG_STR and data[pos + 1] < 0x80:
+                    start = pos + 2
+                    pos = start + data[pos + 1]
+                    values.append(str(data[start:pos], 'utf-8'))
+                elif tag == TAG_HASH:
+                    start = pos + 1
+                    pos = start + 32
+                    if records and key == "id":
+                        values.append(bytes(data[start:pos]))
+                    else:
+                        values.append(data[start:pos].hex())
+                elif tag == TAG_FLOAT:
+                    values.append(unpack_float(data, pos + 1)[0])
+                    pos += 9
+                else:
+                    value, pos = read_value(data, pos)
+                    values.append(value)
+            if pos != end:
+                raise CodecError("Transaction length mismatch")
+            transactions.append(tuple(values) if records else dict(zip(keys, values)))
+    except (IndexError, struct.error):
+        raise CodecError("Unexpected end of data in transaction")
+    except UnicodeDecodeError as e:
+        # Schneller Pfad für kurze Strings dekodiert ohne _read_str
+        raise CodecError(f"Invalid UTF-8 in transaction: {e.reason}")
+    return transactions, pos
+
+
+def _read_block(data: bytes, pos: int) -> Tuple[Dict[str, Any], int]:
+    block, pos = _read_block_header(data, pos)
+    block['transactions'], pos = _read_transactions(data, pos)
+    # Gleiche Schlüsselreihenfolge wie Block.to_dict()
+    return {key: block[key] for key in _BLOCK_FIELDS}, pos
+
+
+def canonical_bytes(value: Any) -> bytes:
+    """
+    Deterministische Binärdarstellung eines Werts
+
+    Gleiche Inhalte ergeben unabhängig von der Schlüsselreihenfolge dieselben
+    Bytes, daher auch als Eingabe für Hashes und Prüfsummen geeignet.
+    """
+    out = bytearray()
+    _write_header(out, _KIND_VALUE)
+    _write_value(out, value)
+    return bytes(out)
+
+
+def decode_value(data: bytes) -> Any:
+    """Gegenstück zu canonical_bytes"""
+    value, pos = _read_value(data, _read_header(data, _KIND_VALUE))
+    if pos != len(data):
+        raise CodecError("Trailing data after value")
+    return value
+
+
+def encode_transaction(tx: Dict[str, Any]) -> bytes:
+    """Kodiert eine Transaktion"""
+    out = bytearray()
+    _write_header(out, _KIND_TRANSACTION)
+    _write_value(out, tx)
+    return bytes(out)
+
+
+def decode_transaction(data: bytes) -> Dict[str, Any]:
+    """Dekodiert eine Transaktion in ihr Dict"""
+    tx, pos = _read_value(data, _read_header(data, _KIND_TRANSACTION))
+    if pos != len(data) or type(tx) is not dict:
+        raise CodecError("Invalid transaction record")
+    return tx
+
+
+def encode_block(block: Any) -> bytes:
+    """
+    Kodiert einen Block (Header, Merkle-Version und Transaktionen)
+
+    Args:
+        block: Ein Block-Objekt aus blockchain.py
+    """
+    out = bytearray()
+    _write_header(out, _KIND_BLOCK)
+    _write_block(out, block)
+    return bytes(out)
+
+
+def decode_block(data: bytes) -> Dict[str, Any]:
+    """
+    Dekodiert einen Block
+
+    Returns:
+        Dict in derselben Form wie Block.to_dict()
+    """
+    block, pos = _read_block(data, _read_header(data, _KIND_BLOCK))
+    if pos != len(data):
+        raise CodecError("Trailing data after block")
+    return block
+
+
+def decode_block_header(data: bytes) -> Dict[str, Any]:
+    """
+    Dekodiert nur den Header eines Blocks
+
+    Die Transaktionen werden nicht gelesen; data darf nach dem Header abgeschnitten sein.
+    """
+    return _read_block_header(data, _read_header(data, _KIND_BLOCK))[0]
+
+
+def decode_block_records(data: bytes) -> Tuple[Dict[str, Any], List[Tuple[Any, ...]]]:
+    """
+    Dekodiert einen Block ohne Transaktions-Dicts zu erzeugen
+
+    Returns:
+        (Header-Felder wie in Block.to_dict() ohne 'transactions', kompakte Transaktions-Datensätze)
+    """
+    header, pos = _read_block_header(data, _read_header(data, _KIND_BLOCK))
+    records, pos = _read_transactions(data, pos, records=True)
+    if pos != len(data):
+        raise CodecError("Trailing data after block")
+    return header, records
+
+
+def encode_chain(blocks: Iterable[Any]) -> bytes:
+    """Kodiert eine Folge von Blöcken (z.B. für /blockchain?format=binary)"""
+    blocks = list(blocks)
+    out = bytearray()
+    _write_header(out, _KIND_CHAIN)
+    _write_varint(out, len(blocks))
+    for block in blocks:
+        _write_block(out, block)
+    return bytes(out)
+
+
+def decode_chain(data: bytes) -> List[Dict[str, Any]]:
+    """Dekodiert eine Folge von Blöcken in Dicts wie Block.to_dict()"""
+    pos = _read_header(data, _KIND_CHAIN)
+    count, pos = _read_varint(data, pos)
+    chain = []
+    for _ in range(count):
+        block, pos = _read_block(data, pos)
+        chain.append(block)
+    if pos != len(data):
+        raise CodecError("Trailing data after chain")
+    return chain
@@ -0,0 +1,848 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import serialization
+
+logger = logging.getLogger('blockchain.storage')
+
+# Standardverzeichnis für die Blockdaten (relativ zum Arbeitsverzeichnis)
+DEFAULT_DATA_DIR = "chain_data"
+
+# Neue Segmentdatei, sobald die aktuelle diese Größe erreicht
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+
+# Rahmen jedes Block-Datensatzes: Magic, Länge der Nutzdaten, CRC32 der Nutzdaten
+RECORD_MAGIC = b"CBLK"
+RECORD_HEADER = struct.Struct(">4sII")
+
+# Index-Eintrag pro Höhe: Segment, Offset, Länge, Hash-Art, Hash (32 Bytes)
+INDEX_ENTRY = struct.Struct(">IQIB32s")
+_HASH_RAW = 0
+_HASH_DIGEST = 1
+
+INDEX_FILE = "index.dat"
+STATE_FILE = "state.json"
+SEGMENT_PATTERN = "segment_{:05d}.log"
+
+
+class StorageError(Exception):
+    """Beschädigte oder inkonsistente Blockdaten"""
+
+
+def hash_key(block_hash: str) -> Tuple[int, bytes]:
+    """
+    Schlüssel eines Block-Hashes für den Index
+
+    Gültige Hex-Hashes werden binär gespeichert, beliebige andere Strings
+    (z.B. von Test-Peers) über ihren SHA-256-Digest.
+    """
+    if len(block_hash) == 64:
+        try:
+            raw = bytes.fromhex(block_hash)
+        except ValueError:
+            raw = None
+        if raw is not None and raw.hex() == block_hash:
+            return _HASH_RAW, raw
+    return _HASH_DIGEST, hashlib.sha256(block_hash.encode()).digest()
+
+
+# Zustands-Deltas seit der letzten Basis, gleicher Rahmen wie Block-Datensätze
+DELTA_FILE = "state_deltas.log"
+DELTA_MAGIC = b"CDLT"
+
+
+class StateJournal:
+    """
+    Zustand (Mempool, Parameter, verarbeitete Transaktions-IDs) als Basis plus Deltas
+
+    record() schreibt nur die Änderungen seit dem letzten Aufruf als gerahmten
+    Datensatz an das Delta-Log an; compact() fasst Basis und Deltas zu einer neuen
+    Basis zusammen. Jede Basis trägt eine Sequenznummer, Deltas mit kleinerer
+    Nummer werden beim Laden übersprungen; ein Absturz während compact() ist damit harmlos.
+    """
+    # Schlüssel, deren Werte als Mengen verwaltet und als Differenz geschrieben werden
+    SET_KEYS = ('processed_tx_ids',)
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._state: Optional[Dict[str, Any]] = None
+        self._base_sequence = 0
+        self._sequence = 0
+        self.delta_count = 0
+        self._load()
+
+    def _base_path(self) -> str:
+        return os.path.join(self.directory, STATE_FILE)
+
+    def _delta_path(self) -> str:
+        return os.path.join(self.directory, DELTA_FILE)
+
+    def _load(self) -> None:
+        if os.path.exists(self._base_path()):
+            with open(self._base_path(), 'r') as state_file:
+                base = json.load(state_file)
+            # Ältere Zustandsdateien enthalten den Zustand direkt
+            if 'sequence' not in base:
+                base = {'sequence': 0, 'state': base}
+            self._state = self._from_json(base['state'])
+            self._base_sequence = self._sequence = base['sequence']
+
+        if not os.path.exists(self._delta_path()):
+            return
+        with open(self._delta_path(), 'rb') as delta_file:
+            data = delta_file.read()
+        pos = 0
+        while pos + RECORD_HEADER.size <= len(data):
+            magic, length, checksum = RECORD_HEADER.unpack_from(data, pos)
+            payload = data[pos + RECORD_HEADER.size:pos + RECORD_HEADER.size + length]
+            if magic != DELTA_MAGIC or len(payload) != length or zlib.crc32(payload) != checksum:
+                break
+            delta = json.loads(payload)
+            if delta['sequence'] > self._sequence:
+                self._state = self._apply(self._state or {}, delta)
+                self._sequence = delta['sequence']
+                self.delta_count += 1
+            pos += RECORD_HEADER.size + length
+        if pos != len(data):
+            logger.warning("Zustands-Deltas: unvollständiger Datensatz am Ende verworfen")
+            with open(self._delta_path(), 'ab') as delta_file:
+                delta_file.truncate(pos)
+
+    def _from_json(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        state = dict(state)
+        for key in self.SET_KEYS:
+            if key in state:
+                state[key] = set(state[key])
+        return state
+
+    def _to_json(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: sorted(value) if key in self.SET_KEYS else value for key, value in state.items()}
+
+    def _apply(self, state: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+        state.update(delta['set'])
+        for key, (added, removed) in delta['sets'].items():
+            values = state.setdefault(key, set())
+            values.difference_update(removed)
+            values.update(added)
+        return state
+
+    def _write_base(self) -> None:
+        """Schreibt die Basis über Temp-Datei und atomares Umbenennen und leert das Delta-Log"""
+        path = self._base_path()
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w') as state_file:
+            json.dump({'sequence': self._sequence, 'state': self._to_json(self._state)}, state_file)
+            state_file.flush()
+            os.fsync(state_file.fileno())
+        os.replace(temp_path, path)
+        self._base_sequence = self._sequence
+        with open(self._delta_path(), 'wb'):
+            pass
+        self.delta_count = 0
+
+    def record(self, state: Dict[str, Any]) -> int:
+        """
+        Speichert einen neuen Zustand als Delta zum zuletzt gespeicherten
+
+        Returns:
+            Anzahl der Deltas seit der letzten Basis (0, wenn eine Basis geschrieben wurde)
+        """
+        new_state = self._from_json(state)
+        with self._lock:
+            self._sequence += 1
+            if self._state is None:
+                self._state = new_state
+                self._write_base()
+                return 0
+
+            delta = {'sequence': self._sequence, 'set': {}, 'sets': {}}
+            for key, value in new_state.items():
+                if key in self.SET_KEYS:
+                    old = self._state.get(key, set())
+                    delta['sets'][key] = (sorted(value - old), sorted(old - value))
+                elif self._state.get(key) != value:
+                    delta['set'][key] = value
+
+            payload = json.dumps(delta).encode()
+            with open(self._delta_path(), 'ab') as delta_file:
+                delta_file.write(RECORD_HEADER.pack(DELTA_MAGIC, len(payload), zlib.crc32(payload)) + payload)
+                delta_file.flush()
+                os.fsync(delta_file.fileno())
+            self._state = new_state
+            self.delta_count += 1
+            return self.delta_count
+
+    def compact(self) -> None:
+        """Fasst Basis und alle Deltas zu einer neuen Basis zusammen"""
+        with self._lock:
+            if self._state is not None and self.delta_count:
+                self._write_base()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Zustand aus Basis und Deltas (Mengen als Listen) oder None"""
+        with self._lock:
+            return None if self._state is None else self._to_json(self._state)
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+
+class BlockLogStore:
+    """
+    Append-only Block-Log in Segmentdateien
+
+    Jeder Block wird genau einmal als gerahmter Datensatz (serialization.encode_block)
+    mit CRC32 geschrieben. Eine Indexdatei mit Einträgen fester Größe bildet Höhe
+    und Hash auf Segment und Offset ab. Ein neuer Block kostet damit O(1) Schreibzugriffe,
+    bei einem Kettenwechsel wird nur ab der Abweichung abgeschnitten.
+    """
+    # Liefert der Store nur Header und lädt Transaktionen bei Bedarf (iter_headers/read_records)?
+    lazy_bodies = False
+
+    def __init__(self, directory: str = DEFAULT_DATA_DIR, segment_size: int = DEFAULT_SEGMENT_SIZE):
+        self.directory = directory
+        self.segment_size = segment_size
+        self._lock = threading.RLock()
+        self._entries: List[Tuple[int, int, int]] = []
+        self._keys: List[Tuple[int, bytes]] = []
+        self._height_by_key: Dict[Tuple[int, bytes], int] = {}
+        self._segment_file = None
+        self._index_file = None
+        self._segment = 0
+        self._segment_end = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+        self.state_journal = StateJournal(directory)
+
+    @staticmethod
+    def exists(directory: str = DEFAULT_DATA_DIR) -> bool:
+        """Prüft, ob in directory bereits ein Block-Log liegt"""
+        return os.path.exists(os.path.join(directory, INDEX_FILE))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, SEGMENT_PATTERN.format(segment))
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def _open(self) -> None:
+        """Lädt den Index und repariert ein unvollständig geschriebenes Ende"""
+        index_path = self._index_path()
+        data = b""
+        if os.path.exists(index_path):
+            with open(index_path, 'rb') as index_file:
+                data = index_file.read()
+
+        count = len(data) // INDEX_ENTRY.size
+        for height in range(count):
+            segment, offset, length, kind, key = INDEX_ENTRY.unpack_from(data, height * INDEX_ENTRY.size)
+            self._entries.append((segment, offset, length))
+            self._keys.append((kind, key))
+            self._height_by_key[(kind, key)] = height
+
+        # Einträge am Ende verwerfen, deren Datensatz fehlt oder beschädigt ist
+        dropped = 0
+        while self._entries and not self._record_intact(len(self._entries) - 1):
+            self._drop_last_entry()
+            dropped += 1
+        if dropped:
+            logger.warning(f"Block-Log: {dropped} unvollständige Einträge am Ende verworfen")
+
+        if len(data) != len(self._entries) * INDEX_ENTRY.size:
+            with open(index_path, 'ab') as index_file:
+                index_file.truncate(len(self._entries) * INDEX_ENTRY.size)
+
+        if self._entries:
+            segment, offset, length = self._entries[-1]
+            self._segment = segment
+            self._segment_end = offset + RECORD_HEADER.size + length
+        else:
+            self._segment = 0
+            self._segment_end = 0
+        self._truncate_segments(self._segment, self._segment_end)
+
+        self._index_file = open(index_path, 'ab')
+        self._segment_file = open(self._segment_path(self._segment), 'ab')
+
+    def _drop_last_entry(self) -> None:
+        self._entries.pop()
+        key = self._keys.pop()
+        if self._height_by_key.get(key) == len(self._keys):
+            del self._height_by_key[key]
+
+    def _record_intact(self, height: int) -> bool:
+        try:
+            self._read_payload(height)
+            return True
+        except (OSError, StorageError):
+            return False
+
+    def _truncate_segments(self, segment: int, end: int) -> None:
+        """Schneidet das Segment bei end ab und löscht alle späteren Segmente"""
+        path = self._segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) > end:
+            with open(path, 'ab') as segment_file:
+                segment_file.truncate(end)
+        later = segment + 1
+        while os.path.exists(self._segment_path(later)):
+            os.remove(self._segment_path(later))
+            later += 1
+
+    def _read_payload(self, height: int) -> bytes:
+        segment, offset, length = self._entries[height]
+        with open(self._segment_path(segment), 'rb') as segment_file:
+            segment_file.seek(offset)
+            frame = segment_file.read(RECORD_HEADER.size + length)
+        if len(frame) != RECORD_HEADER.size + length:
+            raise StorageError(f"Block {height}: record truncated")
+        magic, stored_length, checksum = RECORD_HEADER.unpack_from(frame)
+        payload = frame[RECORD_HEADER.size:]
+        if magic != RECORD_MAGIC or stored_length != length or zlib.crc32(payload) != checksum:
+            raise StorageError(f"Block {height}: checksum mismatch")
+        return payload
+
+    def append(self, block: Any) -> int:
+        """
+        Hängt einen Block an das Log an
+
+        Returns:
+            Höhe des geschriebenen Blocks
+        """
+        return self.append_payload(serialization.encode_block(block), block.hash)
+
+    def append_payload(self, payload: bytes, block_hash: Optional[str] = None) -> int:
+        """
+        Hängt einen bereits kodierten Block (serialization.encode_block) an
+
+        Returns:
+            Höhe des geschriebenen Blocks
+        """
+        if block_hash is None:
+            block_hash = serialization.decode_block_header(payload)['hash']
+        frame = RECORD_HEADER.pack(RECORD_MAGIC, len(payload), zlib.crc32(payload)) + payload
+        kind, key = hash_key(block_hash)
+
+        with self._lock:
+            if self._segment_end and self._segment_end + len(frame) > self.segment_size:
+                self._segment_file.close()
+                self._segment += 1
+                self._segment_end = 0
+                self._segment_file = open(self._segment_path(self._segment), 'ab')
+
+            # Erst den Datensatz, dann den Indexeintrag schreiben: ein Absturz
+            # dazwischen hinterlässt nur unindizierte Bytes, die _open entfernt
+            offset = self._segment_end
+            self._segment_file.write(frame)
+            self._segment_file.flush()
+            self._index_file.write(INDEX_ENTRY.pack(self._segment, offset, len(payload), kind, key))
+            self._index_file.flush()
+
+            height = len(self._entries)
+            self._entries.append((self._segment, offset, len(payload)))
+            self._keys.append((kind, key))
+            self._height_by_key[(kind, key)] = height
+            self._segment_end = offset + len(frame)
+            return height
+
+    def truncate(self, height: int) -> None:
+        """Entfernt alle Blöcke ab height (z.B. nach einem Kettenwechsel)"""
+        with self._lock:
+            if height >= len(self._entries):
+                return
+            segment, offset, _ = self._entries[height]
+            while len(self._entries) > height:
+                self._drop_last_entry()
+
+            self._segment_file.close()
+            self._index_file.truncate(height * INDEX_ENTRY.size)
+            self._truncate_segments(segment, offset)
+            self._segment = segment
+            self._segment_end = offset
+            self._segment_file = open(self._segment_path(segment), 'ab')
+
+    def sync_chain(self, chain: List[Any],
+                   progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Gleicht das Log mit einer Kette ab
+
+        Da Blöcke über previous_hash verkettet sind, genügt der Vergleich des
+        gespeicherten Tips: im Normalfall werden nur neue Blöcke angehängt, bei
+        einem Kettenwechsel wird bis zum gemeinsamen Vorgänger abgeschnitten.
+
+        Args:
+            chain: Zu speichernde Kette
+            progress: Optionaler Callback (geschrieben, gesamt) nach jedem Block
+
+        Returns:
+            Anzahl der neu geschriebenen Blöcke
+        """
+        with self._lock:
+            common = min(len(self._entries), len(chain))
+            while common > 0 and self._keys[common - 1] != hash_key(chain[common - 1].hash):
+                common -= 1
+            self.truncate(common)
+            total = len(chain) - common
+            for done, block in enumerate(chain[common:], 1):
+                self.append(block)
+                if progress:
+                    progress(done, total)
+            return total
+
+    def read_block(self, height: int) -> Tuple[Dict[str, Any], List[Tuple[Any, ...]]]:
+        """
+        Liest einen Block
+
+        Returns:
+            (Header-Felder, kompakte Transaktions-Datensätze) für Block.from_records
+        """
+        with self._lock:
+            if not 0 <= height < len(self._entries):
+                raise IndexError(f"Block height {height} not in store")
+            payload = self._read_payload(height)
+        return serialization.decode_block_records(payload)
+
+    def iter_blocks(self) -> Iterator[Tuple[Dict[str, Any], List[Tuple[Any, ...]]]]:
+        """Liest alle Blöcke der Reihe nach"""
+        for payload in self.iter_payloads():
+            yield serialization.decode_block_records(payload)
+
+    def iter_payloads(self) -> Iterator[bytes]:
+        """Liest die kodierten Blöcke der Reihe nach, jedes Segment wird nur einmal geöffnet"""
+        with self._lock:
+            entries = list(self._entries)
+        segment_file = None
+        current = None
+        try:
+            for height, (segment, offset, length) in enumerate(entries):
+                if segment != current:
+                    if segment_file:
+                        segment_file.close()
+                    segment_file = open(self._segment_path(segment), 'rb')
+                    current = segment
+                segment_file.seek(offset)
+                frame = segment_file.read(RECORD_HEADER.size + length)
+                magic, _, checksum = RECORD_HEADER.unpack_from(frame)
+                payload = frame[RECORD_HEADER.size:]
+                if magic != RECORD_MAGIC or zlib.crc32(payload) != checksum:
+                    raise StorageError(f"Block {height}: checksum mismatch")
+                yield payload
+        finally:
+            if segment_file:
+                segment_file.close()
+
+    def height_of(self, block_hash: str) -> Optional[int]:
+        """Höhe eines Blocks anhand seines Hashes oder None"""
+        return self._height_by_key.get(hash_key(block_hash))
+
+    def verify(self) -> List[int]:
+        """Prüft die Prüfsummen aller Datensätze und liefert die Höhen beschädigter Blöcke"""
+        return [height for height in range(len(self._entries)) if not self._record_intact(height)]
+
+    def save_state(self, state: Dict[str, Any]) -> int:
+        """
+        Speichert den Zustand (Mempool, Parameter) als Delta zum letzten Checkpoint
+
+        Returns:
+            Anzahl der Deltas seit der letzten Basis
+        """
+        return self.state_journal.record(state)
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        return self.state_journal.load()
+
+    def compact_state(self) -> None:
+        """Fasst die Zustands-Deltas zu einer neuen Basis zusammen"""
+        self.state_journal.compact()
+
+    def flush(self) -> None:
+        """Schreibt alle Daten dauerhaft auf den Datenträger"""
+        with self._lock:
+            for handle in (self._segment_file, self._index_file):
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in (self._segment_file, self._index_file):
+                if handle and not handle.closed:
+                    handle.close()
+
+
+class MmapBlockStore(BlockLogStore):
+    """
+    Block-Log mit Lesezugriff über Memory-Mapping
+
+    Gleiches Dateiformat wie BlockLogStore. Beim Laden werden nur die Header
+    dekodiert; Transaktionen liest read_records bei Bedarf aus den gemappten
+    Segmenten, der Arbeitsspeicher bleibt damit weit unter der Kettengröße.
+    """
+    lazy_bodies = True
+
+    # So viele Bytes reichen für einen Header mit Hex-Hashes; längere Header werden voll gelesen
+    HEADER_PROBE_SIZE = 256
+
+    def __init__(self, directory: str = DEFAULT_DATA_DIR, segment_size: int = DEFAULT_SEGMENT_SIZE):
+        self._maps: Dict[int, mmap.mmap] = {}
+        super().__init__(directory, segment_size)
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        """Mapping eines Segments, das mindestens bis end reicht (wächst mit neuen Blöcken)"""
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < end:
+            if mapped is not None:
+                mapped.close()
+            # Das aktuelle Segment kann noch gepufferte Daten enthalten
+            if segment == self._segment and self._segment_file is not None:
+                self._segment_file.flush()
+            with open(self._segment_path(segment), 'rb') as segment_file:
+                mapped = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mapped
+        return mapped
+
+    def _unmap_from(self, segment: int) -> None:
+        for mapped_segment in [s for s in self._maps if s >= segment]:
+            self._maps.pop(mapped_segment).close()
+
+    def _read_payload(self, height: int) -> bytes:
+        segment, offset, length = self._entries[height]
+        end = offset + RECORD_HEADER.size + length
+        try:
+            mapped = self._map(segment, end)
+        except (OSError, ValueError):
+            raise StorageError(f"Block {height}: segment missing or empty")
+        if len(mapped) < end:
+            raise StorageError(f"Block {height}: record truncated")
+        magic, stored_length, checksum = RECORD_HEADER.unpack_from(mapped, offset)
+        payload = mapped[offset + RECORD_HEADER.size:end]
+        if magic != RECORD_MAGIC or stored_length != length or zlib.crc32(payload) != checksum:
+            raise StorageError(f"Block {height}: checksum mismatch")
+        return payload
+
+    def _truncate_segments(self, segment: int, end: int) -> None:
+        # Gemappte Dateien dürfen nicht unter dem Mapping abgeschnitten werden
+        self._unmap_from(segment)
+        super()._truncate_segments(segment, end)
+
+    def iter_headers(self) -> Iterator[Dict[str, Any]]:
+        """Dekodiert nacheinander nur die Header aller Blöcke"""
+        with self._lock:
+            entries = list(self._entries)
+            for height, (segment, offset, length) in enumerate(entries):
+                mapped = self._map(segment, offset + RECORD_HEADER.size + length)
+                start = offset + RECORD_HEADER.size
+                try:
+                    yield serialization.decode_block_header(
+                        mapped[start:start + min(length, self.HEADER_PROBE_SIZE)])
+                except serialization.CodecError:
+                    yield serialization.decode_block_header(mapped[start:start + length])
+
+    def read_records(self, height: int, block_hash: Optional[str] = None) -> List[Tuple[Any, ...]]:
+        """
+        Liest die Transaktionen eines Blocks als kompakte Datensätze
+
+        Args:
+            height: Höhe des Blocks
+            block_hash: Erwarteter Hash; schützt lazy geladene Blöcke davor, nach
+                        einem Kettenwechsel einen anderen Block an derselben Höhe zu lesen
+        """
+        with self._lock:
+            if not 0 <= height < len(self._entries):
+                raise StorageError(f"Block height {height} no longer in store")
+            payload = self._read_payload(height)
+        fields, records = serialization.decode_block_records(payload)
+        if block_hash is not None and fields['hash'] != block_hash:
+            raise StorageError(f"Block {height} was replaced in the store")
+        return records
+
+    def close(self) -> None:
+        with self._lock:
+            self._unmap_from(0)
+            super().close()
+
+
+SQLITE_FILE = "chain.sqlite3"
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    height INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    previous_hash TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    tx_count INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blocks_hash ON blocks(hash);
+CREATE TABLE IF NOT EXISTS transactions (
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    tx_id TEXT,
+    sender TEXT,
+    recipient TEXT,
+    amount,
+    PRIMARY KEY (height, position)
+);
+CREATE INDEX IF NOT EXISTS transactions_id ON transactions(tx_id);
+CREATE TABLE IF NOT EXISTS postings (
+    address TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    amount NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_address ON postings(address, height, position);
+"""
+
+
+class SqliteBlockStore:
+    """
+    Block-Store in einer SQLite-Datenbank (WAL-Modus)
+
+    Gleiche Schnittstelle wie BlockLogStore. Blöcke liegen als kodierte Datensätze
+    (serialization.encode_block) in der Tabelle blocks; zusätzlich werden
+    Transaktionen und Buchungen pro Adresse indiziert, sodass Abfragen nach
+    Transaktions-ID, Block-Hash oder Adresse ohne Durchlauf der Kette möglich sind.
+    """
+    lazy_bodies = False
+
+    def __init__(self, directory: str = DEFAULT_DATA_DIR):
+        self.directory = directory
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(directory, SQLITE_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        with self._conn:
+            self._conn.executescript(_SQLITE_SCHEMA)
+
+        # Hashes aller Höhen für den Abgleich in sync_chain
+        self._hashes: List[str] = [row[0] for row in
+                                   self._conn.execute("SELECT hash FROM blocks ORDER BY height")]
+        self.state_journal = StateJournal(directory)
+
+    @staticmethod
+    def exists(directory: str = DEFAULT_DATA_DIR) -> bool:
+        """Prüft, ob in directory bereits eine Block-Datenbank liegt"""
+        return os.path.exists(os.path.join(directory, SQLITE_FILE))
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _insert(self, payload: bytes, fields: Dict[str, Any], transactions: Iterable[Dict[str, Any]]) -> int:
+        height = len(self._hashes)
+        rows = []
+        postings = []
+        for position, tx in enumerate(transactions):
+            amount = tx.get('amount')
+            rows.append((height, position, tx.get('id'), tx.get('from'), tx.get('to'), amount))
+            # Wie im AddressIndex jede beteiligte Adresse buchen; Ausgänge sind negativ
+            if not isinstance(amount, (int, float)):
+                amount = 0
+            if tx.get('from') is not None:
+                postings.append((tx['from'], height, position, -amount))
+            if tx.get('to') is not None:
+                postings.append((tx['to'], height, position, amount))
+
+        self._conn.execute("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?)",
+                           (height, fields['hash'], fields['previous_hash'], fields['timestamp'],
+                            len(rows), payload))
+        self._conn.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self._conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", postings)
+        self._hashes.append(fields['hash'])
+        return height
+
+    def _insert_block(self, block: Any) -> int:
+        fields = {'hash': block.hash, 'previous_hash': block.previous_hash, 'timestamp': block.timestamp}
+        return self._insert(serialization.encode_block(block), fields, block.iter_transactions())
+
+    def _delete_from(self, height: int) -> None:
+        for table in ("blocks", "transactions", "postings"):
+            self._conn.execute(f"DELETE FROM {table} WHERE height >= ?", (height,))
+        del self._hashes[height:]
+
+    def append(self, block: Any) -> int:
+        """
+        Hängt einen Block an
+
+        Returns:
+            Höhe des geschriebenen Blocks
+        """
+        with self._lock, self._conn:
+            return self._insert_block(block)
+
+    def append_payload(self, payload: bytes, block_hash: Optional[str] = None) -> int:
+        """
+        Hängt einen bereits kodierten Block (serialization.encode_block) an
+
+        Returns:
+            Höhe des geschriebenen Blocks
+        """
+        block = serialization.decode_block(payload)
+        with self._lock, self._conn:
+            return self._insert(payload, block, block['transactions'])
+
+    def truncate(self, height: int) -> None:
+        """Entfernt alle Blöcke ab height (z.B. nach einem Kettenwechsel)"""
+        with self._lock, self._conn:
+            if height < len(self._hashes):
+                self._delete_from(height)
+
+    def sync_chain(self, chain: List[Any],
+                   progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Gleicht die Datenbank mit einer Kette ab (eine Transaktion)
+
+        Args:
+            chain: Zu speichernde Kette
+            progress: Optionaler Callback (geschrieben, gesamt) nach jedem Block
+
+        Returns:
+            Anzahl der neu geschriebenen Blöcke
+        """
+        with self._lock, self._conn:
+            common = min(len(self._hashes), len(chain))
+            while common > 0 and self._hashes[common - 1] != chain[common - 1].hash:
+                common -= 1
+            if common < len(self._hashes):
+                self._delete_from(common)
+            total = len(chain) - common
+            for done, block in enumerate(chain[common:], 1):
+                self._insert_block(block)
+                if progress:
+                    progress(done, total)
+            return total
+
+    def read_block(self, height: int) -> Tuple[Dict[str, Any], List[Tuple[Any, ...]]]:
+        """
+        Liest einen Block
+
+        Returns:
+            (Header-Felder, kompakte Transaktions-Datensätze) für Block.from_records
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM blocks WHERE height = ?", (height,)).fetchone()
+        if row is None:
+            raise IndexError(f"Block height {height} not in store")
+        return serialization.decode_block_records(row[0])
+
+    def iter_blocks(self) -> Iterator[Tuple[Dict[str, Any], List[Tuple[Any, ...]]]]:
+        """Liest alle Blöcke der Reihe nach"""
+        for payload in self.iter_payloads():
+            yield serialization.decode_block_records(payload)
+
+    def iter_payloads(self, batch_size: int = 256) -> Iterator[bytes]:
+        """Liest die kodierten Blöcke der Reihe nach in Stapeln von batch_size"""
+        height = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute("SELECT payload FROM blocks WHERE height >= ? ORDER BY height LIMIT ?",
+                                          (height, batch_size)).fetchall()
+            if not rows:
+                return
+            for (payload,) in rows:
+                yield payload
+            height += len(rows)
+
+    def height_of(self, block_hash: str) -> Optional[int]:
+        """Höhe eines Blocks anhand seines Hashes oder None"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(height) FROM blocks WHERE hash = ?", (block_hash,)).fetchone()
+        return row[0]
+
+    def in_sync_with(self, chain: List[Any]) -> bool:
+        """Prüft, ob die Datenbank genau die Blöcke von chain enthält"""
+        with self._lock:
+            return len(self._hashes) == len(chain) and (not chain or self._hashes[-1] == chain[-1].hash)
+
+    def transaction_location(self, tx_id: str) -> Optional[Tuple[int, int]]:
+        """(Höhe, Position im Block) des ersten Vorkommens einer Transaktion oder None"""
+        with self._lock:
+            row = self._conn.execute("SELECT height, position FROM transactions WHERE tx_id = ? "
+                                     "ORDER BY height, position LIMIT 1", (tx_id,)).fetchone()
+        return tuple(row) if row else None
+
+    def address_postings(self, address: str, limit: Optional[int] = None, after: Optional[Tuple[int, int]] = None,
+                         newest_first: bool = False) -> List[Tuple[int, int]]:
+        """
+        Eine Seite von (Höhe, Position) der Transaktionen einer Adresse
+
+        Gleiche Bedeutung der Argumente wie indexes.AddressIndex.page.
+        """
+        sql = "SELECT DISTINCT height, position FROM postings WHERE address = ?"
+        params: List[Any] = [address]
+        if after is not None:
+            sql += " AND (height, position) < (?, ?)" if newest_first else " AND (height, position) > (?, ?)"
+            params += list(after)
+        sql += " ORDER BY height DESC, position DESC" if newest_first else " ORDER BY height, position"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(sql, params)]
+
+    def verify(self) -> List[int]:
+        """Prüft alle Datensätze und liefert die Höhen beschädigter Blöcke"""
+        broken = []
+        with self._lock:
+            rows = self._conn.execute("SELECT height, hash, payload FROM blocks ORDER BY height").fetchall()
+        for height, block_hash, payload in rows:
+            try:
+                if serialization.decode_block_records(payload)[0]['hash'] != block_hash:
+                    broken.append(height)
+            except serialization.CodecError:
+                broken.append(height)
+        return broken
+
+    def save_state(self, state: Dict[str, Any]) -> int:
+        """
+        Speichert den Zustand (Mempool, Parameter) als Delta zum letzten Checkpoint
+
+        Returns:
+            Anzahl der Deltas seit der letzten Basis
+        """
+        return self.state_journal.record(state)
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        return self.state_journal.load()
+
+    def compact_state(self) -> None:
+        """Fasst die Zustands-Deltas zu einer neuen Basis zusammen"""
+        self.state_journal.compact()
+
+    def flush(self) -> None:
+        """Jede Änderung wird bereits beim Commit dauerhaft geschrieben"""
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Verfügbare Block-Stores (gleiches Dateiformat, unterschiedliche Lesestrategie)
+STORE_TYPES = {
+    "log": BlockLogStore,
+    "mmap": MmapBlockStore,
+    "sqlite": SqliteBlockStore
+}
+DEFAULT_STORE_TYPE = "mmap"
+
+
+def open_block_store(directory: str = DEFAULT_DATA_DIR, store_type: str = DEFAULT_STORE_TYPE) -> Any:
+    """Öffnet einen Block-Store des angegebenen Typs"""
+    if store_type not in STORE_TYPES:
+        raise ValueError(f"Unknown store type {store_type!r}, expected one of {sorted(STORE_TYPES)}")
+    return STORE_TYPES[store_type](directory)
@@ -0,0 +1,75 @@
+import sys
+import os
+import io
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import serialization
+from archive import ArchiveReader, ArchiveWriter, ArchiveError
+from blockchain import Block, Blockchain
+
+
+def make_payloads(count):
+    payloads = []
+    previous_hash = "0"
+    for i in range(count):
+        transactions = [{"from": f"addr{j}", "to": f"addr{j + 1}", "amount": j} for j in range(20)]
+        block = Block(i, 1000.0 + i, transactions, previous_hash)
+        payloads.append(serialization.encode_block(block))
+        previous_hash = block.hash
+    return payloads
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "lzma"])
+def test_archive_roundtrip(compression):
+    """Test, ob Blöcke, Zustand und Metadaten stapelweise geschrieben und gelesen werden"""
+    payloads = make_payloads(10)
+    output = io.BytesIO()
+    writer = ArchiveWriter(output, compression, batch_size=4)
+    assert writer.write_blocks(payloads) == 10
+    writer.finish({"difficulty": 2}, {"chain_length": 10})
+
+    if compression != "none":
+        assert len(output.getvalue()) < sum(len(p) for p in payloads) / 2
+
+    reader = ArchiveReader(io.BytesIO(output.getvalue()))
+    assert list(reader.blocks()) == payloads
+    assert reader.complete
+    assert reader.state == {"difficulty": 2}
+    assert reader.metadata == {"chain_length": 10}
+
+
+def test_archive_detects_corruption():
+    """Test, ob beschädigte und abgeschnittene Archive erkannt werden"""
+    output = io.BytesIO()
+    writer = ArchiveWriter(output, "zlib", batch_size=4)
+    writer.write_blocks(make_payloads(10))
+    writer.finish(None, {})
+    data = output.getvalue()
+
+    with pytest.raises(ArchiveError):
+        list(ArchiveReader(io.BytesIO(data[:-10])).blocks())
+
+    corrupted = bytearray(data)
+    corrupted[20] ^= 0xFF
+    with pytest.raises(ArchiveError):
+        list(ArchiveReader(io.BytesIO(bytes(corrupted))).blocks())
+
+
+def test_export_and_import_checkpoint(tmp_path):
+    """Test, ob eine Blockchain über ein Archiv auf einen anderen Host übertragen werden kann"""
+    bc = Blockchain(difficulty=1, data_dir=str(tmp_path / "source"))
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    bc.add_transaction("alice", "bob", 5)
+    archive_path = str(tmp_path / "backup.carc")
+    assert bc.export_checkpoint(archive_path, "lzma")
+
+    target = Blockchain(difficulty=1, data_dir=str(tmp_path / "target"), store_type="sqlite")
+    assert target.import_checkpoint(archive_path)
+    assert [b.to_dict() for b in target.chain] == [b.to_dict() for b in bc.chain]
+    assert target.pending_transactions == bc.pending_transactions
+    assert target.get_balance("alice") == 50
+    assert not os.path.exists(str(tmp_path / "target.import"))
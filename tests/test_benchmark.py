@@ -0,0 +1,74 @@
+import sys
+import os
+import json
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain import MerkleTree
+import benchmark as bench
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAS_PYTEST_BENCHMARK = True
+except ImportError:
+    HAS_PYTEST_BENCHMARK = False
+
+# Die Benchmark-Fälle laufen nur, wenn pytest-benchmark installiert ist
+requires_pytest_benchmark = pytest.mark.skipif(not HAS_PYTEST_BENCHMARK,
+                                               reason="pytest-benchmark ist nicht installiert")
+
+
+@requires_pytest_benchmark
+def test_bench_calculate_hash(benchmark):
+    """Benchmark von Block.calculate_hash"""
+    block = bench.make_block()
+    benchmark(block.calculate_hash)
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("difficulty", [2, 3])
+def test_bench_mine_block(benchmark, difficulty):
+    """Benchmark von Block.mine_block bei fester Schwierigkeit und Start-Nonce"""
+    def mine():
+        block = bench.make_block()
+        block.mine_block(difficulty)
+        return block
+
+    block = benchmark(mine)
+    assert block.hash.startswith("0" * difficulty)
+
+
+@requires_pytest_benchmark
+@pytest.mark.parametrize("tx_count", [1, 100, 10000])
+def test_bench_merkle_root(benchmark, tx_count):
+    """Benchmark von MerkleTree.create_merkle_root für verschiedene Blockgrößen"""
+    transactions = bench.make_transactions(tx_count)
+    benchmark(MerkleTree.create_merkle_root, transactions)
+
+
+def test_benchmark_results_roundtrip(tmp_path):
+    """Test, ob Ergebnisse als JSON gespeichert und wieder geladen werden können"""
+    results = bench.run_mining_benchmarks(merkle_sizes=[1, 100], difficulties=[1])
+    assert {"calculate_hash", "mine_block_d1", "merkle_root_1", "merkle_root_100",
+            "merkle_root_binary_100", "template_refresh_100", "codec_encode_block",
+            "codec_decode_block"} <= set(results["benchmarks"])
+    assert results["memory"]["block_bytes_10tx"] > results["memory"]["block_bytes_0tx"] > 0
+
+    filename = str(tmp_path / "bench.json")
+    bench.save_results(results, filename)
+    assert bench.load_results(filename) == json.loads(json.dumps(results))
+
+
+def test_compare_results_flags_regressions():
+    """Test, ob Durchsatzverluste über dem Schwellwert als Regression markiert werden"""
+    baseline = {"benchmarks": {"a": {"ops_per_sec": 1000}, "b": {"ops_per_sec": 1000}}}
+    current = {"benchmarks": {"a": {"ops_per_sec": 950}, "b": {"ops_per_sec": 700},
+                              "new": {"ops_per_sec": 1}}}
+
+    comparisons = {c["name"]: c for c in bench.compare_results(baseline, current, threshold=0.1)}
+
+    assert set(comparisons) == {"a", "b"}
+    assert not comparisons["a"]["regression"]
+    assert comparisons["b"]["regression"]
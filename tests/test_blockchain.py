@@ -2,6 +2,7 @@ import sys
 import os
 import pytest
 import time
+import json
 from typing import Dict, Any
 
 # Pfad-Setup für den Import der Module
@@ -168,6 +169,143 @@ def test_merkle_tree():
     assert root != altered_root
 
 
+def test_merkle_legacy_root_unchanged():
+    """Test, ob der Kompatibilitätsmodus die bisherigen Merkle Roots reproduziert"""
+    import hashlib
+    import json
+    transactions = [{"from": "A", "to": "B", "amount": i} for i in range(3)]
+    
+    leaves = [hashlib.sha256(json.dumps(tx, sort_keys=True).encode()).hexdigest() for tx in transactions]
+    left = hashlib.sha256((leaves[0] + leaves[1]).encode()).hexdigest()
+    right = hashlib.sha256((leaves[2] + leaves[2]).encode()).hexdigest()
+    expected = hashlib.sha256((left + right).encode()).hexdigest()
+    
+    assert MerkleTree.create_merkle_root(transactions) == expected
+    assert MerkleTree.create_merkle_root([]) == hashlib.sha256(b"").hexdigest()
+
+
+def test_merkle_binary_uses_transaction_ids(blockchain):
+    """Test, ob der binäre Merkle Tree die Transaktions-IDs als Blätter wiederverwendet"""
+    blockchain.add_transaction("sender1", "recipient1", 10)
+    blockchain.add_transaction("sender2", "recipient2", 20)
+    transactions = blockchain.pending_transactions
+    
+    trusted = MerkleTree.create_merkle_root(transactions, MerkleTree.BINARY, trust_ids=True)
+    recomputed = MerkleTree.create_merkle_root(transactions, MerkleTree.BINARY)
+    
+    assert trusted == recomputed
+    assert trusted != MerkleTree.create_merkle_root(transactions)
+    
+    block = blockchain.mine_pending_transactions("miner1")
+    assert block.merkle_version == MerkleTree.BINARY
+    assert blockchain.chain[0].merkle_version == MerkleTree.LEGACY
+    assert block.verify_merkle_root()
+    
+    # Eine manipulierte Transaktions-ID macht den Block ungültig
+    block.transactions[0]["id"] = "0" * 64
+    assert not block.verify_merkle_root()
+
+
+@pytest.mark.parametrize("version", [MerkleTree.LEGACY, MerkleTree.BINARY])
+@pytest.mark.parametrize("tx_count", [1, 2, 5, 8])
+def test_merkle_proofs(version, tx_count):
+    """Test, ob Merkle Proofs für jede Position erstellt und in O(log n) verifiziert werden"""
+    transactions = [{"from": "A", "to": "B", "amount": i} for i in range(tx_count)]
+    root = MerkleTree.create_merkle_root(transactions, version)
+    
+    for tx_index, tx in enumerate(transactions):
+        proof = MerkleTree.create_proof(transactions, tx_index, version)
+        assert len(proof) == (tx_count - 1).bit_length()
+        assert MerkleTree.verify_proof(tx, proof, root, version)
+        
+        # Eine veränderte Transaktion passt nicht mehr zum Proof
+        assert not MerkleTree.verify_proof(dict(tx, amount=999), proof, root, version)
+
+
+@pytest.mark.parametrize("version", [MerkleTree.LEGACY, MerkleTree.BINARY])
+def test_merkle_accumulator_matches_full_rebuild(version):
+    """Test, ob der inkrementelle Akkumulator nach jedem Append den vollen Root liefert"""
+    from blockchain import MerkleAccumulator
+    transactions = []
+    accumulator = MerkleAccumulator(version)
+    assert accumulator.root() == MerkleTree.create_merkle_root([], version)
+    
+    for i in range(33):
+        transactions.append({"from": "A", "to": "B", "amount": i})
+        accumulator.append(transactions[-1])
+        assert accumulator.root() == MerkleTree.create_merkle_root(transactions, version)
+        
+    # root_with verändert den Akkumulator nicht
+    extra = {"from": "network", "to": "miner", "amount": 100}
+    assert accumulator.root_with([extra]) == MerkleTree.create_merkle_root(transactions + [extra], version)
+    assert accumulator.size == 33
+    
+    # Entfernte Transaktionen erzwingen einen Neuaufbau
+    del transactions[3]
+    accumulator.sync(transactions)
+    assert accumulator.root() == MerkleTree.create_merkle_root(transactions, version)
+
+
+def test_pending_merkle_root_follows_mempool(blockchain):
+    """Test, ob der Merkle Root des Mempools nach Mining und neuen Transaktionen stimmt"""
+    blockchain.add_transaction("sender1", "recipient1", 10)
+    assert blockchain.pending_merkle_root() == MerkleTree.create_merkle_root(
+        blockchain.pending_transactions, blockchain.MERKLE_VERSION)
+    
+    block = blockchain.mine_pending_transactions("miner1")
+    assert block.verify_merkle_root()
+    
+    blockchain.add_transaction("sender2", "recipient2", 20)
+    assert blockchain.pending_merkle_root() == MerkleTree.create_merkle_root(
+        blockchain.pending_transactions, blockchain.MERKLE_VERSION)
+
+
+def test_header_mmr_follows_chain(blockchain):
+    """Test, ob die MMR beim Mining und beim Kettenwechsel mit der Kette übereinstimmt"""
+    from mmr import MerkleMountainRange
+    blockchain.mine_pending_transactions("miner1")
+    assert blockchain.header_mmr.root() == MerkleMountainRange.from_hashes(b.hash for b in blockchain.chain).root()
+    
+    proof = blockchain.get_block_proof(1)
+    assert MerkleMountainRange.verify(blockchain.chain[1].hash, proof, blockchain.header_mmr.root())
+    
+    # Kettenwechsel auf einen kürzeren Präfix
+    blockchain.replace_chain(blockchain.chain[:2])
+    assert blockchain.header_mmr.leaf_count == 2
+    assert blockchain.header_mmr.root() == MerkleMountainRange.from_hashes(b.hash for b in blockchain.chain).root()
+
+
+def test_compact_block_roundtrip():
+    """Test, ob der kompakte Block Header und Transaktionen verlustfrei speichert"""
+    import pickle
+    from blockchain import BlockHeader
+    transactions = [{"from": "A", "to": "B", "amount": 1.5, "id": "ab" * 32},
+                    {"from": "network", "to": "miner", "amount": 100, "type": "reward"}]
+    block = Block(3, 1000.0, [dict(tx) for tx in transactions], "cd" * 32, merkle_version=MerkleTree.BINARY)
+    block.difficulty = 2
+    
+    assert not hasattr(block, "__dict__")
+    assert isinstance(block.header, BlockHeader)
+    assert isinstance(block.header.previous_hash, bytes)
+    assert block.previous_hash == "cd" * 32
+    assert block.transactions == transactions
+    assert list(block.iter_transactions()) == transactions
+    assert block.hash == block.calculate_hash()
+    
+    restored = pickle.loads(pickle.dumps(block))
+    assert restored.to_dict() == block.to_dict()
+    
+    # Zustand eines Blocks aus einem älteren Checkpoint (Instanz-__dict__)
+    legacy = Block.__new__(Block)
+    legacy.__setstate__({"index": 0, "timestamp": 1000.0, "transactions": transactions, "previous_hash": "0",
+                         "nonce": 7, "merkle_root": "ef" * 32, "hash": "12" * 32, "difficulty": 4})
+    assert legacy.previous_hash == "0"
+    assert legacy.hash == "12" * 32
+    assert legacy.difficulty == 4
+    assert legacy.merkle_version == MerkleTree.LEGACY
+    assert legacy.transactions == transactions
+
+
 def test_continuous_mining(blockchain, monkeypatch):
     """Test des kontinuierlichen Mining-Prozesses"""
     # Mock time.sleep, um den Test zu beschleunigen
@@ -232,4 +370,309 @@ def test_difficulty_adjustment(blockchain, monkeypatch):
         blockchain.mine_pending_transactions("miner1")
     
     # Die Schwierigkeit sollte erhöht werden, da das Mining zu schnell ist
-    assert blockchain.difficulty > original_difficulty
\ No newline at end of file
+    assert blockchain.difficulty > original_difficulty
+
+def test_mining_aborts_when_tip_changes(blockchain):
+    """Test, ob ein laufender Mining-Versuch bei einem neuen Chain-Tip abgebrochen wird"""
+    import threading
+    blockchain.difficulty = 20  # Praktisch unlösbar im Testzeitraum
+    blockchain.add_transaction("sender1", "recipient1", 10)
+    chain_length = len(blockchain.chain)
+    pending_before = list(blockchain.pending_transactions)
+    
+    result = {}
+    miner = threading.Thread(target=lambda: result.update(block=blockchain.mine_pending_transactions("miner1")))
+    miner.start()
+    
+    # Warten, bis der Mining-Versuch registriert ist, dann neuen Tip signalisieren
+    while not blockchain._mining_cancel_events and miner.is_alive():
+        time.sleep(0.01)
+    blockchain.notify_tip_changed()
+    miner.join(timeout=5)
+    
+    assert not miner.is_alive()
+    assert result["block"] is None
+    assert len(blockchain.chain) == chain_length
+    assert blockchain.pending_transactions == pending_before
+
+def test_loading_checkpoint_cancels_mining(tmp_path):
+    """Test, ob das Laden eines Checkpoints laufende Mining-Versuche abbricht"""
+    import threading
+    data_dir = str(tmp_path / "chain_data")
+    bc = Blockchain(difficulty=1, data_dir=data_dir)
+    bc.mine_pending_transactions("miner1")
+    assert bc.create_checkpoint("test")
+    
+    # Stellvertretend für einen laufenden Mining-Versuch
+    cancel_event = threading.Event()
+    bc._mining_cancel_events.add(cancel_event)
+    success, _ = bc.load_checkpoint(validate=False)
+    assert success
+    assert cancel_event.is_set()
+
+
+def test_checkpoint_block_log(tmp_path):
+    """Test, ob Checkpoints nur neue Blöcke ins Block-Log schreiben und wieder geladen werden"""
+    data_dir = str(tmp_path / "chain_data")
+    bc = Blockchain(difficulty=1, data_dir=data_dir)
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    assert bc.create_checkpoint("test")
+    assert len(bc.block_store) == 2
+    
+    bc.mine_pending_transactions("miner1")
+    bc.add_transaction("genesis", "bob", 5)
+    assert bc.create_checkpoint("test")
+    with open(bc.checkpoint_metadata_file) as meta_file:
+        metadata = json.load(meta_file)
+    assert metadata["blocks_written"] == 1
+    assert metadata["state_deltas"] == 1
+    
+    # Kompaktierung fasst die Zustands-Deltas zu einer neuen Basis zusammen
+    assert bc.compact_checkpoint()
+    assert bc.block_store.state_journal.delta_count == 0
+    
+    restored = Blockchain(difficulty=1, data_dir=data_dir)
+    assert not any(b.is_body_loaded for b in restored.chain)
+    assert [b.to_dict() for b in restored.chain] == [b.to_dict() for b in bc.chain]
+    assert restored.pending_transactions == bc.pending_transactions
+    assert restored.header_mmr.root() == bc.header_mmr.root()
+    assert restored.get_balance("alice") == 50
+    assert restored.is_chain_valid()
+    
+    # Nach einem Kettenwechsel wird das Log ab der Abweichung neu geschrieben
+    bc.replace_chain(bc.chain[:2])
+    bc.mine_pending_transactions("miner2")
+    assert bc.create_checkpoint("reorg")
+    restored = Blockchain(difficulty=1, data_dir=data_dir)
+    assert [b.hash for b in restored.chain] == [b.hash for b in bc.chain]
+
+
+def test_checkpoint_restore_decodes_no_bodies(tmp_path, monkeypatch):
+    """Test, ob beim Laden aus dem mmap-Store keine Transaktionen dekodiert werden"""
+    from storage import MmapBlockStore
+    data_dir = str(tmp_path / "chain_data")
+    bc = Blockchain(difficulty=1, data_dir=data_dir, store_type="mmap")
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    bc.mine_pending_transactions("miner1")
+    assert bc.create_checkpoint("test")
+    
+    decoded = []
+    original = MmapBlockStore.read_records
+    def counting(store, height, block_hash):
+        decoded.append(height)
+        return original(store, height, block_hash)
+    monkeypatch.setattr(MmapBlockStore, "read_records", counting)
+    
+    restored = Blockchain(difficulty=1, data_dir=data_dir, store_type="mmap")
+    assert len(restored.chain) == 3
+    assert not any(b.is_body_loaded for b in restored.chain)
+    assert decoded == []
+    
+    # Die Indizes entstehen bei der ersten Abfrage
+    assert restored.get_balance("alice") == 50
+    assert sorted(set(decoded)) == [0, 1, 2]
+    assert not any(b.is_body_loaded for b in restored.chain)
+
+
+def test_legacy_checkpoint_restores_under_chain_lock(tmp_path):
+    """Test, ob ein Pickle-Checkpoint die Kette erst unter dem Chain-Lock austauscht"""
+    import pickle
+    import threading
+    source = Blockchain(difficulty=1, data_dir=str(tmp_path / "source"))
+    source.add_transaction("genesis", "alice", 50)
+    source.mine_pending_transactions("miner1")
+    
+    bc = Blockchain(difficulty=1, data_dir=str(tmp_path / "chain_data"))
+    bc.checkpoint_file = str(tmp_path / "legacy.pkl")
+    bc.legacy_checkpoint_metadata_file = str(tmp_path / "legacy_meta.json")
+    with open(bc.legacy_checkpoint_metadata_file, 'w') as meta_file:
+        json.dump({'timestamp': time.time()}, meta_file)
+    with open(bc.checkpoint_file, 'wb') as checkpoint_file:
+        pickle.dump({'chain': source.chain, 'pending_transactions': [], 'processed_tx_ids': set(),
+                     'difficulty': 1, 'mining_reward': 100, 'target_block_time': 60,
+                     'last_difficulty_adjustment_time': time.time()}, checkpoint_file)
+    
+    with bc._chain_lock:
+        loader = threading.Thread(target=bc._load_legacy_checkpoint)
+        loader.start()
+        loader.join(0.2)
+        assert loader.is_alive()
+        assert len(bc.chain) == 1
+    loader.join(5)
+    assert len(bc.chain) == 2
+    assert bc.get_balance("alice") == 50
+
+
+def test_checkpoint_sqlite_store(tmp_path):
+    """Test, ob Checkpoints über den SQLite-Store geschrieben und geladen werden"""
+    data_dir = str(tmp_path / "chain_data")
+    bc = Blockchain(difficulty=1, data_dir=data_dir, store_type="sqlite")
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    assert bc.create_checkpoint("test")
+
+    restored = Blockchain(difficulty=1, data_dir=data_dir, store_type="sqlite")
+    assert [b.to_dict() for b in restored.chain] == [b.to_dict() for b in bc.chain]
+    assert restored.header_mmr.root() == bc.header_mmr.root()
+    tx_id = bc.chain[1].transactions[0]["id"]
+    assert restored.block_store.transaction_location(tx_id) == (1, 0)
+    
+    # Vor dem Aufbau der Indizes beantwortet die Datenbank die Abfragen
+    assert not restored.location_index.is_current(restored.chain)
+    assert restored.get_transaction(tx_id) == bc.get_transaction(tx_id)
+    page, cursor = restored.get_transaction_history_page("miner1", limit=1, newest_first=True)
+    assert (page, cursor) == bc.get_transaction_history_page("miner1", limit=1, newest_first=True)
+    assert not restored.address_index.is_current(restored.chain)
+    
+    # Nach einem neuen Block ist die Datenbank nicht mehr aktuell, die Indizes übernehmen
+    restored.mine_pending_transactions("miner2")
+    assert restored.get_transaction(tx_id)["confirmations"] == 2
+    assert restored.location_index.is_current(restored.chain)
+
+
+def test_background_checkpoint_uses_snapshot(tmp_path):
+    """Test, ob ein Hintergrund-Checkpoint den Zustand zum Startzeitpunkt schreibt"""
+    data_dir = str(tmp_path / "chain_data")
+    bc = Blockchain(difficulty=1, data_dir=data_dir)
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    
+    # Schreiber blockieren, damit sich die Kette während des Checkpoints ändert
+    with bc._checkpoint_lock:
+        assert bc.create_checkpoint("background", background=True)
+        assert bc.checkpoint_status()["state"] == "running"
+        assert not bc.create_checkpoint("second", background=True)
+        bc.mine_pending_transactions("miner1")
+    
+    assert bc.wait_for_checkpoint(timeout=10)
+    status = bc.checkpoint_status()
+    assert status["state"] == "done"
+    assert status["chain_length"] == 2
+    assert status["blocks_written"] == 2
+    
+    restored = Blockchain(difficulty=1, data_dir=data_dir)
+    assert [b.hash for b in restored.chain] == [b.hash for b in bc.chain[:2]]
+
+
+def test_balance_index_follows_chain():
+    """Test, ob get_balance über den Index auch nach Kettenwechseln stimmt"""
+    bc = Blockchain(difficulty=1)
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    assert bc.balance_index.is_current(bc.chain)
+    
+    fork = list(bc.chain)
+    bc.add_transaction("alice", "bob", 20)
+    bc.mine_pending_transactions("miner1")
+    assert bc.get_balance("bob") == 20
+    assert bc.get_balance("alice") == 30
+    
+    bc.replace_chain(fork)
+    assert bc.balance_index.is_current(bc.chain)
+    assert bc.get_balance("bob") == 0
+    assert bc.get_balance("alice") == 50
+    
+    # An den Indizes vorbei veränderte Ketten werden beim nächsten Zugriff neu indiziert
+    bc.chain = bc.chain[:1]
+    assert bc.get_balance("alice") == 0
+
+
+def test_pending_spends_limit_admission():
+    """Test, ob ausstehende Ausgaben beim Prüfen neuer Transaktionen berücksichtigt werden"""
+    bc = Blockchain(difficulty=1)
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    
+    assert bc.add_transaction("alice", "bob", 30)
+    assert not bc.add_transaction("alice", "carol", 30)
+    assert bc.get_balance_details("alice") == {'confirmed': 50, 'pending_debit': 30,
+                                               'pending_credit': 0, 'spendable': 20}
+    assert bc.get_balance_details("bob")["pending_credit"] == 30
+    
+    bc.mine_pending_transactions("miner1")
+    assert bc.pending_ledger.count == 0
+    assert bc.get_spendable_balance("alice") == 20
+    assert bc.get_spendable_balance("bob") == 30
+
+
+def test_balance_at_height():
+    """Test, ob historische Kontostände über Snapshots und Postings stimmen"""
+    bc = Blockchain(difficulty=1, balance_snapshot_interval=2)
+    expected = [0]
+    for amount in (10, 0.1, 0.2, 5, 0.3):
+        bc.add_transaction("genesis", "alice", amount)
+        bc.mine_pending_transactions("miner1")
+        expected.append(bc.get_balance("alice"))
+    
+    assert set(bc.balance_index.snapshots) == {0, 2, 4, 6}
+    for height, balance in enumerate(expected):
+        assert bc.get_balance_at("alice", height) == balance
+    with pytest.raises(IndexError):
+        bc.get_balance_at("alice", len(bc.chain))
+    
+    # Nach einem Kettenwechsel verschwinden die Snapshots der entfernten Blöcke
+    bc.replace_chain(bc.chain[:3])
+    assert set(bc.balance_index.snapshots) == {0, 2}
+    assert bc.get_balance_at("alice", 2) == expected[2]
+
+
+def test_reorganize_only_touches_fork():
+    """Test, ob ein Kettenwechsel nur den abweichenden Teil verarbeitet"""
+    bc = Blockchain(difficulty=1)
+    bc.add_transaction("genesis", "alice", 50)
+    bc.mine_pending_transactions("miner1")
+    prefix = list(bc.chain)
+    
+    tx_id = bc.add_transaction("alice", "bob", 20)
+    bc.mine_pending_transactions("miner1")
+    
+    # Konkurrierender Block auf demselben Vorgänger ohne die Überweisung
+    competing = Block(2, time.time(), [{"from": "network", "to": "miner2", "amount": 100,
+                                        "type": "reward"}], prefix[-1].hash)
+    competing.mine_block(1)
+    assert bc.common_prefix_length([b.hash for b in prefix] + [competing.hash]) == 2
+    
+    from mmr import MerkleMountainRange
+    bc.replace_chain(prefix + [competing])
+    assert bc.chain[1] is prefix[1]
+    assert [b.hash for b in bc.chain] == [b.hash for b in prefix] + [competing.hash]
+    assert bc.header_mmr.root() == MerkleMountainRange.from_hashes(b.hash for b in bc.chain).root()
+    assert all(index.is_current(bc.chain) for index in bc._chain_indexes)
+    assert bc.get_balance("miner2") == 100
+    assert bc.get_balance("bob") == 0
+    
+    # Die verwaiste Überweisung kehrt in den Mempool zurück
+    assert [tx["id"] for tx in bc.pending_transactions] == [tx_id]
+    assert bc.get_spendable_balance("alice") == 30
+
+
+def test_comprehensive_validation_is_incremental(blockchain):
+    """Test, ob wiederholte Validierungen nur neue Blöcke prüfen"""
+    blockchain.add_transaction("genesis", "sender1", 100)
+    blockchain.mine_pending_transactions("miner1")
+    assert blockchain.comprehensive_validation() == (True, [])
+    assert blockchain.validator.validated_height == len(blockchain.chain)
+
+    blockchain.mine_pending_transactions("miner1")
+    assert blockchain.comprehensive_validation() == (True, [])
+    assert blockchain.validator.status()['last_checked'] == 1
+
+    assert blockchain.comprehensive_validation(full=True) == (True, [])
+    assert blockchain.validator.status()['last_checked'] == len(blockchain.chain)
+
+
+def test_balance_at_height_without_snapshots():
+    """Test, ob historische Kontostände auch ohne Snapshots stimmen"""
+    bc = Blockchain(difficulty=1, balance_snapshot_interval=0)
+    expected = [0]
+    for amount in (10, 0.1, 5):
+        bc.add_transaction("genesis", "alice", amount)
+        bc.mine_pending_transactions("miner1")
+        expected.append(bc.get_balance("alice"))
+    
+    assert set(bc.balance_index.snapshots) == {0}
+    assert [bc.get_balance_at("alice", height) for height in range(len(bc.chain))] == expected
+    with pytest.raises(ValueError):
+        Blockchain(difficulty=1, balance_snapshot_interval=-1)
@@ -0,0 +1,119 @@
+import sys
+import os
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain import Block
+from indexes import AddressIndex, BalanceIndex, LocationIndex, PendingLedger
+
+
+def make_chain(transfers):
+    """Kette mit einem Block pro Liste von (from, to, amount)"""
+    chain = [Block(0, 1000.0, [], "0")]
+    for i, txs in enumerate(transfers, 1):
+        transactions = [{"from": s, "to": r, "amount": a} for s, r, a in txs]
+        chain.append(Block(i, 1000.0 + i, transactions, chain[-1].hash))
+    return chain
+
+
+def scan_balance(chain, address):
+    balance = 0
+    for block in chain:
+        for tx in block.iter_transactions():
+            if tx["from"] == address:
+                balance -= tx["amount"]
+            if tx["to"] == address:
+                balance += tx["amount"]
+    return balance
+
+
+def test_balance_index_matches_scan():
+    """Test, ob der Index dieselben Stände wie ein Durchlauf der Kette liefert"""
+    chain = make_chain([[("network", "alice", 100.0)],
+                        [("alice", "bob", 0.1), ("alice", "alice", 5)],
+                        [("bob", "carol", 0.2)]])
+    index = BalanceIndex()
+    index.rebuild(chain)
+
+    assert index.is_current(chain)
+    for address in ("network", "alice", "bob", "carol", "dave"):
+        assert index.get(address) == scan_balance(chain, address)
+
+
+def test_balance_index_reverts_exactly():
+    """Test, ob ein Kettenwechsel die Stände exakt zurückrollt"""
+    chain = make_chain([[("network", "alice", 0.1)], [("alice", "bob", 0.3)]])
+    index = BalanceIndex()
+    index.rebuild(chain[:2])
+    before = dict(index.balances)
+
+    index.apply_block(chain[2])
+    fork = chain[:2] + [Block(2, 9000.0, [{"from": "alice", "to": "carol", "amount": 0.05}], chain[1].hash)]
+    index.revert_block()
+    assert index.balances == before
+    assert index.tip_hash == chain[1].hash
+
+    index.reorganize(2, fork[2:], fork)
+    assert index.is_current(fork)
+    assert index.get("bob") == 0
+    assert index.get("carol") == scan_balance(fork, "carol")
+
+    with pytest.raises(ValueError):
+        BalanceIndex().revert_block()
+
+
+def test_pending_ledger_tracks_mempool():
+    """Test, ob Belastungen und Gutschriften beim Entfernen vollständig verschwinden"""
+    ledger = PendingLedger()
+    first = {"from": "alice", "to": "bob", "amount": 0.1}
+    second = {"from": "alice", "to": "carol", "amount": 0.2}
+    ledger.add(first)
+    ledger.add(second)
+    assert ledger.debit("alice") == pytest.approx(0.3)
+    assert ledger.credit("bob") == 0.1
+
+    ledger.remove(first)
+    assert ledger.debit("alice") == pytest.approx(0.2)
+    ledger.remove(second)
+    assert ledger.debits == {} and ledger.credits == {}
+    assert ledger.count == 0
+
+
+def test_address_index_pages_and_reverts():
+    """Test, ob Postings seitenweise in beiden Richtungen gelesen und zurückgerollt werden"""
+    chain = make_chain([[("network", "alice", 10), ("alice", "alice", 1)],
+                        [("alice", "bob", 2)],
+                        [("bob", "alice", 1), ("carol", "dave", 1)]])
+    index = AddressIndex()
+    index.rebuild(chain)
+
+    assert index.page("alice") == [(1, 0), (1, 1), (2, 0), (3, 0)]
+    assert index.page("alice", limit=2, after=(1, 1)) == [(2, 0), (3, 0)]
+    assert index.page("alice", limit=2, newest_first=True) == [(3, 0), (2, 0)]
+    assert index.page("alice", limit=2, after=(2, 0), newest_first=True) == [(1, 1), (1, 0)]
+    assert index.page("nobody") == []
+
+    index.revert_block()
+    assert index.page("alice") == [(1, 0), (1, 1), (2, 0)]
+    assert "carol" not in index.postings
+    assert index.tip_hash == chain[2].hash
+
+
+def test_location_index_lookups():
+    """Test, ob Block-Hashes und Transaktions-IDs nachgeschlagen und zurückgerollt werden"""
+    chain = make_chain([[("network", "alice", 10)]])
+    chain.append(Block(2, 1002.0, [{"from": "alice", "to": "bob", "amount": 1, "id": "tx-a"},
+                                   {"from": "bob", "to": "carol", "amount": 1, "id": "tx-b"}], chain[-1].hash))
+    index = LocationIndex()
+    index.rebuild(chain)
+
+    assert index.height_of(chain[1].hash) == 1
+    assert index.locate("tx-b") == (2, 1)
+    assert index.height_of("unknown") is None
+
+    index.revert_block()
+    assert index.locate("tx-a") is None
+    assert index.height_of(chain[2].hash) is None
+    assert index.height_of(chain[1].hash) == 1
@@ -0,0 +1,145 @@
+import sys
+import os
+import time
+import threading
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain import Block
+from mining import MiningEngine, MiningTelemetry, HeaderTemplate
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Eine MiningEngine mit zwei Worker-Prozessen (wird für alle Tests geteilt)"""
+    engine = MiningEngine(workers=2, chunk_size=500)
+    yield engine
+    engine.shutdown()
+
+
+def test_engine_finds_valid_nonce(engine):
+    """Test, ob die parallele Suche einen gültigen und reproduzierbaren Hash liefert"""
+    block = Block(1, time.time(), [{"from": "A", "to": "B", "amount": 1}], "0" * 64)
+    block.mine_block(2, engine=engine)
+
+    assert block.hash.startswith("00")
+    assert block.hash == block.calculate_hash()
+    assert block.difficulty == 2
+
+
+def test_engine_respects_start_nonce(engine):
+    """Test, ob die Suche erst ab der angegebenen Start-Nonce beginnt"""
+    header = {"index": 1, "timestamp": 1000.0, "merkle_root": "ab" * 32, "previous_hash": "0" * 64}
+    nonce, block_hash = engine.search(header, 1, start_nonce=5000)
+
+    assert nonce >= 5000
+    assert block_hash.startswith("0")
+
+
+def test_header_template_matches_calculate_hash():
+    """Test, ob das Header-Template byte-identische Hashes zu calculate_hash liefert"""
+    block = Block(7, 1684792800.123, [{"from": "A", "to": "B", "amount": 2.5}], '"nonce": null')
+    template = HeaderTemplate.from_header(block.header_fields())
+
+    for nonce in [0, 1, 99999, 2 ** 70]:
+        block.nonce = nonce
+        assert template.hexdigest(nonce) == block.calculate_hash()
+
+
+def test_header_template_search_honours_difficulty():
+    """Test, ob die Template-Suche nur Hashes mit ausreichend führenden Nullen akzeptiert"""
+    template = HeaderTemplate(1, 1000.0, "ab" * 32, "0" * 64)
+
+    for difficulty in [1, 2, 3]:
+        nonce, block_hash, tried = template.search(difficulty, 0, 10 ** 6)
+        assert block_hash.startswith("0" * difficulty)
+        assert block_hash == template.hexdigest(nonce)
+        assert tried == nonce + 1
+
+
+def test_mine_block_aborts_on_cancel_event():
+    """Test, ob ein laufendes Mining über das Abbruch-Token innerhalb kurzer Zeit endet"""
+    block = Block(1, time.time(), [{"from": "A", "to": "B", "amount": 1}], "0" * 64)
+    cancel_event = threading.Event()
+    threading.Timer(0.05, cancel_event.set).start()
+
+    start = time.time()
+    mined = block.mine_block(20, cancel_event=cancel_event)
+
+    assert mined is False
+    assert time.time() - start < 2
+
+
+def test_engine_search_aborts_on_cancel_event(engine):
+    """Test, ob die parallele Suche beim Abbruch None liefert"""
+    header = {"index": 1, "timestamp": 1000.0, "merkle_root": "ab" * 32, "previous_hash": "0" * 64}
+    cancel_event = threading.Event()
+    threading.Timer(0.1, cancel_event.set).start()
+
+    start = time.time()
+    assert engine.search(header, 20, cancel_event=cancel_event) is None
+    assert time.time() - start < 2
+
+
+def test_telemetry_rolling_windows():
+    """Test der Hashrate-Berechnung über gleitende Fenster"""
+    telemetry = MiningTelemetry()
+    start = 10000.0
+
+    # 60 Sekunden lang je 1000 Hashes pro Sekunde
+    for offset in range(60):
+        telemetry.record_hashes(1000, now=start + offset)
+
+    now = start + 60
+    assert telemetry.hashrate(1, now=now) == 1000
+    assert telemetry.hashrate(60, now=now) == 1000
+    # Das 15m-Fenster mittelt nur über die beobachtete Laufzeit
+    assert telemetry.hashrate(900, now=now) == 1000
+    # Nach einer Pause fällt die kurzfristige Rate auf 0
+    assert telemetry.hashrate(1, now=now + 5) == 0
+
+
+def test_telemetry_attempt_outcomes():
+    """Test, ob Versuche als gemined, veraltet oder abgebrochen gezählt werden"""
+    telemetry = MiningTelemetry()
+
+    attempt = telemetry.begin_attempt()
+    attempt.record(500)
+    attempt.record(250)
+    telemetry.finish_attempt(attempt, "mined")
+    telemetry.finish_attempt(telemetry.begin_attempt(), "stale")
+    telemetry.finish_attempt(telemetry.begin_attempt(), "aborted")
+
+    stats = telemetry.snapshot()
+    assert stats["total_hashes"] == 750
+    assert stats["blocks_mined"] == 1
+    assert stats["last_block_nonces"] == 750
+    assert stats["stale_blocks"] == 1
+    assert stats["aborted_attempts"] == 1
+    assert set(stats["hashrate"]) == {"1s", "1m", "15m"}
+
+
+def test_engine_workers_bounded_by_cores():
+    """Test, ob die MiningEngine nie mehr Prozesse als Kerne startet"""
+    cores = os.cpu_count() or 1
+    assert MiningEngine(workers=10000).workers == cores
+    assert MiningEngine(workers=1).workers == 1
+
+
+def test_engine_search_counts_aborted_ranges():
+    """Test, ob beim Abbruch die Nonces noch laufender Bereiche mitgezählt werden"""
+    # Bereiche, die vor dem Abbruch nicht fertig werden
+    engine = MiningEngine(workers=2, chunk_size=10 ** 9)
+    header = {"index": 1, "timestamp": 1000.0, "merkle_root": "ab" * 32, "previous_hash": "0" * 64}
+    cancel_event = threading.Event()
+    counted = []
+    try:
+        # Erst abbrechen, wenn die Worker sicher rechnen (Start per spawn dauert)
+        engine.search(header, 1)
+        threading.Timer(0.3, cancel_event.set).start()
+        assert engine.search(header, 20, cancel_event=cancel_event, progress=counted.append) is None
+    finally:
+        engine.shutdown()
+    assert counted and sum(counted) > 0
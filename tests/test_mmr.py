@@ -0,0 +1,54 @@
+import sys
+import os
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mmr import MerkleMountainRange, mmr_size
+
+
+def block_hashes(count):
+    return [f"{i:064x}" for i in range(count)]
+
+
+def test_mmr_size_matches_node_count():
+    """Test, ob die Knotenanzahl der Post-Order-Darstellung entspricht"""
+    mmr = MerkleMountainRange()
+    for i, block_hash in enumerate(block_hashes(40)):
+        mmr.append(block_hash)
+        assert len(mmr.nodes) == mmr_size(i + 1)
+        assert len(mmr.peaks()) == bin(i + 1).count("1")
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7, 8, 13])
+def test_mmr_proofs_for_every_block(count):
+    """Test, ob jeder Block gegen den aktuellen Root bewiesen werden kann"""
+    hashes = block_hashes(count)
+    mmr = MerkleMountainRange.from_hashes(hashes)
+    root = mmr.root()
+
+    for index, block_hash in enumerate(hashes):
+        proof = mmr.prove(index)
+        assert MerkleMountainRange.verify(block_hash, proof, root)
+        assert not MerkleMountainRange.verify("f" * 64, proof, root)
+
+
+def test_mmr_historical_roots_and_truncate():
+    """Test, ob Roots früherer Längen und das Abschneiden konsistent sind"""
+    hashes = block_hashes(20)
+    mmr = MerkleMountainRange.from_hashes(hashes)
+
+    for size in range(21):
+        assert mmr.root(size) == MerkleMountainRange.from_hashes(hashes[:size]).root()
+
+    # Proof gegen eine frühere Länge
+    proof = mmr.prove(4, leaf_count=9)
+    assert MerkleMountainRange.verify(hashes[4], proof, mmr.root(9))
+
+    mmr.truncate(11)
+    assert mmr.leaf_count == 11
+    assert mmr.root() == MerkleMountainRange.from_hashes(hashes[:11]).root()
+
+    with pytest.raises(ValueError):
+        mmr.root(12)
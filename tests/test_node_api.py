@@ -2,6 +2,7 @@ import sys
 import os
 import pytest
 import json
+import requests
 from unittest.mock import patch, MagicMock
 
 # Pfad-Setup für den Import der Module
@@ -346,4 +347,296 @@ def get_value(context):
                          content_type='application/json')
     
     # Überprüfe Statuscode
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_mining_stats_telemetry(test_client):
+    """Test, ob /mining/stats Hashrate und Effizienzwerte liefert"""
+    client, _, blockchain = test_client
+    
+    blockchain.mine_pending_transactions("miner1")
+    
+    response = client.get('/mining/stats')
+    assert response.status_code == 200
+    
+    stats = json.loads(response.data)['stats']
+    assert set(stats['hashrate']) == {'1s', '1m', '15m'}
+    assert stats['blocks_mined'] == 1
+    assert stats['total_hashes'] == stats['last_block_nonces']
+    assert stats['stale_blocks'] == 0
+
+
+def test_transaction_proof(test_client):
+    """Test des Merkle-Proof-Endpunkts für eine Transaktion im Block"""
+    client, _, blockchain = test_client
+    from blockchain import MerkleTree
+    
+    tx_ids = [blockchain.add_transaction("genesis", f"recipient{i}", 10 + i) for i in range(5)]
+    block = blockchain.mine_pending_transactions("miner1")
+    
+    response = client.get(f'/block/{block.hash}/proof/{tx_ids[2]}')
+    assert response.status_code == 200
+    
+    data = json.loads(response.data)
+    assert data['tx_index'] == 2
+    assert data['merkle_root'] == block.merkle_root
+    assert MerkleTree.verify_proof(data['transaction'], data['proof'], block.merkle_root,
+                                   data['merkle_version'])
+    
+    assert client.get(f'/block/{block.hash}/proof/unknown').status_code == 404
+    assert client.get(f'/block/{"0" * 64}/proof/{tx_ids[0]}').status_code == 404
+
+
+def test_chain_mmr_proof(test_client):
+    """Test der MMR-Endpunkte für Block-Beweise"""
+    client, _, blockchain = test_client
+    from mmr import MerkleMountainRange
+    
+    for _ in range(3):
+        blockchain.mine_pending_transactions("miner1")
+        
+    data = json.loads(client.get('/chain/mmr').data)
+    assert data['size'] == len(blockchain.chain)
+    
+    proof = json.loads(client.get('/chain/mmr/proof/1').data)
+    assert proof['block_hash'] == blockchain.chain[1].hash
+    assert MerkleMountainRange.verify(proof['block_hash'], proof, data['root'])
+    
+    assert client.get('/chain/mmr/proof/99').status_code == 404
+    assert client.get('/chain/mmr?size=99').status_code == 400
+
+
+def test_compare_history_with_peer(test_client):
+    """Test, ob zwei Nodes ihre gemeinsame Historie über MMR-Roots vergleichen"""
+    _, node, blockchain = test_client
+    peer = Node(host='127.0.0.1', port=5001, blockchain=Blockchain(difficulty=1))
+    peer_client = peer.app.test_client()
+    
+    def fake_get(url, params=None, timeout=None):
+        response = MagicMock()
+        result = peer_client.get(url.replace('http://peer', ''), query_string=params)
+        response.status_code = result.status_code
+        response.json.return_value = json.loads(result.data)
+        return response
+    
+    peer.blockchain.mine_pending_transactions("peer_miner")
+    with patch('requests.get', side_effect=fake_get):
+        result = node.compare_history('http://peer')
+        assert result['common_size'] == 1
+        assert result['shared_history']
+        
+        # Ein eigener, abweichender Block trennt die Historien
+        blockchain.mine_pending_transactions("local_miner")
+        result = node.compare_history('http://peer')
+        assert result['common_size'] == 2
+        assert not result['shared_history']
+
+
+def test_compare_history_route(test_client):
+    """Test des Endpunkts für den MMR-Vergleich mit einem registrierten Peer"""
+    client, node, blockchain = test_client
+    peer = Node(host='127.0.0.1', port=5001, blockchain=Blockchain(difficulty=1))
+    peer_client = peer.app.test_client()
+    
+    def fake_get(url, params=None, timeout=None):
+        response = MagicMock()
+        result = peer_client.get(url.replace('http://peer:5001', ''), query_string=params)
+        response.status_code = result.status_code
+        response.json.return_value = json.loads(result.data)
+        return response
+    
+    assert client.get('/chain/mmr/compare').status_code == 400
+    assert client.get('/chain/mmr/compare?peer=http://peer:5001').status_code == 404
+    
+    node.register_node('http://peer:5001')
+    peer.blockchain.mine_pending_transactions("peer_miner")
+    with patch('requests.get', side_effect=fake_get):
+        response = client.get('/chain/mmr/compare?peer=http://peer:5001')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['shared_history']
+        assert data['common_size'] == 1
+        assert data['peer_length'] == 2
+    
+    with patch('requests.get', side_effect=requests.ConnectionError("offline")):
+        assert client.get('/chain/mmr/compare?peer=http://peer:5001').status_code == 502
+
+
+def test_resolve_conflicts_skips_shorter_peers(test_client):
+    """Test, ob der Konsens Ketten nur von Peers lädt, die laut MMR länger sind"""
+    client, node, blockchain = test_client
+    blockchain.mine_pending_transactions("miner")
+    node.register_node('http://peer:5001')
+    
+    response = MagicMock(status_code=200)
+    response.json.return_value = {'size': 2, 'root': blockchain.header_mmr.root(2), 'length': 2}
+    with patch('requests.get', return_value=response) as mock_get, \
+         patch.object(node, '_fetch_chain') as fetch_chain:
+        assert not node.resolve_conflicts()
+        fetch_chain.assert_not_called()
+        mock_get.assert_called_once_with('http://peer:5001/chain/mmr', timeout=5)
+
+
+def test_get_blockchain_binary(test_client):
+    """Test des binären Formats von /blockchain"""
+    import serialization
+    client, _, blockchain = test_client
+    blockchain.add_transaction("genesis", "recipient1", 10)
+    blockchain.mine_pending_transactions("miner1")
+    
+    response = client.get('/blockchain?format=binary')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'] == serialization.BINARY_MIME_TYPE
+    assert int(response.headers['X-Chain-Length']) == len(blockchain.chain)
+    
+    chain = serialization.decode_chain(response.data)
+    assert chain == json.loads(client.get('/blockchain').data)['chain']
+
+
+def test_background_checkpoint_status(tmp_path):
+    """Test, ob /blockchain/checkpoint im Hintergrund schreibt und den Status liefert"""
+    blockchain = Blockchain(difficulty=1, data_dir=str(tmp_path))
+    client = Node(host='127.0.0.1', port=5000, blockchain=blockchain).app.test_client()
+    
+    response = client.post('/blockchain/checkpoint', json={'reason': 'test'})
+    assert response.status_code == 202
+    assert json.loads(response.data)['status']['state'] in ('running', 'done')
+    
+    assert blockchain.wait_for_checkpoint(timeout=10)
+    status = json.loads(client.get('/blockchain/checkpoint/status').data)
+    assert status['state'] == 'done'
+    assert status['reason'] == 'test'
+    assert status['chain_length'] == 1
+
+
+def test_transaction_history_pagination(test_client):
+    """Test der Cursor-Paginierung von /transactions/history/<address>"""
+    client, _, blockchain = test_client
+    for amount in (1, 2, 3):
+        blockchain.add_transaction("genesis", "pager", amount)
+        blockchain.mine_pending_transactions("miner")
+    
+    data = json.loads(client.get('/transactions/history/pager?limit=2&order=newest').data)
+    assert [tx['amount'] for tx in data['transactions']] == [3, 2]
+    assert data['next_cursor']
+    
+    data = json.loads(client.get(f"/transactions/history/pager?limit=2&order=newest"
+                                 f"&cursor={data['next_cursor']}").data)
+    assert [tx['amount'] for tx in data['transactions']] == [1]
+    assert data['next_cursor'] is None
+    
+    data = json.loads(client.get('/transactions/history/pager').data)
+    assert [tx['amount'] for tx in data['transactions']] == [1, 2, 3]
+    assert client.get('/transactions/history/pager?cursor=bogus').status_code == 400
+
+
+def test_get_transaction_by_id(test_client):
+    """Test des Endpunkts /transaction/<tx_id> für ausstehende und bestätigte Transaktionen"""
+    client, _, blockchain = test_client
+    tx_id = blockchain.add_transaction("genesis", "lookup", 7)
+    
+    data = json.loads(client.get(f'/transaction/{tx_id}').data)
+    assert data['status'] == 'pending'
+    
+    block = blockchain.mine_pending_transactions("miner")
+    data = json.loads(client.get(f'/transaction/{tx_id}').data)
+    assert data['status'] == 'confirmed'
+    assert data['block_hash'] == block.hash
+    assert data['amount'] == 7
+    assert data['confirmations'] == 1
+    assert client.get('/transaction/unknown').status_code == 404
+    assert blockchain.get_block_by_hash(block.hash) is block
+
+
+def test_balance_at_height_endpoint(test_client):
+    """Test von /balance mit height-Parameter"""
+    client, _, blockchain = test_client
+    blockchain.add_transaction("genesis", "auditor", 4)
+    blockchain.mine_pending_transactions("miner")
+    height = len(blockchain.chain) - 1
+    
+    data = json.loads(client.get(f'/balance?address=auditor&height={height}').data)
+    assert data['balance'] == 4
+    data = json.loads(client.get(f'/balance?address=auditor&height={height - 1}').data)
+    assert data['balance'] == 0
+    assert client.get('/balance?address=auditor&height=999').status_code == 400
+
+
+def test_replace_chain_keeps_common_prefix(test_client):
+    """Test, ob beim Übernehmen einer Peer-Kette nur der abweichende Teil neu erzeugt wird"""
+    _, node, blockchain = test_client
+    blockchain.mine_pending_transactions("miner")
+    peer_chain = [block.to_dict() for block in blockchain.chain]
+    genesis = blockchain.chain[0]
+    
+    blockchain.mine_pending_transactions("miner")
+    assert node._replace_chain(peer_chain)
+    assert len(blockchain.chain) == 2
+    assert blockchain.chain[0] is genesis
+    assert blockchain.chain[1].hash == peer_chain[1]['hash']
+
+
+def test_is_chain_valid_checks_peer_suffix(test_client):
+    """Test, ob eine Peer-Kette ab dem gemeinsamen Präfix vollständig geprüft wird"""
+    _, node, blockchain = test_client
+    blockchain.mine_pending_transactions("miner")
+    blockchain.mine_pending_transactions("miner")
+    peer_chain = [block.to_dict() for block in blockchain.chain]
+    del blockchain.chain[2:]
+    assert node._is_chain_valid(peer_chain)
+    
+    # Manipulierte Transaktion: Hash und Proof of Work stimmen, der Merkle Root nicht
+    peer_chain[2]['transactions'][0]['amount'] += 1
+    assert not node._is_chain_valid(peer_chain)
+    assert not node._is_chain_valid(peer_chain[:2] + [{'index': 2}])
+
+
+def test_resolve_conflicts_ignores_malformed_peer(test_client):
+    """Test, ob eine fehlerhafte Peer-Antwort den Konsens nicht abbricht"""
+    import serialization
+    client, node, blockchain = test_client
+    blockchain.mine_pending_transactions("miner")
+    data = serialization.encode_chain(blockchain.chain)
+    node.register_node('http://badpeer:5000')
+    
+    cases = ((data.replace(b"network", b"netw\xffrk"), str(len(blockchain.chain) + 1), None),
+             (data, "not-a-number", len(blockchain.chain)),
+             (b"\x00\x01garbage", "5", None))
+    for content, header_length, expected_length in cases:
+        response = MagicMock(status_code=200, content=content,
+                             headers={'Content-Type': serialization.BINARY_MIME_TYPE,
+                                      'X-Chain-Length': header_length})
+        with patch('requests.get', return_value=response):
+            assert client.get('/nodes/resolve').status_code == 200
+            fetched = node._fetch_chain('http://badpeer:5000')
+            # Die Länge stammt aus der Kette selbst, nicht aus dem Header
+            assert (fetched[0] if fetched else None) == expected_length
+
+
+def test_validate_uses_node_verifier(test_client):
+    """Test, ob /blockchain/validate den Verifier des Nodes nutzt statt Worker pro Anfrage"""
+    client, node, blockchain = test_client
+    blockchain.mine_pending_transactions("miner")
+    
+    data = json.loads(client.get('/blockchain/validate?full=true&workers=5000').data)
+    assert data['valid']
+    assert data['validation']['validated_height'] == len(blockchain.chain)
+    # Kurze Ketten starten keinen Pool, die Worker-Zahl ist auf die Kerne begrenzt
+    assert node.verifier._executor is None
+    assert node.verifier.workers <= (os.cpu_count() or 1)
+    assert Node(blockchain=blockchain, validation_workers=5000).verifier.workers == (os.cpu_count() or 1)
+
+
+def test_start_mining_validates_workers(test_client):
+    """Test, ob /mining/start ungültige Worker-Zahlen ablehnt und auf die Kerne begrenzt"""
+    client, node, blockchain = test_client
+    for workers in ("many", 0, -3, 2.5, [2], True):
+        response = client.post('/mining/start', json={'address': 'miner', 'workers': workers})
+        assert response.status_code == 400
+    assert not blockchain.get_mining_stats()['mining_active']
+    
+    try:
+        response = client.post('/mining/start', json={'address': 'miner', 'workers': 10000})
+        assert response.status_code == 200
+        assert json.loads(response.data)['workers'] <= (os.cpu_count() or 1)
+    finally:
+        client.post('/mining/stop')
@@ -0,0 +1,87 @@
+import sys
+import os
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import serialization
+from blockchain import Block, MerkleTree
+
+
+@pytest.fixture
+def block():
+    """Ein Block mit gemischten Transaktionsformen"""
+    transactions = [
+        {"from": "A", "to": "B", "amount": 1.5, "timestamp": 1000.25, "id": "ab" * 32},
+        {"from": "C", "to": "D", "amount": 7, "timestamp": 1001.0, "id": "cd" * 32, "signature": "sig"},
+        {"from": "contract", "to": "E", "amount": -3, "data": {"args": [1, None, True], "code": "x = 1"},
+         "memo": "Grüße"},
+        {"from": "network", "to": "miner", "amount": 100, "timestamp": 1002.5, "type": "reward"}
+    ]
+    block = Block(5, 1684792800.5, transactions, "0", nonce=2 ** 70, merkle_version=MerkleTree.BINARY)
+    block.difficulty = 3
+    return block
+
+
+def test_block_roundtrip(block):
+    """Test, ob ein Block exakt in die Form von Block.to_dict() zurückkehrt"""
+    data = serialization.encode_block(block)
+    decoded = serialization.decode_block(data)
+
+    assert decoded == block.to_dict()
+    assert list(decoded) == list(block.to_dict())
+    assert Block.from_dict(decoded).to_dict() == block.to_dict()
+
+
+def test_block_records_roundtrip(block):
+    """Test, ob die Dekodierung in kompakte Datensätze denselben Block ergibt"""
+    fields, records = serialization.decode_block_records(serialization.encode_block(block))
+    restored = Block.from_records(fields, records)
+
+    assert restored.to_dict() == block.to_dict()
+    assert restored.calculate_hash() == block.calculate_hash()
+
+
+def test_chain_and_transaction_roundtrip(block):
+    """Test der Ketten- und Transaktionskodierung"""
+    chain = serialization.decode_chain(serialization.encode_chain([block, block]))
+    assert chain == [block.to_dict(), block.to_dict()]
+
+    tx = block.transactions[2]
+    assert serialization.decode_transaction(serialization.encode_transaction(tx)) == tx
+
+
+def test_canonical_bytes_ignore_key_order():
+    """Test, ob gleiche Inhalte unabhängig von der Schlüsselreihenfolge dieselben Bytes ergeben"""
+    first = {"b": 1, "a": [1.5, "x"], "c": {"y": None, "x": False}, "d": b"\x00\x01"}
+    second = {"d": b"\x00\x01", "c": {"x": False, "y": None}, "a": [1.5, "x"], "b": 1}
+
+    assert serialization.canonical_bytes(first) == serialization.canonical_bytes(second)
+    assert serialization.decode_value(serialization.canonical_bytes(first)) == first
+
+
+def test_invalid_data_raises_codec_error(block):
+    """Test, ob abgeschnittene oder fremde Daten als CodecError gemeldet werden"""
+    data = serialization.encode_block(block)
+
+    with pytest.raises(serialization.CodecError):
+        serialization.decode_block(data[:-5])
+    with pytest.raises(serialization.CodecError):
+        serialization.decode_block(b"{}" + data[2:])
+    with pytest.raises(serialization.CodecError):
+        serialization.decode_transaction(data)
+
+
+def test_invalid_utf8_raises_codec_error(block):
+    """Test, ob ungültiges UTF-8 in Schlüsseln und Werten als CodecError gemeldet wird"""
+    data = serialization.encode_block(block)
+
+    # Wert über den schnellen Pfad für kurze Strings
+    assert b"Gr\xc3\xbc" in data
+    with pytest.raises(serialization.CodecError):
+        serialization.decode_block(data.replace(b"Gr\xc3\xbc", b"Gr\xff\xbc"))
+    # Schlüssel einer Transaktionsform über _read_str
+    assert b"memo" in data
+    with pytest.raises(serialization.CodecError):
+        serialization.decode_block(data.replace(b"memo", b"m\xffmo"))
@@ -0,0 +1,167 @@
+import sys
+import os
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain import Block
+from storage import (BlockLogStore, MmapBlockStore, SqliteBlockStore, StateJournal, StorageError,
+                     open_block_store, DELTA_FILE, INDEX_FILE, SEGMENT_PATTERN)
+
+
+def make_chain(count):
+    chain = []
+    previous_hash = "0"
+    for i in range(count):
+        block = Block(i, 1000.0 + i, [{"from": "A", "to": "B", "amount": i}], previous_hash)
+        chain.append(block)
+        previous_hash = block.hash
+    return chain
+
+
+def test_append_and_read(tmp_path):
+    """Test, ob Blöcke segmentübergreifend geschrieben und gelesen werden"""
+    store = BlockLogStore(str(tmp_path), segment_size=600)
+    chain = make_chain(10)
+    for block in chain:
+        store.append(block)
+
+    assert len(store) == 10
+    assert os.path.exists(tmp_path / SEGMENT_PATTERN.format(1))
+    for height, block in enumerate(chain):
+        assert Block.from_records(*store.read_block(height)).to_dict() == block.to_dict()
+        assert store.height_of(block.hash) == height
+    assert [fields['hash'] for fields, _ in store.iter_blocks()] == [b.hash for b in chain]
+
+    store.close()
+    reopened = BlockLogStore(str(tmp_path), segment_size=600)
+    assert len(reopened) == 10
+    assert reopened.verify() == []
+
+
+def test_sync_chain_truncates_on_divergence(tmp_path):
+    """Test, ob nur neue Blöcke angehängt und abweichende Blöcke ersetzt werden"""
+    store = BlockLogStore(str(tmp_path), segment_size=600)
+    chain = make_chain(6)
+    assert store.sync_chain(chain[:4]) == 4
+    assert store.sync_chain(chain) == 2
+
+    fork = chain[:3] + [Block(3, 5000.0, [], chain[2].hash)]
+    assert store.sync_chain(fork) == 1
+    assert len(store) == 4
+    assert store.height_of(chain[4].hash) is None
+    assert store.height_of(fork[3].hash) == 3
+
+
+def test_recovers_from_torn_write(tmp_path):
+    """Test, ob ein unvollständig geschriebener letzter Datensatz beim Öffnen verworfen wird"""
+    store = BlockLogStore(str(tmp_path))
+    for block in make_chain(3):
+        store.append(block)
+    store.close()
+
+    # Letzten Datensatz beschädigen und halben Indexeintrag anhängen
+    segment_path = tmp_path / SEGMENT_PATTERN.format(0)
+    with open(segment_path, 'r+b') as segment_file:
+        segment_file.truncate(os.path.getsize(segment_path) - 3)
+    with open(tmp_path / INDEX_FILE, 'ab') as index_file:
+        index_file.write(b"\x00" * 7)
+
+    reopened = BlockLogStore(str(tmp_path))
+    assert len(reopened) == 2
+    assert reopened.verify() == []
+    reopened.append(make_chain(3)[2])
+    assert len(BlockLogStore(str(tmp_path))) == 3
+
+
+def test_mmap_store_loads_bodies_lazily(tmp_path):
+    """Test, ob der MmapBlockStore nur Header liefert und Transaktionen bei Bedarf liest"""
+    chain = make_chain(8)
+    BlockLogStore(str(tmp_path), segment_size=600).sync_chain(chain)
+
+    store = open_block_store(str(tmp_path), "mmap")
+    assert isinstance(store, MmapBlockStore)
+    headers = list(store.iter_headers())
+    assert [fields['hash'] for fields in headers] == [b.hash for b in chain]
+
+    lazy = Block.lazy(headers[5], lambda: store.read_records(5, headers[5]['hash']))
+    assert not lazy.is_body_loaded
+    assert lazy.hash == chain[5].hash
+    assert lazy.to_dict() == chain[5].to_dict()
+    assert lazy.verify_merkle_root()
+
+    # Neue Blöcke werden auch nach dem Mappen eines Segments gefunden
+    extra = Block(8, 2000.0, [{"from": "A", "to": "C", "amount": 1}], chain[-1].hash)
+    store.append(extra)
+    assert Block.from_records(headers[0], store.read_records(8, extra.hash)).transactions == extra.transactions
+
+
+def test_mmap_store_rejects_replaced_block(tmp_path):
+    """Test, ob ein lazy geladener Block nach einem Kettenwechsel nicht den neuen Block liest"""
+    chain = make_chain(5)
+    store = MmapBlockStore(str(tmp_path))
+    store.sync_chain(chain)
+    headers = list(store.iter_headers())
+
+    fork = chain[:3] + [Block(3, 5000.0, [], chain[2].hash)]
+    store.sync_chain(fork)
+    with pytest.raises(StorageError):
+        store.read_records(3, headers[3]['hash'])
+    with pytest.raises(StorageError):
+        store.read_records(4, headers[4]['hash'])
+    assert store.read_records(3, fork[3].hash) == []
+
+
+def test_sqlite_store_indexes_blocks(tmp_path):
+    """Test, ob der SqliteBlockStore Blöcke speichert und Transaktionen sowie Adressen indiziert"""
+    store = SqliteBlockStore(str(tmp_path))
+    chain = make_chain(4)
+    chain[3] = Block(3, 1003.0, [{"from": "B", "to": "C", "amount": 2, "id": "tx-3"}], chain[2].hash)
+    assert store.sync_chain(chain) == 4
+    assert store.sync_chain(chain) == 0
+
+    assert Block.from_records(*store.read_block(3)).to_dict() == chain[3].to_dict()
+    assert store.height_of(chain[2].hash) == 2
+    assert store.transaction_location("tx-3") == (3, 0)
+    assert store.in_sync_with(chain)
+    assert not store.in_sync_with(chain[:3])
+    assert store.address_postings("B") == [(0, 0), (1, 0), (2, 0), (3, 0)]
+    assert store.address_postings("B", limit=2, after=(0, 0)) == [(1, 0), (2, 0)]
+    assert store.address_postings("B", limit=2, after=(3, 0), newest_first=True) == [(2, 0), (1, 0)]
+
+    # Kettenwechsel entfernt Blöcke, Transaktionen und Buchungen ab der Abweichung
+    fork = chain[:2] + [Block(2, 5000.0, [], chain[1].hash)]
+    assert store.sync_chain(fork) == 1
+    assert store.transaction_location("tx-3") is None
+    assert store.address_postings("C") == []
+
+    store.save_state({"difficulty": 3})
+    store.close()
+    reopened = open_block_store(str(tmp_path), "sqlite")
+    assert len(reopened) == 3
+    assert reopened.load_state() == {"difficulty": 3}
+    assert reopened.verify() == []
+
+
+def test_state_journal_deltas_and_compaction(tmp_path):
+    """Test, ob der Zustand als Basis plus Deltas gespeichert und kompaktiert wird"""
+    journal = StateJournal(str(tmp_path))
+    assert journal.record({"difficulty": 2, "processed_tx_ids": ["a"]}) == 0
+    assert journal.record({"difficulty": 2, "processed_tx_ids": ["a", "b"]}) == 1
+    assert journal.record({"difficulty": 3, "processed_tx_ids": ["b", "c"]}) == 2
+
+    expected = {"difficulty": 3, "processed_tx_ids": ["b", "c"]}
+    reopened = StateJournal(str(tmp_path))
+    assert reopened.load() == expected
+    assert reopened.delta_count == 2
+
+    # Ein unvollständiges Delta am Ende wird verworfen
+    with open(tmp_path / DELTA_FILE, 'ab') as delta_file:
+        delta_file.write(b"CDLT\x00\x00")
+    assert StateJournal(str(tmp_path)).load() == expected
+
+    reopened.compact()
+    assert os.path.getsize(tmp_path / DELTA_FILE) == 0
+    assert StateJournal(str(tmp_path)).load() == expected
+    assert StateJournal(str(tmp_path)).sequence == 3
@@ -0,0 +1,178 @@
+import sys
+import os
+import pytest
+
+# Pfad-Setup für den Import der Module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from blockchain import Block
+from validation import ChainValidator, ParallelVerifier, verify_blocks
+
+
+def make_chain(transfers):
+    """Kette mit einem Block pro Liste von (from, to, amount)"""
+    chain = [Block(0, 1000.0, [], "0")]
+    for txs in transfers:
+        append_block(chain, txs)
+    return chain
+
+
+def append_block(chain, txs):
+    transactions = [{"from": s, "to": r, "amount": a} for s, r, a in txs]
+    index = len(chain)
+    chain.append(Block(index, 1000.0 + index, transactions, chain[-1].hash))
+
+
+def count_hashes(monkeypatch):
+    """Zählt die Aufrufe von Block.calculate_hash"""
+    calls = []
+    original = Block.calculate_hash
+
+    def counting(block):
+        calls.append(block.index)
+        return original(block)
+
+    monkeypatch.setattr(Block, "calculate_hash", counting)
+    return calls
+
+
+def test_single_pass_hashes_each_block_once(monkeypatch):
+    """Test, ob jeder Block pro Validierung genau einmal gehasht wird"""
+    chain = make_chain([[("network", "alice", 100)], [("alice", "bob", 40)]])
+    calls = count_hashes(monkeypatch)
+
+    valid, issues = ChainValidator().validate(chain)
+
+    assert valid and issues == []
+    assert sorted(calls) == [0, 1, 2]
+
+
+def test_incremental_validation_checks_only_suffix(monkeypatch):
+    """Test, ob spätere Aufrufe nur die neu angehängten Blöcke prüfen"""
+    chain = make_chain([[("network", "alice", 100)]])
+    validator = ChainValidator()
+    assert validator.validate(chain)[0]
+    assert validator.validated_height == 2
+    assert validator.tip_hash == chain[-1].hash
+
+    append_block(chain, [("alice", "bob", 60)])
+    append_block(chain, [("bob", "carol", 10)])
+    calls = count_hashes(monkeypatch)
+
+    assert validator.validate(chain) == (True, [])
+    assert sorted(calls) == [2, 3]
+    assert validator.status()['last_checked'] == 2
+    assert validator.validated_height == 4
+
+    # Die fortgeschriebenen Kontostände erkennen eine Überziehung im nächsten Block
+    append_block(chain, [("alice", "dave", 50)])
+    valid, issues = validator.validate(chain)
+    assert not valid
+    assert issues == ["Negativer Kontostand für alice nach Transaktion in Block 4"]
+    # Der fehlerhafte Block gehört nicht zum validierten Präfix
+    assert validator.validated_height == 4
+    assert not validator.validate(chain)[0]
+
+
+def test_full_validation_detects_tampering():
+    """Test, ob full=True Änderungen an bereits geprüften Blöcken erkennt"""
+    chain = make_chain([[("network", "alice", 100)], [("alice", "bob", 40)]])
+    validator = ChainValidator()
+    assert validator.validate(chain)[0]
+
+    chain[1].transactions[0]["amount"] = 200
+
+    # Das gemerkte Präfix wird nicht erneut geprüft
+    assert validator.validate(chain)[0]
+    valid, issues = validator.validate(chain, full=True)
+    assert not valid
+    assert issues == ["Block 1 hat inkonsistenten Merkle-Root"]
+    assert validator.validated_height == 1
+
+
+def test_replaced_tip_triggers_full_validation():
+    """Test, ob ein Kettenwechsel unterhalb des validierten Tips vollständig neu prüft"""
+    chain = make_chain([[("network", "alice", 100)], [("alice", "bob", 40)]])
+    validator = ChainValidator()
+    assert validator.validate(chain)[0]
+
+    del chain[2:]
+    append_block(chain, [("alice", "carol", 70)])
+    assert validator.validate(chain) == (True, [])
+    assert validator.status()['last_full']
+    assert validator.tip_hash == chain[-1].hash
+
+
+def test_integrity_error_stops_pass():
+    """Test, ob nach einem Verkettungsfehler keine weiteren Blöcke geprüft werden"""
+    chain = make_chain([[("network", "alice", 100)], [("alice", "bob", 40)], [("bob", "carol", 1)]])
+    chain[2].previous_hash = "f" * 64
+    chain[2].hash = chain[2].calculate_hash()
+
+    valid, issues = ChainValidator().validate(chain)
+    assert not valid
+    assert issues == ["Block 2 verweist auf falschen Vorgänger"]
+
+
+@pytest.fixture(scope="module")
+def verifier():
+    """Ein ParallelVerifier mit kleinen Stapeln, damit mehrere Worker beteiligt sind"""
+    verifier = ParallelVerifier(workers=2, chunk_size=3)
+    verifier.MIN_PARALLEL_BLOCKS = 1
+    yield verifier
+    verifier.shutdown()
+
+
+def tamper(block):
+    """Ändert eine Transaktion, ohne Merkle Root und Hash anzupassen"""
+    block.transactions[0]["amount"] += 1
+    block.compact()
+
+
+def test_parallel_verifier_reports_lowest_invalid_block(verifier):
+    """Test, ob unabhängig von der Reihenfolge der Worker der erste Fehler gemeldet wird"""
+    chain = make_chain([[("network", f"miner{i}", 10)] for i in range(20)])
+    assert verifier.first_invalid(chain) is None
+
+    tamper(chain[16])
+    tamper(chain[5])
+    assert verifier.first_invalid(chain) == 5
+    assert verifier.first_invalid(chain[6:], 6) == 16
+
+
+def test_parallel_validation_matches_sequential(verifier):
+    """Test, ob die parallele Validierung dieselben Ergebnisse wie die sequentielle liefert"""
+    chain = make_chain([[("network", "alice", 100)]] + [[("alice", "bob", 1)] for _ in range(12)])
+    assert ChainValidator().validate(chain, verifier=verifier) == (True, [])
+
+    tamper(chain[9])
+    chain[4].previous_hash = "f" * 64
+    chain[4].hash = chain[4].calculate_hash()
+    expected = ChainValidator().validate(chain)
+    assert expected == (False, ["Block 4 verweist auf falschen Vorgänger"])
+    assert ChainValidator().validate(chain, verifier=verifier) == expected
+
+    chain = make_chain([[("network", "alice", 100)]] + [[("alice", "bob", 1)] for _ in range(12)])
+    tamper(chain[9])
+    validator = ChainValidator()
+    assert validator.validate(chain, verifier=verifier) == (False, ["Block 9 hat inkonsistenten Merkle-Root"])
+    assert validator.validated_height == 9
+
+
+def test_verify_blocks_suffix(verifier):
+    """Test der Prüfung einer Blockfolge ab einem bekannten Vorgänger"""
+    chain = make_chain([[("network", f"miner{i}", 10)] for i in range(8)])
+    assert verify_blocks(chain) is None
+    assert verify_blocks(chain[4:], 4, chain[3], verifier) is None
+    assert verify_blocks(chain[4:], 3, chain[2]) == "Block 3 hat falschen Index: 4"
+
+    tamper(chain[6])
+    assert verify_blocks(chain[4:], 4, chain[3], verifier) == "Block 6 hat inkonsistenten Merkle-Root"
+
+
+def test_parallel_verifier_workers_bounded_by_cores():
+    """Test, ob ein ParallelVerifier nie mehr Worker als Kerne startet"""
+    cores = os.cpu_count() or 1
+    assert ParallelVerifier(5000).workers == cores
+    assert ParallelVerifier().workers == cores
+    assert ParallelVerifier(1).workers == 1
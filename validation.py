@@ -0,0 +1,314 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger('blockchain.validation')
+
+# Validierung der Kette in einem einzigen Durchlauf
+#
+# Pro Block werden Hash und Merkle Root genau einmal berechnet und Verkettung,
+# Proof of Work, Index, Zeitstempel und Kontostände im selben Schritt geprüft.
+# Der Validator merkt sich Höhe und Tip-Hash des zuletzt fehlerfrei geprüften
+# Präfixes samt der Kontostände danach; spätere Aufrufe prüfen nur die neu
+# angehängten Blöcke. Passt der gemerkte Tip nicht mehr zur Kette (Kettenwechsel,
+# neu geladener Checkpoint), wird vollständig neu validiert.
+#
+# Hash, Merkle Root und Proof of Work hängen nur vom Block selbst ab. Mit einem
+# ParallelVerifier werden sie stapelweise auf Worker-Prozesse verteilt, während
+# Verkettung, Index, Zeitstempel und Kontostände der Reihe nach im aufrufenden
+# Prozess geprüft werden.
+
+# Absender, deren Kontostand negativ werden darf
+SYSTEM_SENDERS = ("network", "genesis")
+
+
+def check_block_integrity(block: Any, previous: Optional[Any], position: int) -> Optional[str]:
+    """
+    Prüft Hash, Verkettung, Merkle Root und Proof of Work eines Blocks
+
+    Hash und Merkle Root werden dabei je einmal berechnet. Beim Genesis-Block
+    (previous None) entfallen Verkettung und Proof of Work.
+
+    Returns:
+        Beschreibung des ersten Fehlers oder None
+    """
+    if block.hash != block.calculate_hash():
+        return f"Block {position} hat inkonsistenten Hash"
+    if previous is not None and block.previous_hash != previous.hash:
+        return f"Block {position} verweist auf falschen Vorgänger"
+    return _check_block_content(block, position, hash_checked=True)
+
+
+def check_block_linkage(block: Any, previous: Optional[Any], position: int) -> Optional[str]:
+    """Prüft nur die Verkettung, für Blöcke, deren Inhalt schon geprüft wurde"""
+    if previous is not None and block.previous_hash != previous.hash:
+        return f"Block {position} verweist auf falschen Vorgänger"
+    return None
+
+
+def _check_block_content(block: Any, position: int, hash_checked: bool = False) -> Optional[str]:
+    """Prüfungen, die nur vom Block selbst abhängen (Hash, Merkle Root, Proof of Work)"""
+    if not hash_checked and block.hash != block.calculate_hash():
+        return f"Block {position} hat inkonsistenten Hash"
+    if not block.verify_merkle_root():
+        return f"Block {position} hat inkonsistenten Merkle-Root"
+    if position > 0 and block.hash[:block.difficulty] != '0' * block.difficulty:
+        return f"Block {position} erfüllt den Proof of Work nicht"
+    return None
+
+
+def _verify_chunk(start: int, blocks: List[Any]) -> Optional[int]:
+    """
+    Prüft Hash, Merkle Root und Proof of Work eines Stapels im Worker-Prozess
+
+    Returns:
+        Kettenposition des ersten fehlerhaften Blocks oder None
+    """
+    for offset, block in enumerate(blocks):
+        if _check_block_content(block, start + offset) is not None:
+            return start + offset
+    return None
+
+
+class ParallelVerifier:
+    """
+    Verteilt die blockinternen Prüfungen auf einen Pool von Worker-Prozessen
+
+    Die Blöcke werden in Stapel der Größe chunk_size aufgeteilt; es sind
+    höchstens zwei Stapel pro Worker gleichzeitig unterwegs, damit bei lazy
+    geladenen Blöcken nicht die ganze Kette auf einmal dekodiert wird.
+    Unabhängig von der Reihenfolge, in der die Worker fertig werden, wird immer
+    die niedrigste fehlerhafte Position gemeldet. Der Pool wird beim ersten
+    Gebrauch gestartet und bleibt bis shutdown() bestehen; mehr Worker als Kerne
+    werden nicht gestartet.
+    """
+    DEFAULT_CHUNK_SIZE = 256
+
+    # Darunter lohnt sich der Start der Worker-Prozesse nicht
+    MIN_PARALLEL_BLOCKS = 512
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        cpu_count = os.cpu_count() or 1
+        self.workers = max(1, min(workers or cpu_count, cpu_count))
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        """Startet den Prozess-Pool beim ersten Gebrauch"""
+        if self._executor is None:
+            # spawn statt fork: der Node läuft mit mehreren Threads (Flask, Discovery, Mining)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            logger.info(f"Validierungs-Pool mit {self.workers} Worker-Prozessen gestartet")
+        return self._executor
+
+    def first_invalid(self, blocks: Sequence[Any], start: int = 0) -> Optional[int]:
+        """
+        Sucht parallel den ersten Block, dessen Hash, Merkle Root oder Proof of Work nicht stimmt
+
+        Args:
+            blocks: Zu prüfende Blöcke
+            start: Kettenposition von blocks[0]
+
+        Returns:
+            Niedrigste fehlerhafte Kettenposition oder None
+        """
+        with self._lock:
+            executor = self._ensure_pool()
+            end = start + len(blocks)
+            next_start = start
+            pending = set()
+            failed: Optional[int] = None
+
+            def submit() -> None:
+                nonlocal next_start
+                chunk_end = min(next_start + self.chunk_size, end)
+                pending.add(executor.submit(_verify_chunk, next_start,
+                                            list(blocks[next_start - start:chunk_end - start])))
+                next_start = chunk_end
+
+            try:
+                while next_start < end and len(pending) < self.workers * 2:
+                    submit()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        position = future.result()
+                        if position is not None and (failed is None or position < failed):
+                            failed = position
+                    # Stapel hinter einem bekannten Fehler werden nicht mehr gebraucht
+                    if next_start < end and (failed is None or next_start < failed):
+                        while next_start < end and len(pending) < self.workers * 2:
+                            submit()
+                return failed
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def shutdown(self) -> None:
+        """Beendet den Prozess-Pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                logger.info("Validierungs-Pool beendet")
+
+
+def verify_blocks(blocks: Sequence[Any], start: int = 0, previous: Optional[Any] = None,
+                  verifier: Optional[ParallelVerifier] = None) -> Optional[str]:
+    """
+    Prüft Index, Verkettung und Inhalt einer Blockfolge ohne Kontostände
+
+    Für Ketten von Peers, bevor sie übernommen werden.
+
+    Args:
+        blocks: Zu prüfende Blöcke
+        start: Kettenposition von blocks[0]
+        previous: Block vor blocks[0], None wenn blocks mit dem Genesis-Block beginnt
+        verifier: Optionaler ParallelVerifier für Hash, Merkle Root und Proof of Work
+
+    Returns:
+        Beschreibung des ersten Fehlers oder None
+    """
+    verified_until = start
+    if verifier is not None and len(blocks) >= verifier.MIN_PARALLEL_BLOCKS:
+        failed = verifier.first_invalid(blocks, start)
+        verified_until = start + len(blocks) if failed is None else failed
+
+    for offset, block in enumerate(blocks):
+        position = start + offset
+        if block.index != position:
+            return f"Block {position} hat falschen Index: {block.index}"
+        if position < verified_until:
+            error = check_block_linkage(block, previous, position)
+        else:
+            error = check_block_integrity(block, previous, position)
+        if error is not None:
+            return error
+        previous = block
+    return None
+
+
+class ChainValidator:
+    """
+    Inkrementelle Validierung einer Kette
+
+    validated_height und tip_hash beschreiben das längste fehlerfrei geprüfte
+    Präfix. Ein Block mit Problemen wird nicht übernommen, er wird beim nächsten
+    Aufruf also erneut geprüft. Änderungen an bereits geprüften Blöcken erkennt
+    nur eine vollständige Validierung (full=True).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Verwirft das geprüfte Präfix, der nächste Aufruf validiert vollständig"""
+        self.validated_height = 0
+        self.tip_hash: Optional[str] = None
+        # Kontostände nach dem geprüften Präfix
+        self._balances: Dict[str, float] = {}
+        self.last_checked = 0
+        self.last_full = False
+
+    def is_current(self, chain: Sequence[Any]) -> bool:
+        """Prüft, ob das gemerkte Präfix noch Teil von chain ist"""
+        height = self.validated_height
+        if height == 0:
+            return True
+        return height <= len(chain) and chain[height - 1].hash == self.tip_hash
+
+    def validate(self, chain: Sequence[Any], full: bool = False,
+                 verifier: Optional[ParallelVerifier] = None) -> Tuple[bool, List[str]]:
+        """
+        Validiert chain ab dem zuletzt geprüften Tip
+
+        Args:
+            chain: Liste von Blöcken, beginnend mit dem Genesis-Block
+            full: Bei True die gesamte Kette unabhängig vom gemerkten Stand prüfen
+            verifier: Optionaler ParallelVerifier für Hash, Merkle Root und Proof of Work
+
+        Returns:
+            (Gültig, Probleme) - Tupel mit Validitätsstatus und Liste von gefundenen Problemen
+        """
+        with self._lock:
+            if full or not self.is_current(chain):
+                self.reset()
+            start = self.validated_height
+            # Momentaufnahme der Blöcke, die Kette kann währenddessen weiterwachsen
+            blocks = chain[start:]
+            previous = chain[start - 1] if start else None
+            issues: List[str] = []
+            committed = self._balances
+            # Stände ab dem ersten Block mit Problemen, bleiben außerhalb des geprüften Präfixes
+            overlay: Dict[str, float] = {}
+            tainted = False
+            checked = 0
+
+            # Bis zu dieser Position sind die blockinternen Prüfungen bereits parallel erledigt
+            verified_until = start
+            if verifier is not None and len(blocks) >= verifier.MIN_PARALLEL_BLOCKS:
+                failed = verifier.first_invalid(blocks, start)
+                verified_until = start + len(blocks) if failed is None else failed
+
+            for block in blocks:
+                position = start + checked
+                checked += 1
+                if position < verified_until:
+                    error = check_block_linkage(block, previous, position)
+                else:
+                    # Am ersten fehlerhaften Block dieselbe Meldung wie ohne Verifier erzeugen
+                    error = check_block_integrity(block, previous, position)
+                if error is not None:
+                    # Ab hier sind Verkettung und Inhalt nicht mehr vertrauenswürdig
+                    issues.append(error)
+                    tainted = True
+                    break
+
+                block_issues = []
+                if block.index != position:
+                    block_issues.append(f"Block {position} hat falschen Index: {block.index}")
+                if previous is not None and block.timestamp < previous.timestamp:
+                    block_issues.append(f"Block {position} hat Zeitstempel vor vorherigem Block")
+
+                changes: Dict[str, float] = {}
+                for tx in block.iter_transactions():
+                    sender = tx["from"]
+                    recipient = tx["to"]
+                    amount = tx["amount"]
+                    for address in (sender, recipient):
+                        if address not in changes:
+                            changes[address] = overlay.get(address, committed.get(address, 0))
+                    if sender not in SYSTEM_SENDERS:
+                        changes[sender] -= amount
+                    changes[recipient] += amount
+                    if sender not in SYSTEM_SENDERS and changes[sender] < 0:
+                        block_issues.append(f"Negativer Kontostand für {sender} nach Transaktion in Block {block.index}")
+
+                if block_issues:
+                    issues.extend(block_issues)
+                    tainted = True
+                if tainted:
+                    overlay.update(changes)
+                else:
+                    committed.update(changes)
+                    self.validated_height = position + 1
+                    self.tip_hash = block.hash
+                previous = block
+
+            self.last_checked = checked
+            self.last_full = start == 0
+            return not issues, issues
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'validated_height': self.validated_height,
+            'tip_hash': self.tip_hash,
+            'last_checked': self.last_checked,
+            'last_full': self.last_full
+        }